@@ -1,5 +1,7 @@
 from typing import Generator
-from rps.dataclass import Point, Graph, Path
+import numpy as np
+from numpy.typing import NDArray
+from rps.dataclass import Point, Graph, Path, VisitedMarks
 
 
 class ACO:
@@ -20,14 +22,17 @@ class ACO:
         m: int              # 蚂蚁数量
         k: int              # 表示第k只蚂蚁
         nc: int             # 最大迭代次数
-        t: dict             # 信息素
+        t: Pheromone        # 信息素, 兼容 t[r][s] 访问
+        H: EdgeTable        # 预先计算的启发权重, 见init_weights
         t0: float           # 初始信息素（若初始为平均分配）
         Q: float            # 每条路径分配的信息素总量
         q: float            # 利用/探索因子, 0 < q < 1
         q0: float           # 0-1随机值, 用于和q比较
         r: Point            # 当前点
         s: Point            # 下一点
+        cost_to_go: bool    # 到终点的距离是否使用沿可行路径的最短距离, 见goal_distance
 
+        rng: Generator      # 随机数生成器(numpy.random.Generator), 见seed
         paths: list[Path]   # 所有蚂蚁的路径
         iter_cnt: int       # 当前的迭代次数
         best_path: Path     # 当前为止的最佳路径
@@ -37,21 +42,115 @@ class ACO:
 
     CLASS = "ACO"
 
+    # 随机数生成器, 由seed设置, 未设置时在load_graph中以随机种子创建
+    rng: np.random.Generator = None
+    # 由rng批量生成的随机数, 见rand
+    _rand: list[float] = []
+    # rand每次批量生成的随机数个数
+    RAND_BLOCK = 1024
+
+    def seed(self, seed=None) -> None:
+        """
+        设置随机数生成器, 所有随机选择均由其产生, 相同的种子得到相同的运行结果
+
+        参数:
+            seed (int | SeedSequence | Generator): 随机数种子, 为None时随机
+        """
+        self.rng = np.random.default_rng(seed)
+        self._rand = []
+
+    def rand(self) -> float:
+        """[0, 1)内的随机数, 每次由rng批量生成RAND_BLOCK个, 避免逐个调用的开销"""
+        try:
+            return self._rand.pop()
+        except IndexError:
+            self._rand = self.rng.random(self.RAND_BLOCK).tolist()
+            return self._rand.pop()
+
+    def unvisited(self, r: Point, path: Path) -> list[Point]:
+        """
+        r的相邻点中path未经过的点
+
+        path为正在使用访问标记数组的Path(见Path.use_marks)时直接比较数组中的编号,
+        不逐个调用 s in path
+        """
+        v = getattr(path, "visited", None)
+        if v is None or path.stamp != v.stamp:
+            return [s for s in self.edges[r] if s not in path]
+        marks, length, stamp = v.marks, v.length, path.stamp
+        return [s for s in self.edges[r] if marks[s.x * length + s.y] != stamp]
+
+    def select(self, r: Point, allowed: list[Point], q0: float = 0.0) -> Point:
+        """
+        由cal_P的权重从allowed中选择下一点, 供各算法的state_trans使用
+
+        以q0的概率选择权重最大的点(利用), 否则按权重轮盘赌选择(探索). 每个候选点的
+        cal_P只计算一次, 权重写入8个元素的缓冲区(一个方格最多8个相邻点), 利用与
+        探索共用同一组权重, 选择过程不创建新的列表
+
+        参数:
+            r (Point): 当前点
+            allowed (list[Point]): 候选点, 不超过8个且不为空
+            q0 (float): 利用/探索阈值, 为0时只进行轮盘赌
+        """
+        w = self._weights
+        cal_P = self.cal_P
+        total = 0.0
+        best, p_max = allowed[0], -1.0
+        for i, s in enumerate(allowed):
+            p = w[i] = cal_P(r, s)
+            total += p
+            if p > p_max:
+                best, p_max = s, p
+        if q0 > 0 and self.rand() < q0:
+            return best
+        if not 0 < total < float("inf"):
+            raise ValueError("Total of weights must be greater than zero and finite")
+        u = self.rand() * total
+        for i, s in enumerate(allowed):
+            u -= w[i]
+            if u < 0:
+                return s
+        # 浮点误差导致u未减至0以下时选择最后一项
+        return s
+
     def load_graph(self, graph: Graph) -> None:
-        """加载一张地图，并设置初始信息素"""
-        self.graph = graph
-        self.edges = graph.edges
+        """
+        加载一张地图，并设置初始信息素
+
+        蚂蚁在去除了死角及不连通区域的地图(Graph.pruned)上搜索
+        """
+        if self.rng is None:
+            self.seed()
+        # select使用的权重缓冲区
+        self._weights = [0.0] * 8
+        self.graph = graph.pruned()
+        self.edges = self.graph.edges
+        # 各蚂蚁依次构建路径, 共用一个访问标记数组, 每次清空路径时更换编号
+        self.visited = VisitedMarks(graph.width, graph.length)
+        for path in getattr(self, "paths", ()):
+            if isinstance(path, Path):
+                path.use_marks(self.visited)
         self.start = graph.start
         self.end = graph.end
         self.init_pher()
+        self.init_weights()
+
+    def search(self, graph=None, return_path=True, seed=None):
+        """
+        执行算法，返回一条最终路径
 
-    def search(self, graph=None, return_path=True):
-        """执行算法，返回一条最终路径"""
+        参数:
+            seed: 随机数种子, 见seed方法. 为None时沿用当前的随机数生成器
+        """
+        if seed is not None:
+            self.seed(seed)
         if graph is not None:
             self.load_graph(graph)
         self.length_history = []
         self.converge = 1
-        while not self.is_end():
+        # 起点与终点不连通时不进行迭代
+        while self.graph.connected() and not self.is_end():
             self.iteration()
             if self.length_history and self.length_history[-1] != self.best_path.length:
                 self.converge = self.iter_cnt
@@ -60,11 +159,13 @@ class ACO:
             return self.best_path
         return self.best_path.length, self.best_path.turn_num, self.converge
 
-    def search_real_time(self) -> Generator[Path, None, None]:
-        """执行算法，每次迭代产生一条实时路径"""
+    def search_real_time(self, seed=None) -> Generator[Path, None, None]:
+        """执行算法，每次迭代产生一条实时路径, seed见search"""
+        if seed is not None:
+            self.seed(seed)
         self.length_history = []
         self.converge = 1
-        while not self.is_end():
+        while self.graph.connected() and not self.is_end():
             self.iteration()
             if self.length_history and self.length_history[-1] != self.best_path.length:
                 self.converge = self.iter_cnt
@@ -74,6 +175,31 @@ class ACO:
     def init_pher(self) -> None:
         """设置初始信息素及其他参数"""
 
+    def goal_distance(self) -> NDArray:
+        """
+        地图中各点到终点的距离, 距离为0时取0.01
+
+        返回:
+            NDArray: 形状为(width, length)的矩阵, cost_to_go为True时障碍物及
+                不可达的点为inf
+        """
+        if not self.cost_to_go:
+            return self.graph.euclidean(self.end)
+        dist = self.graph.cost_to_go(self.end).copy()
+        dist[dist == 0] = 0.01
+        return dist
+
+    def init_weights(self) -> None:
+        """
+        预先计算整个搜索过程中不变的启发权重(可选)
+
+        cal_P中与蚂蚁当前路径无关的因子可在此一次性计算为 (width, length, 8)
+        的EdgeTable, 使state_trans只需计算与路径有关的部分
+        """
+
+    def update_weights(self) -> None:
+        """每次迭代开始时更新只与迭代次数有关的启发权重(可选)"""
+
     def tour(self, k: int) -> None:
         """第k只蚂蚁寻找一次路径"""
 
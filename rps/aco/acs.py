@@ -1,6 +1,6 @@
 from rps.dataclass import Point
 from .ant_system import AS
-import random
+import numpy as np
 
 
 class ACS(AS):
@@ -14,11 +14,12 @@ class ACS(AS):
         self,
         m: int = 50,
         nc: int = 30,
-        alpha: float = 0.1,
-        beta: float = 0.2,
-        rho: float = 0.1,
-        t0: float = 1 / 800,
+        alpha: float = 0.2,
+        beta: float = 0.1,
+        rho: float = 1 / 800,
+        t0: float = 10,
         q0: float = 0.3,
+        batch: bool = False,
     ):
         """
         m (int): 蚂蚁数量
@@ -28,36 +29,43 @@ class ACS(AS):
         beta (float): 启发函数幂系数
         t0 (float): 初始信息素
         q0 (float): 利用/探索阈值
+        batch (bool): 是否使用BatchTour使所有蚂蚁同步构建路径
+
+        旧版本将(alpha, beta, rho, t0)按位置传给AS的(Q, alpha, beta, rho),
+        实际生效的是 alpha=beta, beta=rho, rho=t0, t0=10. 现在各参数按名称生效,
+        默认值取为旧版本默认参数实际生效的值, 默认构造的结果不变; 按关键字传参的
+        调用需按上述对应关系换算. rho为局部信息素蒸发系数, rho=1时每次经过
+        都将信息素完全重置为t0
         """
-        super().__init__(m, nc, alpha, beta, rho, t0)
+        super().__init__(m, nc, alpha=alpha, beta=beta, rho=rho, t0=t0, batch=batch)
         self.q0 = q0
 
     def cal_P(self, r: Point, s: Point) -> float:
-        return self.t[r][s] * self.cal_H(r, s) ** self.beta
+        return self.t.get(r, s) * self.H.get(r, s)
+
+    def batch_P(self, tour, ants, nodes, nbrs):
+        return self.t.flat[nodes] * self.H.flat[nodes]
+
+    def batch_local_update(self, nodes, slots):
+        # 同一步中多只蚂蚁经过同一条边时, 等价于连续更新多次
+        edges, cnt = np.unique(nodes * 8 + slots, return_counts=True)
+        tau = self.t.tau.reshape(-1)
+        keep = (1 - self.rho) ** cnt
+        tau[edges] = tau[edges] * keep + self.t0 * (1 - keep)
 
     def state_trans(self, r: Point) -> Point | None:
         allowed = self.allowed(r)
         if not allowed:
             return
-        q = random.random()
-        if q < self.q0:
-            s = max(allowed, key=lambda s: self.cal_P(r, s))
-        else:
-            weights = list(map(lambda s: self.cal_P(r, s), allowed))
-            s = random.choices(allowed, weights=weights)[0]
+        s = self.select(r, allowed, self.q0)
         self.local_update(r, s)
         return s
 
     def local_update(self, r: Point, s: Point):
-        self.t[r][s] *= 1 - self.rho
-        self.t[r][s] += self.rho * self.t0
+        self.t.set(r, s, self.t.get(r, s) * (1 - self.rho) + self.rho * self.t0)
 
     def global_update(self):
         if self.best_path.length == float("inf"):
             return
-        for r in self.edges:
-            for s in self.edges[r]:
-                self.t[r][s] *= 1 - self.alpha
-        delta_t = 1 / self.best_path.length
-        for r, s in self.best_path.get():
-            self.t[r][s] += delta_t
+        self.t.scale(1 - self.alpha)
+        self.t.deposit(self.best_path, 1 / self.best_path.length)
@@ -1,7 +1,9 @@
-import random
 from typing_extensions import override
 from .aco import ACO
+from .batch import BatchTour
+from .pheromone import EdgeTable, Pheromone
 from rps.dataclass import *
+from rps.dataclass.graph import DIR_DIST
 
 
 class AS(ACO):
@@ -22,6 +24,7 @@ class AS(ACO):
         beta: float = 0,
         rho: float = 0.5,
         t0: float = 10,
+        batch: bool = False,
     ):
         """
         参数:
@@ -32,6 +35,7 @@ class AS(ACO):
             beta (float): 启发函数重要度
             rho (float): 信息素蒸发率
             t0 (float): 初始信息素
+            batch (bool): 是否使用BatchTour使所有蚂蚁同步构建路径
         """
         self.m = m
         self.nc = nc
@@ -40,6 +44,8 @@ class AS(ACO):
         self.beta = beta
         self.rho = rho
         self.t0 = t0
+        self.batch = batch
+        self.engine: BatchTour = None
         self.k = 0
         # 每只蚂蚁的路径
         self.paths = [Path() for _ in range(self.m)]
@@ -50,11 +56,19 @@ class AS(ACO):
         # 当前最优路径
         self.best_path = Path(length=float("inf"), turn_num=float("inf"))
 
+    @override
+    def load_graph(self, graph: Graph) -> None:
+        super().load_graph(graph)
+        self.engine = BatchTour(self) if self.batch else None
+
     @override
     def init_pher(self):
-        self.t = {}
-        for r in self.edges:
-            self.t[r] = {s: self.t0 for s in self.edges[r]}
+        self.t = Pheromone(self.graph, self.t0)
+
+    @override
+    def init_weights(self):
+        # cal_H只与移动方向有关
+        self.H = EdgeTable(self.graph, (1 / DIR_DIST) ** self.beta)
 
     @override
     def is_end(self) -> bool:
@@ -66,23 +80,18 @@ class AS(ACO):
 
     @override
     def cal_P(self, r: Point, s: Point) -> float:
-        return self.t[r][s] ** self.alpha * self.cal_H(r, s) ** self.beta
+        return self.t.get(r, s) ** self.alpha * self.H.get(r, s)
 
     @override
     def allowed(self, r: Point) -> list[Point | None]:
-        options = []
-        for s in self.edges[r]:
-            if s not in self.path:
-                options.append(s)
-        return options
+        return self.unvisited(r, self.path)
 
     @override
     def state_trans(self, r: Point) -> Point | None:
         allowed = self.allowed(r)
         if not allowed:
             return
-        weights = list(map(lambda s: self.cal_P(r, s), allowed))
-        return random.choices(allowed, weights=weights)[0]
+        return self.select(r, allowed)
 
     @override
     def tour(self, k: int):
@@ -106,12 +115,10 @@ class AS(ACO):
 
     @override
     def global_update(self):
-        for r in self.t:
-            for s in self.t[r]:
-                self.t[r][s] *= self.rho
+        self.t.scale(self.rho)
         for k in range(self.m):
-            for r, s in self.paths[k].get():
-                self.t[r][s] += self.Q / self.paths[k].length
+            if len(self.paths[k]) > 1:
+                self.t.deposit(self.paths[k], self.Q / self.paths[k].length)
 
     def is_better_path(self, path: Path, cmp_path: Path) -> bool:
         """判断path是否比cmp_path更优"""
@@ -119,12 +126,32 @@ class AS(ACO):
             return path.turn_num < cmp_path.turn_num
         return path.length < cmp_path.length
 
+    def tours(self) -> None:
+        """所有蚂蚁各寻找一次路径"""
+        if self.engine is not None:
+            self.engine.run()
+            return
+        for self.k in range(self.m):
+            self.tour(self.k)
+
+    def batch_P(self, tour: BatchTour, ants, nodes, nbrs):
+        """cal_P的向量化形式, 返回各蚂蚁所有方向的概率权重"""
+        return self.t.flat[nodes] ** self.alpha * self.H.flat[nodes]
+
+    def batch_allowed(self, tour: BatchTour, ants, nodes, cand):
+        """allowed的向量化形式, 过滤各蚂蚁的候选方向"""
+        return cand
+
+    def batch_local_update(self, nodes, slots) -> None:
+        """local_update的向量化形式"""
+
     @override
     def iteration(self):
         self.iter_cnt += 1
+        self.update_weights()
         iter_best_path = Path(length=float("inf"), turn_num=float("inf"))
-        for self.k in range(self.m):
-            self.tour(self.k)
+        self.tours()
+        for self.path in self.paths:
             if self.path.valid and self.is_better_path(self.path, iter_best_path):
                 iter_best_path = self.path
         if self.is_better_path(iter_best_path, self.best_path):
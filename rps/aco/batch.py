@@ -0,0 +1,199 @@
+import numpy as np
+from rps.dataclass import Point
+from rps.dataclass.graph import DIR_DX, DIR_DY, DIR_DIST
+
+
+class VisitedSets:
+    """
+    各蚂蚁已访问结点的集合, 以开放寻址(线性探测)的散列表表示
+
+    第k只蚂蚁的表为 keys[k], 空位为-1, 元素数超过容量的一半时所有表容量加倍.
+    内存只与路径长度有关, 与地图大小无关; 清空一只蚂蚁的记录只需重置其表
+
+    属性:
+        keys (NDArray[int64]): 形状为(m, 容量)的散列表
+        count (NDArray[int64]): 各蚂蚁的元素数
+    """
+
+    # 斐波那契散列的乘数, 取乘积的高位作为表中位置
+    MULT = np.uint64(0x9E3779B97F4A7C15)
+
+    def __init__(self, m: int, capacity: int = 64):
+        self.keys = np.full((m, capacity), -1, dtype=np.int64)
+        self.count = np.zeros(m, dtype=np.int64)
+
+    def _probe(self, ants, nodes):
+        """
+        nodes在各自蚂蚁的表中的位置, 不存在时为探测到的空位. ants可广播至
+        nodes的形状
+        """
+        cap = self.keys.shape[1]
+        shift = np.uint64(64 - cap.bit_length() + 1)
+        pos = ((nodes.astype(np.uint64) * self.MULT) >> shift).astype(np.int64)
+        while True:
+            k = self.keys[ants, pos]
+            todo = (k != nodes) & (k != -1)
+            if not todo.any():
+                return pos, k == nodes
+            pos[todo] = (pos[todo] + 1) & (cap - 1)
+
+    def contains(self, ants, nodes):
+        """ants[i]是否访问过nodes[i, j], ants形状为(a,), nodes形状为(a, b)"""
+        return self._probe(ants[:, None], nodes)[1]
+
+    def add(self, ants, nodes) -> None:
+        """将nodes[i]加入ants[i]的集合, ants中不含重复项"""
+        if (self.count[ants].max(initial=0) + 1) * 2 > self.keys.shape[1]:
+            self._grow()
+        pos, found = self._probe(ants, nodes)
+        new = ~found
+        self.keys[ants[new], pos[new]] = nodes[new]
+        self.count[ants[new]] += 1
+
+    def clear(self, ants=None) -> None:
+        """清空ants(默认为全部蚂蚁)的集合"""
+        if ants is None:
+            ants = slice(None)
+        self.keys[ants] = -1
+        self.count[ants] = 0
+
+    def _grow(self) -> None:
+        """容量加倍并重新插入所有元素"""
+        old = self.keys
+        self.keys = np.full((len(old), old.shape[1] * 2), -1, dtype=np.int64)
+        ants, cols = np.nonzero(old >= 0)
+        nodes = old[ants, cols]
+        # 同一蚂蚁的元素分批插入, 每批每只蚂蚁最多一个, 以免抢占同一空位
+        rank = np.arange(len(ants)) - np.searchsorted(ants, ants)
+        for r in range(int(rank.max(initial=-1)) + 1):
+            sel = rank == r
+            pos, _ = self._probe(ants[sel], nodes[sel])
+            self.keys[ants[sel], pos] = nodes[sel]
+
+
+class BatchTour:
+    """
+    所有蚂蚁同步前进的路径构建引擎
+
+    m只蚂蚁的位置、候选点概率及轮盘赌选择均以蚂蚁为第一维的数组表示, 已访问点
+    保存在VisitedSets中, 每一步所有未结束的蚂蚁同时前进一格. 结点编号为
+    x * length + y
+
+    每一步的开销主要是固定次数的NumPy调用, 与蚂蚁数基本无关, 因此只在蚂蚁数
+    较多时快于逐只构建: 在test1与test5上每秒移动步数m = 20时约为逐只构建的
+    0.5~1.2倍, m = 50时约为1~1.8倍, 因此默认不启用
+
+    算法通过以下接口提供自身的转移规则::
+
+        alg.batch_P(tour, ants, nodes, nbrs) -> NDArray       # 各方向的概率权重, 形状(a, 8)
+        alg.batch_allowed(tour, ants, nodes, cand) -> NDArray # 过滤候选方向
+        alg.batch_local_update(nodes, slots) -> None          # 局部信息素更新
+        alg.q0                                                # 利用/探索阈值(可选)
+
+    多只蚂蚁同一步经过同一条边时, 局部信息素更新按经过次数一次完成
+    """
+
+    def __init__(self, alg):
+        graph = alg.graph
+        self.alg = alg
+        self.length = graph.length
+        self.n = graph.width * graph.length
+        self.mask = graph.edge_mask().reshape(self.n, 8)
+        # 各结点在8个方向上的相邻结点编号, 不可达的方向为0
+        offset = DIR_DX * graph.length + DIR_DY
+        self.nbrs = np.where(self.mask, np.arange(self.n)[:, None] + offset, 0)
+        self.dist = DIR_DIST
+        # 本次迭代所有蚂蚁的移动步数
+        self.moves = 0
+        self.start = graph.start.x * graph.length + graph.start.y
+        self.end = graph.end.x * graph.length + graph.end.y
+        self.visited: VisitedSets = None
+
+    def run(self) -> None:
+        """所有蚂蚁各构建一条路径, 结果保存至 alg.paths"""
+        alg = self.alg
+        m = alg.m
+        ants = np.arange(m)
+        self.pos = np.full(m, self.start)
+        # 上一步的方向序号, -1表示尚未移动
+        self.prev = np.full(m, -1)
+        # 当前路径长度
+        self.dists = np.zeros(m)
+        if self.visited is None or len(self.visited.count) != m:
+            self.visited = VisitedSets(m)
+        self.visited.clear()
+        self.visited.add(ants, self.pos)
+        active = np.full(m, self.start != self.end)
+        valid = np.ones(m, dtype=bool)
+        # 各蚂蚁路径在trail中的起始位置
+        begin = np.zeros(m, dtype=int)
+        trail = [self.pos.copy()]
+        self.moves = 0
+        while active.any():
+            a = ants[active]
+            nodes = self.pos[a]
+            nbrs = self.nbrs[nodes]
+            cand = self.candidates(a, nodes, nbrs)
+            # 遇到死角: 与AS.tour一致, 清空路径并从当前点继续, 路径标记为无效
+            stuck = ~cand.any(axis=1)
+            if stuck.any():
+                dead = a[stuck]
+                valid[dead] = False
+                begin[dead] = len(trail)
+                self.visited.clear(dead)
+                self.prev[dead] = -1
+                self.dists[dead] = 0
+                cand[stuck] = self.candidates(dead, nodes[stuck], nbrs[stuck])
+                # 孤立点, 无法继续
+                isolated = ~cand.any(axis=1)
+                if isolated.any():
+                    active[a[isolated]] = False
+                    a, nodes = a[~isolated], nodes[~isolated]
+                    nbrs, cand = nbrs[~isolated], cand[~isolated]
+                    if not len(a):
+                        break
+            weights = np.where(cand, alg.batch_P(self, a, nodes, nbrs), 0)
+            slots = self.select(weights, cand, getattr(alg, "q0", 0))
+            alg.batch_local_update(nodes, slots)
+            nxt = nbrs[np.arange(len(a)), slots]
+            self.moves += len(a)
+            self.visited.add(a, nxt)
+            self.dists[a] += self.dist[slots]
+            self.prev[a] = slots
+            self.pos[a] = nxt
+            active[a[nxt == self.end]] = False
+            trail.append(self.pos.copy())
+        self.save(np.array(trail), begin, valid)
+
+    def candidates(self, ants, nodes, nbrs):
+        """各蚂蚁可前往的方向"""
+        cand = self.mask[nodes] & ~self.visited.contains(ants, nbrs)
+        return self.alg.batch_allowed(self, ants, nodes, cand)
+
+    def select(self, weights, cand, q0: float):
+        """按q0在利用(最大权重)与轮盘赌之间选择每只蚂蚁的下一方向"""
+        rows = np.arange(len(weights))
+        cum = np.cumsum(weights, axis=1)
+        rng = self.alg.rng
+        u = rng.random(len(weights)) * cum[:, -1]
+        slots = np.minimum((cum <= u[:, None]).sum(axis=1), 7)
+        if q0 > 0:
+            exploit = rng.random(len(weights)) < q0
+            best = np.argmax(np.where(cand, weights, -1), axis=1)
+            slots = np.where(exploit, best, slots)
+        # 浮点误差导致选中无效方向时, 改为权重最大的方向
+        bad = ~cand[rows, slots]
+        if bad.any():
+            slots[bad] = np.argmax(np.where(cand[bad], weights[bad], -1), axis=1)
+        return slots
+
+    def save(self, trail, begin, valid) -> None:
+        """将各蚂蚁的结点序列转换为路径"""
+        for k in range(self.alg.m):
+            path = self.alg.paths[k]
+            path.clear()
+            path.valid = bool(valid[k])
+            for node in trail[begin[k] :, k].tolist():
+                path.append(Point(*divmod(node, self.length)))
+                if node == self.end:
+                    break
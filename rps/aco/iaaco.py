@@ -1,10 +1,11 @@
 from math import exp, atan
-import random
 from typing_extensions import override
-from heapq import *
 
-from rps.dataclass import Path, Dir, Point
+import numpy as np
+from rps.dataclass import Path, Point
+from rps.dataclass.graph import DIR_DIST
 from .aco import ACO
+from .pheromone import EdgeTable, Pheromone
 
 
 class IAACO(ACO):
@@ -30,6 +31,7 @@ class IAACO(ACO):
         kL: float = 1,
         kS: float = 0,
         kE: float = 0,
+        cost_to_go: bool = False,
     ) -> None:
         self.m = m
         self.nc = nc
@@ -45,6 +47,7 @@ class IAACO(ACO):
         self.kL = kL
         self.kS = kS
         self.kE = kE
+        self.cost_to_go = cost_to_go
         # 当前迭代次数
         self.iter_cnt = 0
         # 所有路径
@@ -56,40 +59,44 @@ class IAACO(ACO):
 
     @override
     def init_pher(self) -> None:
-        self.t = {}
-        for r in self.edges:
-            self.t[r] = {s: self.Q for s in self.edges[r]}
-        self.init_Di0()
+        self.t = Pheromone(self.graph, self.Q)
+        # 各点到最近的障碍物的距离
+        self.di0 = self.graph.obstacle_distance()
         self.LSG = self.start * self.end
 
-    def cal_Di0(self, i: Point) -> float:
-        """计算点i到最近的障碍物的距离"""
-        q = []
-        vis = set()
-        heappush(q, (0, i))
-        while q:
-            dist, r = heappop(q)
-            if r not in self.graph:
-                return dist
-            vis.add(r)
-            for dir in Dir.all_dirs():
-                s = r + dir
-                if s in vis:
-                    continue
-                dist = i * s
-                heappush(q, (dist, s))
-
-    def init_Di0(self) -> None:
-        """计算所有点的Di0"""
-        self.di0 = {}
-        for i in self.edges:
-            self.di0[i] = self.cal_Di0(i)
+    @override
+    def init_weights(self) -> None:
+        # cal_P中除信息素与epsilon外的因子均与路径及迭代次数无关
+        self.dG = self.goal_distance()
+        # 角度引导因子mu只与方向有关, 始终使用直线距离
+        dG = self.graph.euclidean(self.end)
+        xs, ys = np.indices(self.graph.size)
+        cheb = np.maximum(np.abs(xs - self.end.x), np.abs(ys - self.end.y))
+        mu = np.where(cheb == 0, 1, dG / np.maximum(cheb, 1))
+        dib = self.di0
+        with np.errstate(divide="ignore"):
+            xi = np.where(
+                dib > self.Rs,
+                1,
+                np.where((self.Rs <= dib) & (dib <= self.Rs * 2), self.Rs / dib, 0),
+            )
+        DjG = self.graph.neighbor_values(self.dG, fill=1)
+        H = 1 / (self.sigma_1 * DIR_DIST + self.sigma_2 * DjG)
+        mu_j = self.graph.neighbor_values(mu, fill=1)
+        self.H = EdgeTable(
+            self.graph, H**self.beta * mu_j**self.lambda_ * xi[..., np.newaxis]
+        )
+
+    @override
+    def update_weights(self) -> None:
+        epsilon = exp(-2 * (self.iter_cnt / self.nc) ** 2)
+        self.epsilon = epsilon**self.beta
 
     @override
     def cal_H(self, r: Point, s: Point) -> float:
         epsilon = exp(-2 * (self.iter_cnt / self.nc) ** 2)
         Dij = self.edges[r][s]
-        DjG = s * self.end
+        DjG = self.dG[s.x, s.y]
         return epsilon * 1 / (self.sigma_1 * Dij + self.sigma_2 * DjG)
 
     def cal_mu(self, r: Point, s: Point) -> float:
@@ -105,7 +112,7 @@ class IAACO(ACO):
 
     def cal_xi(self, r: Point) -> float | int:
         """计算障碍物排除因子"""
-        dib = self.di0[r]
+        dib = self.di0[r.x, r.y]
         if dib > self.Rs:
             return 1
         if self.Rs <= dib <= self.Rs * 2:
@@ -114,20 +121,11 @@ class IAACO(ACO):
 
     @override
     def cal_P(self, r: Point, s: Point) -> float:
-        return (
-            (self.t[r][s] ** self.alpha)
-            * (self.cal_H(r, s) ** self.beta)
-            * (self.cal_mu(r, s) ** self.lambda_)
-            * self.cal_xi(r)
-        )
+        return (self.t.get(r, s) ** self.alpha) * self.epsilon * self.H.get(r, s)
 
     @override
     def allowed(self, r: Point) -> list[Point | None]:
-        options = []
-        for s in self.edges[r]:
-            if s not in self.paths[self.k]:
-                options.append(s)
-        return options
+        return self.unvisited(r, self.paths[self.k])
 
     @override
     def state_trans(self, r: Point) -> Point | None:
@@ -135,11 +133,7 @@ class IAACO(ACO):
         if not allowed:
             return
         q0 = self.delta_0 * exp(-1 / 2 * (self.iter_cnt / self.nc) ** 2)
-        q = random.random()
-        if q <= q0:
-            return max(allowed, key=lambda s: self.cal_P(r, s))
-        weights = list(map(lambda s: self.cal_P(r, s), allowed))
-        return random.choices(allowed, weights=weights)[0]
+        return self.select(r, allowed, q0)
 
     @override
     def tour(self, k: int) -> None:
@@ -176,6 +170,7 @@ class IAACO(ACO):
     @override
     def iteration(self) -> None:
         self.iter_cnt += 1
+        self.update_weights()
         for self.k in range(self.m):
             self.tour(self.k)
         self.global_update()
@@ -204,16 +199,12 @@ class IAACO(ACO):
         # 全局信息素更新
         for k in range(self.m):
             if self.paths[k].valid:
-                delta_t = self.Q / self.paths[k].length
-                for i, j in self.paths[k].get():
-                    self.t[i][j] = (1 - rho) * self.t[i][j] + rho * delta_t
+                self.t.blend(self.paths[k], rho, self.Q / self.paths[k].length)
         # 最优/最坏路径信息素更新
         delta_t_pbs = self.Q / Jbest * (Jbest + Jworst) / 2
         delta_t_pws = -self.Q / Jworst
-        for i, j in pbs.get():
-            self.t[i][j] = (1 - rho) * self.t[i][j] + rho * delta_t_pbs
-        for i, j in pws.get():
-            self.t[i][j] = max((1 - rho) * self.t[i][j] + rho * delta_t_pws, self.min_t)
+        self.t.blend(pbs, rho, delta_t_pbs)
+        self.t.blend(pws, rho, delta_t_pws, self.min_t)
         # 更新全局最优路径
         if Jbest <= self.best_J:
             self.best_J = Jbest
@@ -1,7 +1,9 @@
-import random
+import numpy as np
 from typing_extensions import override
 from rps.dataclass import Path, Point, Dir
+from rps.dataclass.graph import DIRS
 from .ant_system import AS
+from .pheromone import EdgeTable, Pheromone
 
 
 class IHMACO(AS):
@@ -24,8 +26,10 @@ class IHMACO(AS):
         w1: float = 0.5,
         w2: float = 1,
         epsilon_q=0.1,
+        cost_to_go: bool = False,
     ):
         super().__init__(m, nc, Q, alpha, beta, rho, t0)
+        self.cost_to_go = cost_to_go
         self.T0 = T0
         self.w1 = w1
         self.w2 = w2
@@ -34,29 +38,29 @@ class IHMACO(AS):
     @override
     def init_pher(self):
         dST = self.start * self.end
-        self.t = {}
-        for i in self.edges:
-            self.t[i] = {}
-            dSi = self.start * i
-            diT = i * self.end
-            for j in self.edges[i]:
-                dSj = self.start * j
-                djT = j * self.end
-                a = 1 if diT > djT else 0.5
-                self.t[i][j] = a * (dST / (dSi + diT) + dST / (dSj + djT)) * self.t0
+        dS = self.graph.euclidean(self.start)
+        dT = self.dT = self.goal_distance()
+        f = dST / (dS + dT)
+        # 各方向上相邻点j的 dST / (dSj + djT) 及 djT
+        f_j = self.graph.neighbor_values(f)
+        dT_j = self.graph.neighbor_values(dT)
+        a = np.where(dT[..., np.newaxis] > dT_j, 1, 0.5)
+        self.t = Pheromone(self.graph, a * (f[..., np.newaxis] + f_j) * self.t0)
+
+    @override
+    def init_weights(self):
+        # cal_H ** beta * omega 与路径无关, omega只与移动方向有关
+        dT_j = self.graph.neighbor_values(self.dT, fill=1)
+        omega = [self.omega(Point(0, 0), Point(dx, dy)) for dx, dy in DIRS]
+        self.H = EdgeTable(self.graph, (1 / dT_j) ** self.beta * omega)
 
     @override
     def cal_P(self, r: Point, s: Point) -> float:
-        return (
-            self.t[r][s] ** self.alpha
-            * self.cal_H(r, s) ** self.beta
-            * self.omega(r, s)
-            * self.T(r, s)
-        )
+        return self.t.get(r, s) ** self.alpha * self.H.get(r, s) * self.T(r, s)
 
     @override
     def cal_H(self, r: Point, s: Point) -> float:
-        return 1 / (s * self.end)
+        return 1 / self.dT[s.x, s.y]
 
     def omega(self, r: Point, s: Point) -> float:
         dir_ij: Dir = s - r
@@ -74,12 +78,7 @@ class IHMACO(AS):
         allowed = self.allowed(r)
         if not allowed:
             return
-        q = random.random()
-        if q < self.q0:
-            s = max(allowed, key=lambda s: self.cal_P(r, s))
-        else:
-            weights = list(map(lambda s: self.cal_P(r, s), allowed))
-            s = random.choices(allowed, weights=weights)[0]
+        s = self.select(r, allowed, self.q0)
         self.local_update(r, s)
         return s
 
@@ -89,17 +88,15 @@ class IHMACO(AS):
     @override
     def global_update(self):
         rho = self.rho * (1 + 0.2 * self.iter_cnt / self.nc)
-        for i in self.edges:
-            for j in self.edges[i]:
-                self.t[i][j] *= 1 - rho
+        self.t.evaporate(rho)
         for k in range(self.m):
-            for i, j in self.paths[k].get():
-                fitness = self.fitness(self.paths[k])
-                self.t[i][j] += self.Q / fitness
+            if len(self.paths[k]) > 1:
+                self.t.deposit(self.paths[k], self.Q / self.fitness(self.paths[k]))
 
     @override
     def iteration(self):
         self.iter_cnt += 1
+        self.update_weights()
         iter_best_path = Path(length=float("inf"), turn_num=float("inf"))
         cnt = 0
         self.q0 = 0.1 + 2 * (self.iter_cnt - 0.45 * self.nc) ** 2 / self.nc**2
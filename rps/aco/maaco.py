@@ -1,8 +1,9 @@
-from math import exp
-import random
+import numpy as np
 from typing_extensions import override
 from rps.dataclass import Point, Path
 from .ant_system import AS
+from .pheromone import EdgeTable, Pheromone
+from rps.dataclass.graph import DIR_DX, DIR_DY
 
 
 class MAACO(AS):
@@ -25,8 +26,11 @@ class MAACO(AS):
         a: float = 1,
         whmax: float = 0.9,
         whmin: float = 0.2,
+        batch: bool = False,
+        cost_to_go: bool = False,
     ):
-        super().__init__(m, nc, Q, alpha, beta, rho, t0)
+        super().__init__(m, nc, Q, alpha, beta, rho, t0, batch=batch)
+        self.cost_to_go = cost_to_go
         self.q0_initial = q0_initial
         self.a = a
         self.whmax = whmax
@@ -36,47 +40,71 @@ class MAACO(AS):
     @override
     def init_pher(self) -> None:
         self.dst = self.start * self.end
-        self.t = {}
-        for i in self.edges:
-            self.t[i] = {}
-            t_initial = self.dst / (self.start * i + self.end * i) * self.t0
-            for j in self.edges[i]:
-                self.t[i][j] = t_initial
+        # 各点到终点的距离
+        self.djt = self.goal_distance()
+        d = self.graph.euclidean(self.start) + self.djt
+        self.t = Pheromone(self.graph, self.dst / d * self.t0)
+
+    @override
+    def init_weights(self) -> None:
+        # cal_H中只与下一点s有关的因子: g及h * djt
+        djt = self.graph.neighbor_values(self.djt)
+        k = 1  # 原论文中未给出k的值
+        h = self.whmax - (self.whmax - self.whmin) * np.exp(-k * djt) / self.dst
+        self.G = EdgeTable(self.graph, 1 - h)
+        self.HD = EdgeTable(self.graph, h * djt)
 
     @override
     def allowed(self, r: Point) -> list[Point | None]:
-        options = []
-        for s in self.edges[r]:
-            if s not in self.path:
-                options.append(s)
+        options = self.unvisited(r, self.path)
         dir = self.end - r
         options.sort(key=lambda s: dir - (s - r))
         return options[:3]
 
+    @override
+    def batch_allowed(self, tour, ants, nodes, cand):
+        # 按与终点方向的偏差排序, 保留前3个候选方向
+        x, y = np.divmod(nodes, tour.length)
+        gx = np.sign(self.end.x - x)[:, None]
+        gy = np.sign(self.end.y - y)[:, None]
+        key = 4 - (np.abs(DIR_DX + gx) + np.abs(DIR_DY + gy))
+        key[(gx == DIR_DX) & (gy == DIR_DY)] = 0
+        order = np.argsort(np.where(cand, key, 9), axis=1, kind="stable")
+        rank = np.empty_like(order)
+        np.put_along_axis(rank, order, np.arange(8)[None, :], axis=1)
+        return cand & (rank < 3)
+
+    @override
+    def batch_P(self, tour, ants, nodes, nbrs):
+        dsj = tour.dists[ants, None] + tour.dist
+        prev = tour.prev[ants, None]
+        ci = (prev >= 0) & (prev != np.arange(8))
+        d = self.G.flat[nodes] * dsj + self.HD.flat[nodes] + self.a * ci
+        # 不存在的边d可能为0, 其权重由BatchTour置为0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.t.flat[nodes] ** self.alpha * (1 / d) ** self.beta
+
     @override
     def state_trans(self, r: Point) -> Point | None:
         allowed = self.allowed(r)
         if not allowed:
             return
-        q = random.random()
-        if q <= self.q0:
-            return max(allowed, key=lambda s: self.cal_P(r, s))
-        weights = list(map(lambda s: self.cal_P(r, s), allowed))
-        return random.choices(allowed, weights=weights)[0]
+        return self.select(r, allowed, self.q0)
+
+    @override
+    def cal_P(self, r: Point, s: Point) -> float:
+        return self.t.get(r, s) ** self.alpha * self.cal_H(r, s) ** self.beta
 
     @override
     def cal_H(self, r: Point, s: Point) -> float:
         dsj = self.path.length + self.edges[r][s]
-        djt = s * self.end
-        k = 1  # 原论文中未给出k的值
-        h = self.whmax - (self.whmax - self.whmin) * exp(-k * djt) / self.dst
-        g = 1 - h
         ci = 1 - (self.path > s)
-        return 1 / (g * dsj + h * djt + self.a * ci)
+        return 1 / (self.G.get(r, s) * dsj + self.HD.get(r, s) + self.a * ci)
 
     @override
     def iteration(self):
         self.iter_cnt += 1
+        self.update_weights()
         if self.iter_cnt < self.k0:
             self.q0 = (self.nc - self.iter_cnt) / self.nc * self.q0_initial
         else:
@@ -84,8 +112,8 @@ class MAACO(AS):
                 self.iter_cnt - self.k0
             ) / self.nc * self.q0_initial + self.q0_initial / 2
         iter_best_path = Path(length=float("inf"), turn_num=float("inf"))
-        for self.k in range(self.m):
-            self.tour(self.k)
+        self.tours()
+        for self.path in self.paths:
             if self.path.valid and self.is_better_path(self.path, iter_best_path):
                 iter_best_path = self.path
         if self.is_better_path(iter_best_path, self.best_path):
@@ -100,12 +128,8 @@ class MAACO(AS):
             + (1 / self.best_path.length)
         ) * 200
         t_min = t_max / 500
-        for r in self.t:
-            for s in self.t[r]:
-                self.t[r][s] *= 1 - self.rho
+        self.t.evaporate(self.rho)
         for k in range(self.m):
-            for r, s in self.paths[k].get():
-                self.t[r][s] += self.Q / self.paths[k].length
-        for r in self.t:
-            for s in self.t[r]:
-                self.t[r][s] = max(t_min, min(t_max, self.t[r][s]))
+            if len(self.paths[k]) > 1:
+                self.t.deposit(self.paths[k], self.Q / self.paths[k].length)
+        self.t.clip(t_min, t_max)
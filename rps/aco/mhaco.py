@@ -2,7 +2,8 @@ import numpy as np
 from typing_extensions import override
 from rps.dataclass import Point, LinkPath, RecordPath
 from .acs import ACS
-import random
+from .pheromone import EdgeTable, Pheromone
+from rps.dataclass.graph import DIR_DX, DIR_DY
 from math import ceil
 
 
@@ -18,6 +19,11 @@ def cos(vertex: Point, v1: Point, v2: Point) -> float:
 class ACO0(ACS):
     """
     多异体蚁群算法第一部分优化
+
+    参数含义见ACS. 旧版本中(alpha, beta, rho, t0)经ACS错位传递, 实际生效的是
+    alpha=beta, beta=rho, rho=t0, t0=10; 现在的默认值(alpha=4, beta=0.8, rho=1,
+    t0=10)即旧默认参数实际生效的值. 其中rho=1表示局部更新将经过的边的信息素
+    完全重置为t0
     """
 
     def __init__(
@@ -25,9 +31,9 @@ class ACO0(ACS):
         m: int = 20,
         nc: int = 30,
         alpha: float = 4,
-        beta: float = 4,
-        rho: float = 0.8,
-        t0: float = 1,
+        beta: float = 0.8,
+        rho: float = 1,
+        t0: float = 10,
         q0: float = 0.7,
         a: float = 10,
     ):
@@ -45,16 +51,29 @@ class ACO0(ACS):
         # 初始化信息素
         super().init_pher()
 
+    @override
+    def init_weights(self):
+        # 目标导向点为终点时cal_H与路径无关, 预先计算
+        xs, ys = np.indices(self.graph.size)
+        gx = (self.end.x - xs)[..., np.newaxis]
+        gy = (self.end.y - ys)[..., np.newaxis]
+        norm = np.hypot(DIR_DX, DIR_DY) * np.hypot(gx, gy)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            c = np.where(norm > 0, (DIR_DX * gx + DIR_DY * gy) / norm, 0)
+        self.H = EdgeTable(self.graph, self.a**c)
+
     @override
     def cal_P(self, r: Point, s: Point) -> float:
         return (
-            self.t[r][s] ** self.alpha
+            self.t.get(r, s) ** self.alpha
             * self.cal_H(r, s) ** self.beta
             * self.cal_F(r, s)
         )
 
     @override
     def cal_H(self, r: Point, s: Point) -> float:
+        if self.target == self.end:
+            return self.H.get(r, s)
         return self.a ** cos(r, s, self.target)
 
     def cal_F(self, r: Point, s: Point) -> float:
@@ -88,6 +107,7 @@ class ACO0(ACS):
     @override
     def iteration(self):
         self.iter_cnt += 1
+        self.update_weights()
         for self.k in range(self.m):
             self.tour(self.k)
         if self.is_better_path(self.iter_best_path, self.best_path):
@@ -155,9 +175,9 @@ class ACO2(ACO1):
         m: int = 20,
         nc: int = 30,
         alpha: float = 4,
-        beta: float = 4,
-        rho: float = 0.8,
-        t0: float = 1,
+        beta: float = 0.8,
+        rho: float = 1,
+        t0: float = 10,
         q0: float = 0.7,
         a: float = 10,
         alpha_2: float = 2,
@@ -182,7 +202,7 @@ class ACO2(ACO1):
             if self.group == 2:
                 o = (self.m - self.k) / self.m
             else:
-                o = random.random()
+                o = self.rand()
             r_pos = self.best_path.index(r)
             end_pos = len(self.best_path) - 1
             delta = end_pos - r_pos
@@ -193,19 +213,19 @@ class ACO2(ACO1):
     def cal_P(self, r: Point, s: Point) -> float:
         if self.group == 1:
             return (
-                self.t[r][s] ** self.alpha
+                self.t.get(r, s) ** self.alpha
                 * self.cal_H(r, s) ** self.beta
                 * self.cal_F(r, s)
             )
         elif self.group == 2:
             return (
-                self.t[r][s] ** self.alpha_2
+                self.t.get(r, s) ** self.alpha_2
                 * self.cal_H(r, s) ** self.beta_2
                 * self.cal_F(r, s)
             )
         else:
             return (
-                self.t[r][s] ** self.alpha_3
+                self.t.get(r, s) ** self.alpha_3
                 * self.cal_H(r, s) ** self.beta_3
                 * self.cal_F(r, s)
             )
@@ -214,6 +234,7 @@ class ACO2(ACO1):
     def iteration(self):
         self.begin = self.start
         self.iter_cnt += 1
+        self.update_weights()
         self.group = self.group_opt[self.iter_cnt % 6]
         for self.k in range(self.m):
             self.tour(self.k)
@@ -231,9 +252,9 @@ class ACO3(ACO2):
         m: int = 7,
         nc: int = 30,
         alpha: float = 4,
-        beta: float = 4,
-        rho: float = 0.8,
-        t0: float = 1,
+        beta: float = 0.8,
+        rho: float = 1,
+        t0: float = 10,
         q0: float = 0.7,
         a: float = 10,
         alpha_2: float = 2,
@@ -257,20 +278,18 @@ class ACO3(ACO2):
             self.best_paths[i].length = 1e6
             self.best_paths[i].turn_num = 1e6
         self.target = self.end
-        self.ts = [{} for _ in range(3)]
-        for r in self.edges:
-            for t in range(3):
-                self.ts[t][r] = {s: self.t0 for s in self.edges[r]}
+        self.ts = [Pheromone(self.graph, self.t0) for _ in range(3)]
 
     @override
     def cal_F(self, r: Point, s: Point) -> float:
-        res = self.ts[0][r][s] + self.ts[1][r][s]
-        res = self.t[r][s] / res
+        res = self.ts[0].get(r, s) + self.ts[1].get(r, s)
+        res = self.t.get(r, s) / res
         return res * super().cal_F(r, s)
 
     @override
     def iteration(self):
         self.iter_cnt += 1
+        self.update_weights()
         self.group = self.group_opt[self.iter_cnt % 6]
         for self.k in range(self.m):
             for self.tribe in range(3):
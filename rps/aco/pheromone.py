@@ -0,0 +1,150 @@
+import numpy as np
+from numpy.typing import NDArray
+from rps.dataclass import Point, Graph
+from rps.dataclass.graph import DIRS, DIR_SLOT
+
+
+class EdgeTable:
+    """
+    以 (width, length, 8) 数组存储的边上的值
+
+    第三维为移动方向, 顺序与 graph.DIRS 一致, 不存在的边取值恒为0.
+    用于信息素及预先计算的启发函数值
+
+    属性:
+        mask (NDArray[bool]): 各边是否存在, 见Graph.edge_mask
+        free (NDArray[bool]): 各点是否为通路
+        values (NDArray): 各边的取值
+        flat (NDArray): values 的 (width * length, 8) 视图, 以结点编号索引
+    """
+
+    def __init__(self, graph: Graph, value: float | NDArray = 0):
+        """
+        参数:
+            graph (Graph): 地图
+            value (float | NDArray): 初始值, 可为形状 (width, length)、(8,) 或
+                (width, length, 8) 的数组
+        """
+        self.mask = graph.edge_mask()
+        self.free = graph.free()
+        value = np.asarray(value, dtype=float)
+        if value.ndim == 2:
+            value = value[..., np.newaxis]
+        self.values = np.where(self.mask, value, 0.0)
+        self.flat = self.values.reshape(-1, 8)
+        # 用于逐个读写元素, 比直接索引数组快
+        self.view = memoryview(self.values)
+
+    def get(self, r: Point, s: Point) -> float:
+        """边(r, s)上的值"""
+        return self.view[r.x, r.y, DIR_SLOT[(s.x - r.x) * 3 + s.y - r.y + 4]]
+
+    def set(self, r: Point, s: Point, value: float) -> None:
+        """设置边(r, s)上的值"""
+        self.view[r.x, r.y, DIR_SLOT[(s.x - r.x) * 3 + s.y - r.y + 4]] = value
+
+    def index(self, path) -> tuple[NDArray, NDArray, NDArray]:
+        """路径上所有边在数组中的下标"""
+        xs, ys, ks = [], [], []
+        for r, s in path.get():
+            xs.append(r.x)
+            ys.append(r.y)
+            ks.append(DIR_SLOT[(s.x - r.x) * 3 + s.y - r.y + 4])
+        return (
+            np.array(xs, dtype=np.intp),
+            np.array(ys, dtype=np.intp),
+            np.array(ks, dtype=np.intp),
+        )
+
+
+class Pheromone(EdgeTable):
+    """
+    以 (width, length, 8) 数组存储的信息素
+
+    蒸发、沿路径释放、上下限约束均为整体的数组运算
+
+    运算::
+
+        假设 t: Pheromone, r: Point, s: Point (r的相邻点)
+        t[r][s] -> float        # 边(r, s)上的信息素, 同 t.get(r, s)
+        t[r][s] = value         # 设置边(r, s)上的信息素, 同 t.set(r, s, value)
+        for r in t              # 遍历地图中所有通路点
+        for s in t[r]           # 遍历r的所有可达相邻点
+    """
+
+    def __init__(self, graph: Graph, value: float | NDArray = 0):
+        super().__init__(graph, value)
+        self.tau = self.values
+        self.rows = {}
+
+    def __getitem__(self, r: Point) -> "PheromoneRow":
+        row = self.rows.get(r)
+        if row is None:
+            row = self.rows[r] = PheromoneRow(self, r)
+        return row
+
+    def __iter__(self):
+        for x, y in np.argwhere(self.free).tolist():
+            yield Point(x, y)
+
+    def __contains__(self, r: Point) -> bool:
+        return (
+            0 <= r.x < self.free.shape[0]
+            and 0 <= r.y < self.free.shape[1]
+            and bool(self.free[r.x, r.y])
+        )
+
+    def scale(self, factor: float) -> None:
+        """所有信息素乘以factor"""
+        self.tau *= factor
+
+    def evaporate(self, rho: float) -> None:
+        """以蒸发率rho蒸发所有信息素"""
+        self.tau *= 1 - rho
+
+    def deposit(self, path, amount: float) -> None:
+        """在路径的每条边上增加amount"""
+        np.add.at(self.tau, self.index(path), amount)
+
+    def blend(self, path, rho: float, value: float, t_min: float = None) -> None:
+        """路径上的每条边: t = max((1 - rho) * t + rho * value, t_min)"""
+        idx = self.index(path)
+        tau = (1 - rho) * self.tau[idx] + rho * value
+        if t_min is not None:
+            tau = np.maximum(tau, t_min)
+        self.tau[idx] = tau
+
+    def clip(self, t_min: float = None, t_max: float = None) -> None:
+        """将信息素限制在[t_min, t_max]内"""
+        np.clip(self.tau, t_min, t_max, out=self.tau, where=self.mask)
+
+
+class PheromoneRow:
+    """
+    Pheromone中某一点出发的所有边, 兼容 t[r][s] 的访问方式
+    """
+
+    __slots__ = ("view", "mask", "r", "x", "y")
+
+    def __init__(self, pher: Pheromone, r: Point):
+        self.view = pher.view
+        self.mask = pher.mask[r.x, r.y]
+        self.r = r
+        self.x = r.x
+        self.y = r.y
+
+    def __getitem__(self, s: Point) -> float:
+        return self.view[
+            self.x, self.y, DIR_SLOT[(s.x - self.x) * 3 + s.y - self.y + 4]
+        ]
+
+    def __setitem__(self, s: Point, value: float) -> None:
+        k = DIR_SLOT[(s.x - self.x) * 3 + s.y - self.y + 4]
+        self.view[self.x, self.y, k] = value
+
+    def __iter__(self):
+        for k in np.flatnonzero(self.mask).tolist():
+            yield self.r + DIRS[k]
+
+    def __len__(self):
+        return int(np.count_nonzero(self.mask))
@@ -1,4 +1,17 @@
 from .dijkstra import Dijkstra
 from .a_star import A_Star
+from .jps import JPS, JPS_Plus
+from .bidirectional import BiDijkstra, BiA_Star
+from .hpa_star import HPA_Star
+from .d_star_lite import D_Star_Lite
 
-__all__ = ["Dijkstra", "A_Star"]
+__all__ = [
+    "Dijkstra",
+    "A_Star",
+    "JPS",
+    "JPS_Plus",
+    "BiDijkstra",
+    "BiA_Star",
+    "HPA_Star",
+    "D_Star_Lite",
+]
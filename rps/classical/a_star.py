@@ -7,6 +7,16 @@ class MethodError(Exception):
     """算法不支持动态/静态显示"""
 
 
+def octile(node: int, end: int, length: int) -> float:
+    """两个整数结点间的对角线距离, 与 Point / Point 一致"""
+    l = abs(node // length - end // length)
+    w = abs(node % length - end % length)
+    if w > l:
+        l, w = w, l
+    res = 2**0.5 * w + l - w
+    return res if res else 0.01
+
+
 class A_Star_Base:
 
     CLASS = "A_STAR"
@@ -14,6 +24,7 @@ class A_Star_Base:
     def load_graph(self, graph: Graph):
         self.graph = graph
         self.edg = graph.edges  # 字典表示的图
+        self.csr = graph.csr  # CSR邻接表, 存在时以整数结点编号搜索
 
     def search(self):
         raise MethodError(f"{self.__class__.__name__} doesn't support search")
@@ -21,10 +32,29 @@ class A_Star_Base:
     def search_real_time(self):
         raise MethodError(f"{self.__class__.__name__} doesn't support search real time")
 
+    def _get_path_csr(self, fa: list[int]):
+        """由整数结点的父节点表fa生成路径"""
+        start = self.csr.node(self.graph.start)
+        p = self.csr.node(self.graph.end)
+        nodes = [p]
+        while p != start:
+            p = fa[p]
+            nodes.append(p)
+        self.path = Path()
+        for p in reversed(nodes):
+            self.path.append(self.csr.point(p))
+        self.best_path = self.path
+
 
 class A_Star(A_Star_Base):
 
-    def __init__(self) -> None:
+    def __init__(self, cost_to_go: bool = False) -> None:
+        """
+        参数:
+            cost_to_go (bool): 是否以Graph.cost_to_go(到终点的实际最短距离)作为
+                启发函数. 距离场按终点缓存, 同一终点的多次查找只需计算一次
+        """
+        self.cost_to_go = cost_to_go
         # 到起点的最短距离
         self.g = defaultdict(lambda: float("inf"))
         # 到终点的最短距离
@@ -37,8 +67,28 @@ class A_Star(A_Star_Base):
         self.fa = {}
         # 生成的路径
         self.path = None
+        # 扩展的点数
+        self.expanded = 0
+
+    def load_graph(self, graph: Graph):
+        super().load_graph(graph)
+        if self.cost_to_go:
+            field = graph.cost_to_go(graph.end)
+            self.h = lambda p: field[p.x, p.y]
+            # f相同时优先扩展距终点更近的点, 使扩展的点只位于一条最短路径上
+            self.f = lambda p: (round(self.g[p] + self.h(p), 9), self.h(p))
 
     def _search(self):
+        self.expanded = 0
+        # 已知起点与终点不连通时直接结束, path为None
+        if self.graph.unreachable():
+            return
+        if self.csr is not None:
+            yield from self._search_csr()
+            return
+        self.g = defaultdict(lambda: float("inf"))
+        self.close = set()
+        self.fa = {}
         self.g[self.graph.start] = 0
         open = []  # 待访问元素
         heappush(open, (0, self.graph.start))
@@ -46,6 +96,7 @@ class A_Star(A_Star_Base):
             _, r = heappop(open)
             if r in self.close:
                 continue
+            self.expanded += 1
             yield r
             if r == self.graph.end:
                 self._get_path()
@@ -59,6 +110,43 @@ class A_Star(A_Star_Base):
                     self.fa[s] = r
                 heappush(open, (self.f(s), s))
 
+    def _search_csr(self):
+        """
+        基于CSR邻接表, 以整数结点编号搜索. 距离等状态保存在局部变量中, 不影响
+        基于字典的搜索使用的self.g, self.fa与self.close
+        """
+        csr = self.csr
+        start = csr.node(self.graph.start)
+        end = csr.node(self.graph.end)
+        g = [float("inf")] * len(csr)
+        fa = [-1] * len(csr)
+        close = bytearray(len(csr))
+        g[start] = 0
+        h = None
+        if self.cost_to_go:
+            h = self.graph.cost_to_go(self.graph.end).ravel().tolist()
+        open = [(0, start)]
+        while open:
+            _, r = heappop(open)
+            if close[r]:
+                continue
+            self.expanded += 1
+            yield csr.point(r)
+            if r == end:
+                self._get_path_csr(fa)
+                return
+            close[r] = 1
+            for s, dist in zip(*csr.neighbors(r)):
+                if close[s]:
+                    continue
+                if g[s] > g[r] + dist:
+                    g[s] = g[r] + dist
+                    fa[s] = r
+                    if h is None:
+                        heappush(open, (g[s] + octile(s, end, csr.length), s))
+                    else:
+                        heappush(open, ((round(g[s] + h[s], 9), h[s]), s))
+
     def search(self, graph=None):
         if graph is not None:
             self.load_graph(graph)
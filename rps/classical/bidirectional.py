@@ -0,0 +1,109 @@
+from heapq import *
+from rps.dataclass import Path, Point
+from .a_star import A_Star_Base
+
+
+class BiDijkstra(A_Star_Base):
+    """
+    双向Dijkstra
+
+    从起点和终点同时搜索, 每次扩展待访问元素较少的一侧. 两侧堆顶之和不小于
+    当前最短相遇距离时结束, 此时相遇距离即为最短路径长度
+
+    属性:
+        expanded (int): 两侧共扩展的点数
+    """
+
+    def __init__(self):
+        # 两侧各点与起点/终点的距离
+        self.d = [{}, {}]
+        # 两侧各点的父节点
+        self.fa = [{}, {}]
+        # 两侧已访问节点
+        self.close = [set(), set()]
+        # 生成的路径
+        self.path = None
+        self.expanded = 0
+
+    def potential(self, p: Point) -> float:
+        """正向搜索的势函数, 反向搜索取相反数"""
+        return 0
+
+    def _search(self):
+        self.path = None
+        self.expanded = 0
+        if self.graph.unreachable():
+            return
+        start, end = self.graph.start, self.graph.end
+        self.d = [{start: 0}, {end: 0}]
+        self.fa = [{start: None}, {end: None}]
+        self.close = [set(), set()]
+        open = [[(self.potential(start), start)], [(-self.potential(end), end)]]
+        sign = (1, -1)
+        # 当前最短相遇距离及相遇点
+        best = 0 if start == end else float("inf")
+        meet = start if start == end else None
+        while open[0] and open[1]:
+            if open[0][0][0] + open[1][0][0] >= best:
+                break
+            i = 0 if len(open[0]) <= len(open[1]) else 1
+            _, r = heappop(open[i])
+            if r in self.close[i]:
+                continue
+            self.close[i].add(r)
+            self.expanded += 1
+            yield r
+            d, other = self.d[i], self.d[1 - i]
+            for s, dist in self.edg[r].items():
+                if d[r] + dist < d.get(s, float("inf")):
+                    d[s] = d[r] + dist
+                    self.fa[i][s] = r
+                    heappush(open[i], (d[s] + sign[i] * self.potential(s), s))
+                    if s in other and d[s] + other[s] < best:
+                        best = d[s] + other[s]
+                        meet = s
+        if meet is not None:
+            self._get_path(meet)
+
+    def _get_path(self, meet: Point):
+        """由相遇点两侧的父节点表生成路径"""
+        nodes = []
+        p = meet
+        while p is not None:
+            nodes.append(p)
+            p = self.fa[0][p]
+        nodes.reverse()
+        p = self.fa[1][meet]
+        while p is not None:
+            nodes.append(p)
+            p = self.fa[1][p]
+        self.path = Path()
+        for p in nodes:
+            self.path.append(p)
+        self.best_path = self.path
+
+    def search(self, graph=None):
+        if graph is not None:
+            self.load_graph(graph)
+        for _ in self._search():
+            pass
+        return self.path
+
+    def search_real_time(self):
+        return self._search()
+
+
+class BiA_Star(BiDijkstra):
+    """
+    双向A*
+
+    参考文献:
+    Ikeda T, Hsu M Y, Imai H, et al. A fast algorithm for finding better routes by AI search techniques[C]. Proceedings of VNIS'94. IEEE, 1994: 291-296.
+    https://doi.org/10.1109/VNIS.1994.396824
+
+    两侧使用平均势函数 p(v) = (h_end(v) - h_start(v)) / 2 与 -p(v),
+    两侧的约化边权相同且非负, 因此可沿用双向Dijkstra的结束条件
+    """
+
+    def potential(self, p: Point) -> float:
+        return (p / self.graph.end - p / self.graph.start) / 2
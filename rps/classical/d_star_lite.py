@@ -0,0 +1,212 @@
+from heapq import *
+from rps.dataclass import Path, Graph, Point
+from rps.dataclass.graph import ADJ_DIST, DIAG_DIST, DIRS
+from .a_star import A_Star_Base
+from .jps import LEGAL, neighbor_bits
+
+INF = float("inf")
+# 各方向的移动距离
+STEP_DIST = [ADJ_DIST] * 4 + [DIAG_DIST] * 4
+
+
+def octile(node: int, other: int, length: int) -> float:
+    """两个整数结点间的对角线距离, 两点重合时为0"""
+    dx = abs(node // length - other // length)
+    dy = abs(node % length - other % length)
+    if dx < dy:
+        dx, dy = dy, dx
+    return DIAG_DIST * dy + dx - dy
+
+
+class D_Star_Lite(A_Star_Base):
+    """
+    D* Lite 增量式路径规划
+
+    参考文献:
+    Koenig S, Likhachev M. D* Lite[C]. Proceedings of the Eighteenth National Conference on Artificial Intelligence. 2002: 476-483.
+
+    以终点为根反向搜索, 各点的g值为到终点的最短距离, 结点编号为 x * length + y.
+    load_graph时通过Graph.subscribe监听地图修改, 发生变化的点及其8个相邻点
+    (斜向移动的侧边点变化时, 以其为侧边点的边的两端均为其相邻点)在下次search时
+    更新邻居状态并重新计算rhs值, 只有受影响的区域会被再次扩展. 对同一张地图
+    再次调用load_graph不会清空搜索状态. 起点(机器人位置)沿路径移动后直接修改
+    graph.start 即可, 堆中的键值通过km修正而无需重建. 终点改变或地图被重新
+    加载时重新开始搜索. 邻接关系由各点8个邻居的通路状态得到, 不依赖graph.edges
+
+    属性:
+        g (list[float]): 各点到终点的最短距离
+        rhs (list[float]): 由相邻点g值得到的单步预测值
+        expanded (int): 最近一次search扩展的点数
+    """
+
+    def __init__(self) -> None:
+        self.graph = None
+        # 生成的路径
+        self.path = None
+        # 扩展的点数
+        self.expanded = 0
+        # 尚未处理的发生变化的点
+        self.changed = set()
+
+    def load_graph(self, graph: Graph):
+        if graph is self.graph:
+            # 同一张地图保留搜索状态, 修改已由on_change记录
+            return
+        if self.graph is not None:
+            self.graph.unsubscribe(self.on_change)
+        super().load_graph(graph)
+        graph.subscribe(self.on_change)
+        self.reset()
+
+    def reset(self) -> None:
+        """清空搜索状态, 下次search时重新搜索"""
+        graph = self.graph
+        self.length = length = graph.length
+        self.free = graph.free().ravel().tolist()
+        self.occ = neighbor_bits(graph).ravel().tolist()
+        self.offset = [dx * length + dy for dx, dy in DIRS]
+        self.goal = graph.end.x * length + graph.end.y
+        self.last = self.start = graph.start.x * length + graph.start.y
+        self.km = 0
+        n = graph.width * length
+        self.g = [INF] * n
+        self.rhs = [INF] * n
+        self.rhs[self.goal] = 0
+        # 堆中的元素 (键值, 结点), 结点的当前键值保存在keys中, 不一致的元素已失效
+        self.keys = {self.goal: self.key(self.goal)}
+        self.open = [(self.keys[self.goal], self.goal)]
+        self.changed = set()
+
+    def on_change(self, graph: Graph, cells: list[Point] | None) -> None:
+        """Graph的回调函数, 记录发生变化的点"""
+        if cells is None:
+            self.changed = None
+        elif self.changed is not None:
+            self.changed.update(cells)
+
+    def key(self, s: int) -> tuple[float, float]:
+        k = min(self.g[s], self.rhs[s])
+        # 舍去浮点误差, 使最短路径上的点与起点键值相同时仍能正确比较
+        return round(k + octile(self.start, s, self.length) + self.km, 9), round(k, 9)
+
+    def succ(self, u: int):
+        """u的可达相邻点及距离, u为障碍物时没有相邻点"""
+        if not self.free[u]:
+            return
+        legal = LEGAL[self.occ[u]]
+        offset = self.offset
+        for k in range(8):
+            if legal >> k & 1:
+                yield u + offset[k], STEP_DIST[k]
+
+    def update_vertex(self, u: int) -> None:
+        if u != self.goal:
+            g = self.g
+            self.rhs[u] = min((d + g[s] for s, d in self.succ(u)), default=INF)
+        if self.g[u] != self.rhs[u]:
+            k = self.key(u)
+            self.keys[u] = k
+            heappush(self.open, (k, u))
+        else:
+            self.keys.pop(u, None)
+
+    def _top(self):
+        """堆顶的有效元素, 堆为空时为None"""
+        open, keys = self.open, self.keys
+        while open and keys.get(open[0][1]) != open[0][0]:
+            heappop(open)
+        return open[0] if open else None
+
+    def _apply_changes(self) -> None:
+        """处理起点移动、终点改变及地图修改"""
+        graph, length = self.graph, self.length
+        if self.changed is None or graph.end.x * length + graph.end.y != self.goal:
+            self.reset()
+            return
+        start = graph.start.x * length + graph.start.y
+        if start != self.last:
+            self.km += octile(self.last, start, length)
+            self.last = self.start = start
+        if not self.changed:
+            return
+        affected = set()
+        for c in self.changed:
+            for dx, dy in ((0, 0),) + DIRS:
+                x, y = c.x + dx, c.y + dy
+                if 0 <= x < graph.width and 0 <= y < length:
+                    affected.add(x * length + y)
+        self.changed = set()
+        # 更新受影响点的通路及邻居状态, 只读取这些点, 与地图大小无关
+        grid, free, width = graph.graph, self.free, graph.width
+        for u in affected:
+            x, y = divmod(u, length)
+            free[u] = grid[x, y] == 0
+        for u in affected:
+            x, y = divmod(u, length)
+            occ = 0
+            for k, (dx, dy) in enumerate(DIRS):
+                if (
+                    0 <= x + dx < width
+                    and 0 <= y + dy < length
+                    and free[u + self.offset[k]]
+                ):
+                    occ |= 1 << k
+            self.occ[u] = occ
+        for u in affected:
+            self.update_vertex(u)
+
+    def _search(self):
+        self.path = None
+        self.expanded = 0
+        self._apply_changes()
+        start, length = self.start, self.length
+        g, rhs = self.g, self.rhs
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            k_old, u = top
+            if not (k_old < self.key(start) or rhs[start] != g[start]):
+                break
+            k_new = self.key(u)
+            if k_old < k_new:
+                self.keys[u] = k_new
+                heappush(self.open, (k_new, u))
+                continue
+            self.expanded += 1
+            yield Point(*divmod(u, length))
+            del self.keys[u]
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+            else:
+                g[u] = INF
+                self.update_vertex(u)
+            for s, _ in self.succ(u):
+                self.update_vertex(s)
+        self._get_path()
+
+    def _get_path(self):
+        """从起点沿g值下降最快的方向生成路径"""
+        start, g, length = self.start, self.g, self.length
+        if not self.free[start] or g[start] == INF:
+            return
+        self.path = Path()
+        self.path.append(Point(*divmod(start, length)))
+        p = start
+        # 在g值一致时每一步严格接近终点, 步数上限只用于防止死循环
+        for _ in range(len(g)):
+            if p == self.goal:
+                break
+            p = min(self.succ(p), key=lambda sd: sd[1] + g[sd[0]])[0]
+            self.path.append(Point(*divmod(p, length)))
+        self.best_path = self.path
+
+    def search(self, graph=None):
+        if graph is not None:
+            self.load_graph(graph)
+        for _ in self._search():
+            pass
+        return self.path
+
+    def search_real_time(self):
+        return self._search()
@@ -15,8 +15,20 @@ class Dijkstra(A_Star_Base):
         self.vis = set()
         # 生成的路径
         self.path = None
+        # 扩展的点数
+        self.expanded = 0
 
     def _search(self):
+        self.expanded = 0
+        # 已知起点与终点不连通时直接结束, path为None
+        if self.graph.unreachable():
+            return
+        if self.csr is not None:
+            yield from self._search_csr()
+            return
+        self.d = defaultdict(lambda: float("inf"))
+        self.fa = {}
+        self.vis = set()
         q = []  # 用于存储小根堆
         self.d[self.graph.start] = 0
         heappush(q, (0, self.graph.start))
@@ -24,6 +36,7 @@ class Dijkstra(A_Star_Base):
             d0, r = heappop(q)
             if r in self.vis:
                 continue
+            self.expanded += 1
             yield r
             self.vis.add(r)
             if r == self.graph.end:
@@ -35,6 +48,35 @@ class Dijkstra(A_Star_Base):
                     self.fa[s] = r
                     heappush(q, (self.d[s], s))
 
+    def _search_csr(self):
+        """
+        基于CSR邻接表, 以整数结点编号搜索. 距离等状态保存在局部变量中, 不影响
+        基于字典的搜索使用的self.d, self.fa与self.vis
+        """
+        csr = self.csr
+        start = csr.node(self.graph.start)
+        end = csr.node(self.graph.end)
+        d = [float("inf")] * len(csr)
+        fa = [-1] * len(csr)
+        vis = bytearray(len(csr))
+        d[start] = 0
+        q = [(0, start)]
+        while q:
+            d0, r = heappop(q)
+            if vis[r]:
+                continue
+            self.expanded += 1
+            yield csr.point(r)
+            vis[r] = 1
+            if r == end:
+                self._get_path_csr(fa)
+                return
+            for s, dist in zip(*csr.neighbors(r)):
+                if dist + d0 < d[s]:
+                    d[s] = d0 + dist
+                    fa[s] = r
+                    heappush(q, (d[s], s))
+
     def _get_path(self):
         p = self.graph.end
         self.path = Path()
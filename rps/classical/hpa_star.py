@@ -0,0 +1,442 @@
+import os
+from heapq import *
+import numpy as np
+from numpy.typing import NDArray
+from rps.dataclass import Path, Graph, Point
+from rps.dataclass.graph import ADJ_DIST, DIAG_DIST, DIRS
+from .a_star import A_Star_Base, octile
+from .jps import LEGAL, neighbor_bits
+
+# 各方向的移动距离
+STEP_DIST = [ADJ_DIST] * 4 + [DIAG_DIST] * 4
+
+
+class Abstraction:
+    """
+    HPA*的分块抽象图
+
+    地图被划分为 size x size 的区块. 相邻区块的公共边界上, 两侧均为通路的连续
+    格点构成一个入口, 长度小于 ENTRANCE_SPLIT 时在中点放置一对过渡点, 否则在两端
+    各放置一对. 过渡点之间的边包括跨越边界的一步移动和区块内部的最短距离.
+    斜向跨越边界的移动总可以由两次直线移动代替, 因此只考虑直线方向的入口
+
+    属性:
+        size (int): 区块边长
+        key (str): 地图摘要, 见Graph.content_key
+        adj (dict): 抽象图, adj[u][v] 为过渡点u到v的距离, 结点编号为 x * length + y
+    """
+
+    # 入口长度不小于该值时放置两对过渡点
+    ENTRANCE_SPLIT = 6
+
+    def __init__(self, graph: Graph, size: int = 10, key: str = None):
+        """
+        参数:
+            graph (Graph): 地图
+            size (int): 区块边长
+            key (str): 地图摘要, 未传入时计算
+        """
+        self.graph = graph
+        # 计算时地图的版本号, 见Graph.version
+        self.version = graph.version
+        self.size = size
+        self.key = graph.content_key() if key is None else key
+        self.width, self.length = graph.width, graph.length
+        self.occ = neighbor_bits(graph).ravel().tolist()
+        self.offset = [dx * self.length + dy for dx, dy in DIRS]
+        self.adj = {}
+        # 各区块内的过渡点
+        self.members = {}
+
+    def cluster(self, node: int) -> tuple[int, int]:
+        """结点所在区块的编号"""
+        x, y = divmod(node, self.length)
+        return x // self.size, y // self.size
+
+    def bounds(self, node: int) -> tuple[int, int, int, int]:
+        """结点所在区块的范围 (x0, y0, x1, y1), 不含x1与y1"""
+        cx, cy = self.cluster(node)
+        x0, y0 = cx * self.size, cy * self.size
+        return x0, y0, min(x0 + self.size, self.width), min(y0 + self.size, self.length)
+
+    def region(self, a: int, b: int) -> tuple[int, int, int, int] | None:
+        """
+        a与b所在区块相同或相邻(含斜向)时, 两个区块合并后的范围, 否则为None
+        """
+        (ax, ay), (bx, by) = self.cluster(a), self.cluster(b)
+        if abs(ax - bx) > 1 or abs(ay - by) > 1:
+            return None
+        size = self.size
+        x0, y0 = min(ax, bx) * size, min(ay, by) * size
+        x1 = min((max(ax, bx) + 1) * size, self.width)
+        y1 = min((max(ay, by) + 1) * size, self.length)
+        return x0, y0, x1, y1
+
+    def nodes_in(self, node: int) -> list[int]:
+        """与node位于同一区块的所有过渡点"""
+        return self.members.get(self.cluster(node), [])
+
+    def build(self) -> "Abstraction":
+        """计算过渡点及其间的距离"""
+        free = self.graph.free()
+        size, length = self.size, self.length
+        self.adj = {}
+        # 上下相邻区块之间的边界
+        for x in range(size, self.width, size):
+            both = free[x - 1] & free[x]
+            for lo, hi in self._runs(both, size):
+                for y in self._entrance(lo, hi):
+                    self._link((x - 1) * length + y, x * length + y, ADJ_DIST)
+        # 左右相邻区块之间的边界
+        for y in range(size, length, size):
+            both = free[:, y - 1] & free[:, y]
+            for lo, hi in self._runs(both, size):
+                for x in self._entrance(lo, hi):
+                    self._link(x * length + y - 1, x * length + y, ADJ_DIST)
+        self._group()
+        for nodes in self.members.values():
+            for i, u in enumerate(nodes):
+                dist, _ = self.search_cluster(u, targets=nodes[i + 1 :])
+                for v in nodes[i + 1 :]:
+                    if v in dist:
+                        self._link(u, v, dist[v])
+        return self
+
+    @staticmethod
+    def _runs(both, size: int):
+        """边界上两侧均为通路的连续区间 [lo, hi], 不跨越区块"""
+        lo = None
+        for i, ok in enumerate(both.tolist()):
+            if ok and lo is not None and i % size == 0:
+                yield lo, i - 1
+                lo = i
+            elif ok and lo is None:
+                lo = i
+            elif not ok and lo is not None:
+                yield lo, i - 1
+                lo = None
+        if lo is not None:
+            yield lo, len(both) - 1
+
+    def _entrance(self, lo: int, hi: int) -> tuple[int, ...]:
+        """入口[lo, hi]上放置过渡点的位置"""
+        if hi - lo + 1 < self.ENTRANCE_SPLIT:
+            return ((lo + hi) // 2,)
+        return lo, hi
+
+    def _link(self, u: int, v: int, dist: float) -> None:
+        self.adj.setdefault(u, {})[v] = dist
+        self.adj.setdefault(v, {})[u] = dist
+
+    def _group(self) -> None:
+        """按区块对过渡点分组"""
+        self.members = {}
+        for node in sorted(self.adj):
+            self.members.setdefault(self.cluster(node), []).append(node)
+
+    def search_cluster(self, src: int, targets=None, goal: int = -1, bounds=None):
+        """
+        只在src所在区块内搜索
+
+        参数:
+            src (int): 起始结点
+            targets (list[int]): 全部到达后结束的结点
+            goal (int): 目标结点, 不为-1时以对角线距离为启发函数搜索至goal
+            bounds (tuple): 搜索范围 (x0, y0, x1, y1), 默认为src所在区块
+
+        返回:
+            tuple[dict, dict]: 各点到src的距离及其父节点
+        """
+        x0, y0, x1, y1 = self.bounds(src) if bounds is None else bounds
+        occ, offset, length = self.occ, self.offset, self.length
+        remain = set(targets) if targets is not None else None
+        dist = {src: 0}
+        fa = {src: -1}
+        close = set()
+        open = [(0, src)]
+        while open:
+            _, r = heappop(open)
+            if r in close:
+                continue
+            close.add(r)
+            if r == goal:
+                break
+            if remain is not None:
+                remain.discard(r)
+                if not remain:
+                    break
+            rx, ry = divmod(r, length)
+            legal = LEGAL[occ[r]]
+            for k in range(8):
+                if not legal >> k & 1:
+                    continue
+                dx, dy = DIRS[k]
+                if not (x0 <= rx + dx < x1 and y0 <= ry + dy < y1):
+                    continue
+                s = r + offset[k]
+                d = dist[r] + STEP_DIST[k]
+                if d < dist.get(s, float("inf")):
+                    dist[s] = d
+                    fa[s] = r
+                    heappush(open, (d + octile(s, goal, length) if goal >= 0 else d, s))
+        return dist, fa
+
+    def arrays(self) -> tuple[NDArray, NDArray, NDArray]:
+        """抽象图的所有边 (src, dst, cost), 每条边只出现一次"""
+        src, dst, cost = [], [], []
+        for u, row in self.adj.items():
+            for v, d in row.items():
+                if u < v:
+                    src.append(u)
+                    dst.append(v)
+                    cost.append(d)
+        return (
+            np.array(src, dtype=np.int64),
+            np.array(dst, dtype=np.int64),
+            np.array(cost, dtype=float),
+        )
+
+    def from_arrays(self, src: NDArray, dst: NDArray, cost: NDArray) -> "Abstraction":
+        """由arrays的结果恢复抽象图"""
+        self.adj = {}
+        for u, v, d in zip(src.tolist(), dst.tolist(), cost.tolist()):
+            self._link(u, v, d)
+        self._group()
+        return self
+
+    def save(self, file: str) -> None:
+        """将抽象图保存至file (.npz格式, 不自动补全扩展名)"""
+        src, dst, cost = self.arrays()
+        with open(file, "wb") as f:
+            np.savez(f, key=self.key, size=self.size, src=src, dst=dst, cost=cost)
+
+    def load(self, file: str) -> bool:
+        """
+        从file加载抽象图
+
+        返回:
+            bool: 文件存在且与当前地图及区块大小一致时为True
+        """
+        if not os.path.exists(file):
+            return False
+        data = np.load(file)
+        if str(data["key"]) != self.key or int(data["size"]) != self.size:
+            return False
+        self.from_arrays(data["src"], data["dst"], data["cost"])
+        return True
+
+
+class HPA_Star(A_Star_Base):
+    """
+    分层A* (Hierarchical Path-Finding A*)
+
+    参考文献:
+    Botea A, Müller M, Schaeffer J. Near optimal hierarchical path-finding[J]. Journal of Game Development, 2004, 1(1): 1-30.
+
+    地图的分块抽象图(见Abstraction)只与障碍物分布有关, 每张地图只计算一次, 并以
+    "<地图名>.hpa<区块边长>" 保存在地图文件旁(不使用.npz扩展名, 以免出现在地图
+    列表中), 之后加载同一地图时直接读取. 查找时将起点与终点接入其所在区块的
+    过渡点, 在抽象图上执行A*, 再在经过的每个区块内搜索得到逐格的路径.
+    起点与终点位于同一或相邻区块时, 另在两个区块的范围内直接搜索一次, 作为
+    起点到终点的一条边参与比较. 展开后的路径再经过平滑(见_smooth).
+    路径长度不保证最短: 过渡点只位于入口中点或两端, 平滑只在局部替换路段.
+    在随机小地图上约15%的路径长于A*, 平均长约1%, 最差约为A*的1.5倍
+
+    属性:
+        expanded (int): 抽象图上扩展的点数
+    """
+
+    def __init__(self, cluster_size: int = 10, cache: bool = True) -> None:
+        """
+        参数:
+            cluster_size (int): 区块边长
+            cache (bool): 是否在地图文件旁保存/读取抽象图, 地图不是从文件加载时
+                使用Graph.cached
+        """
+        self.cluster_size = cluster_size
+        self.cache = cache
+        self.abstraction = None
+        # 生成的路径
+        self.path = None
+        # 扩展的点数
+        self.expanded = 0
+
+    def load_graph(self, graph: Graph):
+        super().load_graph(graph)
+        self.length = graph.length
+        abst = self.abstraction
+        reuse = abst is not None and abst.size == self.cluster_size
+        # 同一张地图未被修改时无需计算摘要
+        if reuse and abst.graph is graph and abst.version == graph.version:
+            return
+        key = graph.content_key()
+        if reuse and abst.key == key:
+            abst.graph, abst.version = graph, graph.version
+            return
+        abst = Abstraction(graph, self.cluster_size, key)
+        file = self.cache_file(graph)
+        if file is not None:
+            if not abst.load(file):
+                abst.build()
+                try:
+                    abst.save(file)
+                except OSError:
+                    # 地图目录不可写时只在内存中保留
+                    pass
+        elif self.cache:
+            # 不是从文件加载的地图使用Graph的衍生数据缓存
+            names = tuple(f"hpa{self.cluster_size}_{n}" for n in ("src", "dst", "cost"))
+            abst.from_arrays(*graph.cached(names, lambda: abst.build().arrays()))
+        else:
+            abst.build()
+        self.abstraction = abst
+
+    def cache_file(self, graph: Graph) -> str | None:
+        """抽象图的保存路径, 地图不是从文件加载时为None"""
+        if not self.cache or graph.file is None:
+            return None
+        return f"{os.path.splitext(graph.file)[0]}.hpa{self.cluster_size}"
+
+    def search(self, graph=None):
+        if graph is not None:
+            self.load_graph(graph)
+        for _ in self._search():
+            pass
+        return self.path
+
+    def search_real_time(self):
+        return self._search()
+
+    def _search(self):
+        self.path = None
+        self.expanded = 0
+        if self.graph.unreachable():
+            return
+        abst, length = self.abstraction, self.length
+        start = self.graph.start.x * length + self.graph.start.y
+        end = self.graph.end.x * length + self.graph.end.y
+        # 起点与终点接入所在区块的过渡点
+        start_links = self._links(start)
+        end_links = self._links(end)
+        region = abst.region(start, end)
+        if region is not None:
+            dist, _ = abst.search_cluster(start, goal=end, bounds=region)
+            if end in dist:
+                start_links[end] = dist[end]
+        g = {start: 0}
+        fa = {start: -1}
+        close = set()
+        open = [(octile(start, end, length), start)]
+        while open:
+            _, r = heappop(open)
+            if r in close:
+                continue
+            close.add(r)
+            self.expanded += 1
+            yield Point(*divmod(r, length))
+            if r == end:
+                self._get_path(fa, end)
+                return
+            nbrs = abst.adj.get(r, {}).items()
+            if r == start:
+                nbrs = list(nbrs) + list(start_links.items())
+            if r in end_links:
+                nbrs = list(nbrs) + [(end, end_links[r])]
+            for s, d in nbrs:
+                if s in close:
+                    continue
+                if g[r] + d < g.get(s, float("inf")):
+                    g[s] = g[r] + d
+                    fa[s] = r
+                    heappush(open, (g[s] + octile(s, end, length), s))
+
+    def _links(self, node: int) -> dict:
+        """node到所在区块内各过渡点的距离"""
+        nodes = [v for v in self.abstraction.nodes_in(node) if v != node]
+        if not nodes:
+            return {}
+        dist, _ = self.abstraction.search_cluster(node, targets=nodes)
+        return {v: dist[v] for v in nodes if v in dist}
+
+    def _get_path(self, fa: dict, end: int):
+        """将抽象路径在经过的区块内展开为逐格的路径"""
+        abst, length = self.abstraction, self.length
+        nodes = [end]
+        while fa[nodes[-1]] >= 0:
+            nodes.append(fa[nodes[-1]])
+        nodes.reverse()
+        cells = [nodes[0]]
+        for a, b in zip(nodes, nodes[1:]):
+            if abst.cluster(a) != abst.cluster(b) and b in abst.adj.get(a, ()):
+                # 跨越区块边界的一步
+                cells.append(b)
+                continue
+            # 区块内的边, 或起点到终点的直接连接
+            _, parent = abst.search_cluster(a, goal=b, bounds=abst.region(a, b))
+            seg = [b]
+            while parent[seg[-1]] != a:
+                seg.append(parent[seg[-1]])
+            cells.extend(reversed(seg))
+        self.path = Path()
+        for node in self._smooth(cells):
+            self.path.append(Point(*divmod(node, length)))
+        self.best_path = self.path
+
+    def _smooth(self, cells: list[int]) -> list[int]:
+        """
+        路径平滑: 从每个结点出发, 在其后2倍区块边长个结点内找到最远的、可以沿
+        直线与斜线以更短距离到达的结点, 替换中间的路段. 结果中不含重复结点
+        """
+        length = self.length
+        window = 2 * self.cluster_size
+        prefix = [0.0]
+        for a, b in zip(cells, cells[1:]):
+            prefix.append(prefix[-1] + octile(a, b, length))
+        res = [cells[0]]
+        index = {cells[0]: 0}
+        i, last = 0, len(cells) - 1
+        while i < last:
+            step, nxt = None, i + 1
+            for j in range(min(last, i + window), i + 1, -1):
+                if prefix[j] - prefix[i] > octile(cells[i], cells[j], length) + 1e-9:
+                    step = self._straight(cells[i], cells[j])
+                    if step is not None:
+                        nxt = j
+                        break
+            for node in step if step is not None else (cells[nxt],):
+                if node in index:
+                    # 回到已经过的结点, 去掉其间的环
+                    for p in res[index[node] + 1 :]:
+                        del index[p]
+                    del res[index[node] + 1 :]
+                else:
+                    index[node] = len(res)
+                    res.append(node)
+            i = nxt
+        return res
+
+    def _straight(self, a: int, b: int) -> list[int] | None:
+        """
+        从a先斜向再直线(或先直线再斜向)移动到b经过的结点(不含a), 两种走法均
+        被障碍物阻挡时为None
+        """
+        length, occ = self.length, self.abstraction.occ
+        dx = b // length - a // length
+        dy = b % length - a % length
+        sx, sy = (dx > 0) - (dx < 0), (dy > 0) - (dy < 0)
+        diag = min(abs(dx), abs(dy))
+        rest = max(abs(dx), abs(dy)) - diag
+        straight = (sx, 0) if abs(dx) > abs(dy) else (0, sy)
+        for order in ((sx, sy), straight), (straight, (sx, sy)):
+            moves = [order[0]] * (diag if order[0] == (sx, sy) else rest)
+            moves += [order[1]] * (rest if order[0] == (sx, sy) else diag)
+            node, res = a, []
+            for move in moves:
+                k = DIRS.index(move)
+                if not LEGAL[occ[node]] >> k & 1:
+                    break
+                node += move[0] * length + move[1]
+                res.append(node)
+            else:
+                return res
+        return None
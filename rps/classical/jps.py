@@ -0,0 +1,301 @@
+from heapq import *
+import numpy as np
+from numpy.typing import NDArray
+from rps.dataclass import Path, Graph, Point
+from rps.dataclass.graph import ADJ_DIST, DIAG_DIST, DIRS, DIR_SLOT, DIR_DIST
+from .a_star import A_Star_Base, octile
+
+
+def _legal(occ: int, k: int) -> bool:
+    """
+    邻居状态为occ时能否沿方向k移动, 规则与Graph.neighbors一致:
+    斜向移动时两侧相邻点至少有一个为通路
+    """
+    if not occ >> k & 1:
+        return False
+    dx, dy = DIRS[k]
+    if dx and dy:
+        return bool(
+            occ >> DIR_SLOT[(dx + 1) * 3 + 1] & 1 or occ >> DIR_SLOT[4 + dy] & 1
+        )
+    return True
+
+
+def _local_dist(occ: int, src: int, dst: int) -> float:
+    """在以x为中心的3x3区域内, 不经过x从邻居src到邻居dst的最短距离"""
+    dist = [float("inf")] * 8
+    dist[src] = 0
+    done = [False] * 8
+    for _ in range(8):
+        r = min((d, i) for i, d in enumerate(dist) if not done[i])[1]
+        if dist[r] == float("inf"):
+            break
+        done[r] = True
+        rx, ry = DIRS[r]
+        for s in range(8):
+            sx, sy = DIRS[s]
+            dx, dy = sx - rx, sy - ry
+            if done[s] or not occ >> s & 1 or max(abs(dx), abs(dy)) != 1:
+                continue
+            # 斜向移动的两侧点, x本身为通路
+            if dx and dy:
+                sides = [(rx + dx, ry), (rx, ry + dy)]
+                if not any(p == (0, 0) or occ >> DIRS.index(p) & 1 for p in sides):
+                    continue
+            d = dist[r] + (DIAG_DIST if dx and dy else ADJ_DIST)
+            dist[s] = min(dist[s], d)
+    return dist[dst]
+
+
+def _build_tables():
+    """
+    计算邻居裁剪表
+
+    occ为点x的8个邻居是否为通路(第k位对应方向DIRS[k]). 搜索沿方向k到达x时,
+    若存在不经过x、从父节点p到邻居n的路径, 且长度不超过(直线移动)或小于(斜向移动)
+    经过x的路径, 则n被裁剪. 返回:
+        LEGAL[occ]: 可移动方向的位掩码
+        SUCC[k][occ]: 沿方向k到达后需要继续搜索的方向, k = 8 表示起点
+        FORCED[k][occ]: 沿方向k到达后是否存在强制邻居
+    """
+    legal = [sum(_legal(occ, k) << k for k in range(8)) for occ in range(256)]
+    succ = [[None] * 256 for _ in range(9)]
+    for occ in range(256):
+        succ[8][occ] = [k for k in range(8) if legal[occ] >> k & 1]
+    for k, (dx, dy) in enumerate(DIRS):
+        back = DIR_SLOT[(1 - dx) * 3 + 1 - dy]
+        for occ in range(256):
+            # 父节点必为通路
+            o = occ | 1 << back
+            res = []
+            for n in range(8):
+                if n == back or not legal[o] >> n & 1:
+                    continue
+                via = DIR_DIST[k] + DIR_DIST[n]
+                alt = _local_dist(o, back, n)
+                if dx and dy:
+                    pruned = alt < via - 1e-9
+                else:
+                    pruned = alt <= via + 1e-9
+                if not pruned:
+                    res.append(n)
+            succ[k][occ] = res
+    natural = [sum(1 << n for n in succ[k][255]) for k in range(8)]
+    forced = [
+        [any(not natural[k] >> n & 1 for n in succ[k][occ]) for occ in range(256)]
+        for k in range(8)
+    ]
+    return legal, succ, forced, natural
+
+
+LEGAL, SUCC, FORCED, NATURAL = _build_tables()
+# 斜向跳跃时需要检查的两个直线方向
+STRAIGHT = [[n for n in range(4) if NATURAL[k] >> n & 1] for k in range(8)]
+
+
+def neighbor_bits(graph: Graph) -> NDArray:
+    """
+    地图中各点8个邻居的通路状态, 第k位对应方向DIRS[k], 地图外视为障碍物
+
+    返回:
+        NDArray: 形状为(width, length)的uint8矩阵
+    """
+    free = graph.neighbor_values(graph.free(), fill=0).astype(np.uint8)
+    return (free << np.arange(8, dtype=np.uint8)).sum(axis=2).astype(np.uint8)
+
+
+class JPS(A_Star_Base):
+    """
+    跳点搜索 (Jump Point Search)
+
+    参考文献:
+    Harabor D, Grastien A. Online graph pruning for pathfinding on grid maps[C]. Proceedings of the AAAI conference on artificial intelligence. 2011, 25(1): 1114-1119.
+    https://doi.org/10.1609/aaai.v25i1.7994
+
+    邻居裁剪规则由 _build_tables 按地图的斜向移动规则生成, 搜索只在跳点间进行,
+    生成的路径展开为逐格的Path, 长度与A*一致. search_real_time 生成被扩展的跳点
+    """
+
+    def __init__(self) -> None:
+        # 到起点的最短距离
+        self.g = {}
+        # 存放跳点的父跳点
+        self.fa = {}
+        # 已访问跳点
+        self.close = set()
+        # 生成的路径
+        self.path = None
+        # 扩展的跳点数
+        self.expanded = 0
+
+    def load_graph(self, graph: Graph):
+        super().load_graph(graph)
+        self.length = graph.length
+        self.occ = neighbor_bits(graph).ravel().tolist()
+        self.offset = [dx * graph.length + dy for dx, dy in DIRS]
+
+    def search(self, graph=None):
+        if graph is not None:
+            self.load_graph(graph)
+        for _ in self._search():
+            pass
+        return self.path
+
+    def search_real_time(self):
+        return self._search()
+
+    def _search(self):
+        self.path = None
+        self.expanded = 0
+        if self.graph.unreachable():
+            return
+        length = self.length
+        start = self.graph.start.x * length + self.graph.start.y
+        self.end = end = self.graph.end.x * length + self.graph.end.y
+        self.g = {start: 0}
+        self.fa = {start: -1}
+        self.close = set()
+        # 到达各跳点时的移动方向
+        dirs = {start: 8}
+        open = [(0, start)]
+        while open:
+            _, r = heappop(open)
+            if r in self.close:
+                continue
+            self.expanded += 1
+            yield Point(*divmod(r, length))
+            if r == end:
+                self._get_path()
+                return
+            self.close.add(r)
+            for s, k in self._successors(r, dirs[r]):
+                if s in self.close:
+                    continue
+                g = self.g[r] + octile(r, s, length)
+                if g < self.g.get(s, float("inf")):
+                    self.g[s] = g
+                    self.fa[s] = r
+                    dirs[s] = k
+                    heappush(open, (g + octile(s, end, length), s))
+
+    def _successors(self, r: int, k: int):
+        """从跳点r(沿方向k到达)出发的所有后继跳点及方向"""
+        for n in SUCC[k][self.occ[r]]:
+            s = self._jump(r, n)
+            if s >= 0:
+                yield s, n
+
+    def _jump(self, node: int, k: int) -> int:
+        """从node沿方向k跳跃, 返回跳点编号, 不存在时为-1"""
+        occ = self.occ
+        bit = 1 << k
+        off = self.offset[k]
+        forced = FORCED[k]
+        end = self.end
+        if k < 4:
+            while True:
+                if not LEGAL[occ[node]] & bit:
+                    return -1
+                node += off
+                if node == end or forced[occ[node]]:
+                    return node
+        a, b = STRAIGHT[k]
+        while True:
+            if not LEGAL[occ[node]] & bit:
+                return -1
+            node += off
+            if node == end or forced[occ[node]]:
+                return node
+            if self._jump(node, a) >= 0 or self._jump(node, b) >= 0:
+                return node
+
+    def _get_path(self):
+        """由父跳点表生成逐格的路径"""
+        nodes = [self.end]
+        while self.fa[nodes[-1]] >= 0:
+            nodes.append(self.fa[nodes[-1]])
+        nodes.reverse()
+        self.path = Path()
+        self.path.append(Point(*divmod(nodes[0], self.length)))
+        for a, b in zip(nodes, nodes[1:]):
+            (ax, ay), (bx, by) = divmod(a, self.length), divmod(b, self.length)
+            dx, dy = (bx > ax) - (bx < ax), (by > ay) - (by < ay)
+            for i in range(1, max(abs(bx - ax), abs(by - ay)) + 1):
+                self.path.append(Point(ax + i * dx, ay + i * dy))
+        self.best_path = self.path
+
+
+class JPS_Plus(JPS):
+    """
+    预先计算跳跃距离的跳点搜索 (JPS+)
+
+    参考文献:
+    Rabin S, Silva F. JPS+: An extreme A* speed optimization for static uniform cost grids[M]. Game AI Pro 2. 2015: 131-143.
+
+    load_graph 时为每个点的8个方向计算跳跃距离: 正数为到跳点的步数,
+    非正数的绝对值为到障碍物前可移动的步数. 搜索时由距离表直接得到后继跳点,
+    终点位于跳跃方向上时以终点(或与终点同行/列的点)作为后继
+    """
+
+    def load_graph(self, graph: Graph):
+        super().load_graph(graph)
+        (jumps,) = graph.cached(
+            ("jps_plus_jumps",),
+            lambda: (np.array(self._jump_table(), dtype=np.int32),),
+        )
+        self.jumps = jumps.tolist()
+
+    def _jump_table(self) -> list[int]:
+        """计算所有点在8个方向上的跳跃距离, 下标为 node * 8 + k"""
+        occ = self.occ
+        n = len(occ)
+        jumps = [0] * (n * 8)
+        width, length = self.graph.width, self.length
+        # 先计算直线方向, 斜向跳跃依赖直线方向的结果
+        for k, (dx, dy) in enumerate(DIRS):
+            bit = 1 << k
+            forced = FORCED[k]
+            off = self.offset[k]
+            a, b = STRAIGHT[k] if k >= 4 else (-1, -1)
+            # 沿方向k的下一点先于当前点计算
+            xs = range(width) if dx < 0 else range(width - 1, -1, -1)
+            ys = range(length) if dy < 0 else range(length - 1, -1, -1)
+            for x in xs:
+                for y in ys:
+                    node = x * length + y
+                    if not LEGAL[occ[node]] & bit:
+                        continue
+                    s = node + off
+                    if forced[occ[s]] or (
+                        k >= 4 and (jumps[s * 8 + a] > 0 or jumps[s * 8 + b] > 0)
+                    ):
+                        jumps[node * 8 + k] = 1
+                    else:
+                        j = jumps[s * 8 + k]
+                        jumps[node * 8 + k] = j + 1 if j > 0 else j - 1
+        return jumps
+
+    def _successors(self, r: int, k: int):
+        rx, ry = divmod(r, self.length)
+        ex, ey = divmod(self.end, self.length)
+        for n in SUCC[k][self.occ[r]]:
+            j = self.jumps[r * 8 + n]
+            dx, dy = DIRS[n]
+            dist = abs(j)
+            if n < 4:
+                # 终点位于该直线方向上且在障碍物之前
+                t = abs(ex - rx) + abs(ey - ry)
+                if (ex - rx, ey - ry) == (dx * t, dy * t) and 0 < t <= dist:
+                    yield self.end, n
+                elif j > 0:
+                    yield r + j * self.offset[n], n
+                continue
+            tx, ty = (ex - rx) * dx, (ey - ry) * dy
+            # 终点位于该斜向方向的象限内, 先移动到与终点同行或同列的点
+            if tx > 0 and ty > 0 and (tx <= dist or ty <= dist):
+                t = min(tx, ty)
+                yield r + t * self.offset[n], n
+                if j > t:
+                    yield r + j * self.offset[n], n
+            elif j > 0:
+                yield r + j * self.offset[n], n
@@ -8,3 +8,15 @@ DEFAULT_ALG = "MHACO"
 
 # 默认数据库配置
 SQLITE_DB = "rps.db"
+
+# 地图衍生数据(邻接表、距离场等)的磁盘缓存配置, 见rps.dataclass.cache
+ARTIFACT_CACHE_ENABLED = True
+ARTIFACT_CACHE_DIR = ".rps_cache"
+ARTIFACT_CACHE_MAX_BYTES = 1 << 30
+# 方格数少于该值的地图直接计算, 不读写缓存
+ARTIFACT_CACHE_MIN_CELLS = 1 << 16
+
+# batch_run等函数的运行结果缓存, 保存在RESULT_CACHE_DB的batch_result表中(首次使用时
+# 创建), 见rps.utils.result_cache
+RESULT_CACHE_ENABLED = True
+RESULT_CACHE_DB = ".rps_results.db"
@@ -1,6 +1,8 @@
 from .point import Point, LinkPoint
 from .vector import Dir
-from .path import Path, LinkPath, RecordPath
+from .path import Path, LinkPath, RecordPath, VisitedMarks
+from .csr import CSRGraph
+from .cache import ArtifactCache
 from .graph import Graph
 from .canvas import Map
 
@@ -11,6 +13,9 @@ __all__ = [
     "Path",
     "LinkPath",
     "RecordPath",
+    "VisitedMarks",
+    "CSRGraph",
+    "ArtifactCache",
     "Graph",
     "Map",
 ]
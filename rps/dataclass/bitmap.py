@@ -0,0 +1,135 @@
+import struct
+import numpy as np
+from numpy.typing import NDArray
+from .point import Point
+
+# 位压缩地图文件的扩展名
+BITMAP_EXT = ".bmap"
+# 文件头: 标识, 版本, 宽度, 长度, 起点, 终点, 其余字节保留为0
+MAGIC = b"RPSBMAP"
+VERSION = 1
+HEADER = struct.Struct("<7sBqqqqqq")
+HEADER_SIZE = 64
+
+
+class BitGrid:
+    """
+    按位存储的地图矩阵, 每个方格占1位(1为障碍物), 每行按字节对齐
+
+    可替代Graph.graph中的numpy数组: 支持 len(grid)、grid[x]、grid[x, y]、
+    grid[x] = row、grid[x, y] = value 及 np.asarray(grid). grid[x] 返回该行
+    解压后的副本, 修改单个方格需使用 grid[x, y] = value
+
+    属性:
+        bits (NDArray[uint8]): 形状为 (width, ceil(length / 8)) 的压缩数据,
+            可为np.memmap
+        shape (tuple[int, int]): (width, length)
+    """
+
+    dtype = np.dtype(np.uint8)
+    ndim = 2
+
+    def __init__(self, bits: NDArray, length: int):
+        self.bits = bits
+        self.shape = (len(bits), length)
+
+    @classmethod
+    def from_array(cls, grid: NDArray) -> "BitGrid":
+        """由0/1矩阵生成"""
+        grid = np.asarray(grid)
+        return cls(np.packbits(grid != 0, axis=1), grid.shape[1])
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            x, y = key
+            return int(self.bits[x, y >> 3]) >> (7 - (y & 7)) & 1
+        return np.unpackbits(self.bits[key], axis=-1, count=self.shape[1])
+
+    def __setitem__(self, key, value):
+        if isinstance(key, tuple):
+            x, y = key
+            mask = 1 << (7 - (y & 7))
+            byte = int(self.bits[x, y >> 3])
+            self.bits[x, y >> 3] = byte | mask if value else byte & ~mask
+            return
+        row = np.broadcast_to(np.asarray(value) != 0, (self.shape[1],))
+        self.bits[key] = np.packbits(row)
+
+    def __iter__(self):
+        for x in range(self.shape[0]):
+            yield self[x]
+
+    def __array__(self, dtype=None, copy=None):
+        grid = np.unpackbits(self.bits, axis=1, count=self.shape[1])
+        return grid if dtype is None else grid.astype(dtype)
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+
+def save_bitmap(file: str, grid, start: Point, end: Point, chunk: int = 4096) -> None:
+    """
+    将地图保存为位压缩格式
+
+    参数:
+        file (str): 文件路径
+        grid (NDArray | BitGrid): 0和1构成的矩阵
+        start (Point): 起点
+        end (Point): 终点
+        chunk (int): 每次压缩的行数, 限制转换时的内存占用
+    """
+    width, length = grid.shape
+    header = HEADER.pack(MAGIC, VERSION, width, length, start.x, start.y, end.x, end.y)
+    with open(file, "wb") as f:
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        if isinstance(grid, BitGrid):
+            f.write(np.ascontiguousarray(grid.bits).tobytes())
+            return
+        for i in range(0, width, chunk):
+            f.write(np.packbits(np.asarray(grid[i : i + chunk]) != 0, axis=1).tobytes())
+
+
+def read_header(file: str) -> tuple[int, int, Point, Point]:
+    """
+    读取位压缩地图的文件头
+
+    返回:
+        tuple: (width, length, start, end)
+    """
+    with open(file, "rb") as f:
+        data = f.read(HEADER_SIZE)
+    if len(data) < HEADER_SIZE:
+        raise ValueError(f"Not a bitmap file: {file}")
+    magic, version, width, length, sx, sy, ex, ey = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"Not a bitmap file: {file}")
+    if version != VERSION:
+        raise ValueError(f"Unsupported bitmap version: {version}")
+    return width, length, Point(sx, sy), Point(ex, ey)
+
+
+def open_bitmap(file: str, mode: str = "r") -> tuple[BitGrid, Point, Point]:
+    """
+    以内存映射打开位压缩地图, 只读取文件头
+
+    参数:
+        file (str): 文件路径
+        mode (str): np.memmap的打开方式, "r"为只读(可在多个进程间共享),
+            "c"为写时复制, "r+"为直接修改文件
+
+    返回:
+        tuple: (grid, start, end)
+    """
+    width, length, start, end = read_header(file)
+    bits = np.memmap(
+        file,
+        dtype=np.uint8,
+        mode=mode,
+        offset=HEADER_SIZE,
+        shape=(width, (length + 7) // 8),
+    )
+    return BitGrid(bits, length), start, end
@@ -0,0 +1,139 @@
+import os
+import shutil
+import hashlib
+import numpy as np
+from numpy.typing import NDArray
+from rps.config import (
+    ARTIFACT_CACHE_DIR,
+    ARTIFACT_CACHE_ENABLED,
+    ARTIFACT_CACHE_MAX_BYTES,
+)
+
+
+def content_key(*arrays) -> str:
+    """由数组的类型、形状及内容计算的摘要"""
+    h = hashlib.sha1()
+    for a in arrays:
+        a = np.ascontiguousarray(a)
+        h.update(f"{a.dtype.str}{a.shape}".encode())
+        h.update(a.tobytes())
+    return h.hexdigest()
+
+
+class ArtifactCache:
+    """
+    地图衍生数据的磁盘缓存
+
+    每个键对应目录 root/<key>, 其中每项数据保存为一个 .npy 文件, 读取时以
+    只读内存映射打开. 目录的修改时间记录最近一次读写, 总大小超过max_bytes时
+    按最近最少使用的顺序删除整个目录. 写入先写临时文件再重命名, 多个进程
+    同时读写同一缓存目录是安全的
+
+    属性:
+        root (str): 缓存目录
+        max_bytes (int): 缓存总大小上限
+        hits (int): 命中次数
+        misses (int): 未命中次数
+    """
+
+    def __init__(
+        self, root: str = ARTIFACT_CACHE_DIR, max_bytes: int = ARTIFACT_CACHE_MAX_BYTES
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _file(self, key: str, name: str) -> str:
+        return os.path.join(self.root, key, name + ".npy")
+
+    def get(self, key: str, name: str) -> NDArray | None:
+        """读取数据, 不存在时为None"""
+        file = self._file(key, name)
+        try:
+            try:
+                data = np.load(file, mmap_mode="r")
+            except ValueError:
+                # 空数组无法内存映射
+                data = np.load(file)
+            os.utime(os.path.dirname(file))
+        except (FileNotFoundError, EOFError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, key: str, name: str, data: NDArray) -> None:
+        """写入数据并按大小淘汰旧数据"""
+        file = self._file(key, name)
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+        tmp = f"{file}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, np.asarray(data))
+        os.replace(tmp, file)
+        os.utime(os.path.dirname(file))
+        self.evict(keep=key)
+
+    def fetch(self, key: str, names: tuple[str, ...], compute) -> tuple:
+        """
+        读取一组数据, 任一项不存在时调用compute()计算并写入
+
+        参数:
+            key (str): 键
+            names (tuple[str]): 各项数据的名称
+            compute: 无参数函数, 返回与names对应的数组元组
+
+        返回:
+            tuple: 各项数据
+        """
+        res = []
+        for name in names:
+            data = self.get(key, name)
+            if data is None:
+                break
+            res.append(data)
+        else:
+            return tuple(res)
+        res = compute()
+        try:
+            for name, data in zip(names, res):
+                self.put(key, name, data)
+        except OSError:
+            # 缓存目录不可写时只返回计算结果
+            pass
+        return res
+
+    def entries(self) -> list[tuple[float, int, str]]:
+        """所有缓存目录的 (最近使用时间, 大小, 路径)"""
+        res = []
+        if not os.path.isdir(self.root):
+            return res
+        for key in os.listdir(self.root):
+            path = os.path.join(self.root, key)
+            try:
+                mtime = os.path.getmtime(path)
+                size = sum(e.stat().st_size for e in os.scandir(path) if e.is_file())
+            except OSError:
+                continue
+            res.append((mtime, size, path))
+        return res
+
+    def evict(self, keep: str = None) -> None:
+        """删除最近最少使用的数据, 直到总大小不超过max_bytes"""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if keep is not None and os.path.basename(path) == keep:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self) -> None:
+        """删除所有缓存"""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+# 未指定时Graph使用的缓存, 为None时不缓存
+DEFAULT_CACHE = ArtifactCache() if ARTIFACT_CACHE_ENABLED else None
@@ -23,13 +23,16 @@ class Map:
 
         self.fig, self.ax = plt.subplots(figsize=figsize)
 
-    def load(self, name: str = "default", path: str = Graph.SAVE_DIR):
+    def load(
+        self, name: str = "default", path: str = Graph.SAVE_DIR, backend: str = "dict"
+    ):
         """
         加载本地地图文件, 默认路径为maps/
 
         参数:
             name (str): 地图名, 默认为'default'
             path (str): 地图文件夹路径, 默认为'maps'
+            backend (str): 邻接表存储方式, 见Graph.BACKENDS
         """
         name = name + ".npz"
         file = os.path.join(path, name)
@@ -37,21 +40,24 @@ class Map:
         graph = data["graph"]
         start = Point(int(data["start"][0]), int(data["start"][1]))
         end = Point(int(data["end"][0]), int(data["end"][1]))
-        self.graph = Graph(graph, start, end)
+        self.graph = Graph(graph, start, end, backend=backend)
         self.graph.edges = self.graph.get_all_edges()
         self._draw_map()
 
-    def random_map(self, size: tuple = (20, 20), alpha: float = 0.2):
+    def random_map(
+        self, size: tuple = (20, 20), alpha: float = 0.2, backend: str = "dict"
+    ):
         """
         生成随机地图
 
         参数:
             size (tuple): 表示地图尺寸: (width, length)
             alpha (float): 障碍物数/地图方格数, 0 < alpha < 1
+            backend (str): 邻接表存储方式, 见Graph.BACKENDS
         """
         start = Point(0, 0)
         end = Point(size[0] - 1, size[1] - 1)
-        graph = Graph(np.zeros(size), start, end)
+        graph = Graph(np.zeros(size, dtype=np.uint8), start, end, backend=backend)
 
         # 生成下一点
         def random_move(point: Point):
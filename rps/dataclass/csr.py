@@ -0,0 +1,180 @@
+from collections import OrderedDict
+from collections.abc import Mapping
+import numpy as np
+from numpy.typing import NDArray
+from .point import Point
+
+
+class CSRGraph:
+    """
+    压缩稀疏行(CSR)格式存储的邻接表
+
+    地图中的每个方格对应一个整数结点, 编号为 x * length + y,
+    障碍物结点的邻居为空
+
+    属性:
+        width (int): 地图宽度
+        length (int): 地图长度
+        indptr (NDArray[int32]): 结点i的邻居位于 indices[indptr[i]:indptr[i + 1]]
+        indices (NDArray[int32]): 邻居结点编号
+        weights (NDArray[float32]): 对应边的长度
+        free (NDArray[bool]): 各结点是否为通路
+        slots (NDArray[uint8]): 对应边的方向序号, 见graph.DIRS
+        patched (dict): 经update修改的结点的邻居, 优先于上述数组, compact后清空
+    """
+
+    def __init__(
+        self,
+        width: int,
+        length: int,
+        indptr: NDArray,
+        indices: NDArray,
+        weights: NDArray,
+        free: NDArray,
+        slots: NDArray = None,
+    ):
+        self.width = width
+        self.length = length
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.free = free
+        self.slots = slots
+        self.patched = {}
+
+    @classmethod
+    def from_graph(cls, graph) -> "CSRGraph":
+        """由地图的edge_arrays生成CSR邻接表"""
+        indptr, indices, slots, weights = graph.edge_arrays()
+        return cls(
+            graph.width,
+            graph.length,
+            indptr,
+            indices,
+            weights.astype(np.float32),
+            graph.free().ravel(),
+            slots,
+        )
+
+    def __len__(self):
+        return self.width * self.length
+
+    @property
+    def num_edges(self) -> int:
+        self.compact()
+        return len(self.indices)
+
+    def node(self, point: Point) -> int:
+        """点对应的结点编号"""
+        return point.x * self.length + point.y
+
+    def point(self, node: int) -> Point:
+        """结点编号对应的点"""
+        return Point(*divmod(node, self.length))
+
+    def neighbors(self, node: int) -> tuple[list[int], list[float]]:
+        """结点的所有邻居编号及距离"""
+        row = self.patched.get(node)
+        if row is not None:
+            return row[0], row[1]
+        a, b = self.indptr[node], self.indptr[node + 1]
+        return self.indices[a:b].tolist(), self.weights[a:b].tolist()
+
+    def update(
+        self, node: int, free: bool, indices: list, weights: list, slots: list
+    ) -> None:
+        """
+        修改结点的邻居, 不重建数组
+
+        参数:
+            node (int): 结点编号
+            free (bool): 结点是否为通路
+            indices (list[int]): 邻居结点编号
+            weights (list[float]): 对应边的长度
+            slots (list[int]): 对应边的方向序号
+        """
+        # 与weights数组的精度保持一致
+        weights = np.asarray(weights, dtype=self.weights.dtype).tolist()
+        self.patched[node] = (list(indices), weights, list(slots))
+        self.free[node] = free
+
+    def compact(self) -> None:
+        """将update的修改合并至数组"""
+        if not self.patched:
+            return
+        deg = np.diff(self.indptr)
+        nodes = np.fromiter(self.patched, dtype=np.int64, count=len(self.patched))
+        deg[nodes] = [len(row[0]) for row in self.patched.values()]
+        indptr = np.zeros_like(self.indptr)
+        np.cumsum(deg, out=indptr[1:])
+        keep = np.ones(len(self.indices), dtype=bool)
+        for node in self.patched:
+            keep[self.indptr[node] : self.indptr[node + 1]] = False
+        # 未修改结点的边按原顺序填入新位置
+        old = np.repeat(np.arange(len(self)), np.diff(self.indptr))[keep]
+        pos = indptr[old] + (np.arange(len(old)) - np.searchsorted(old, old))
+        indices = np.empty(indptr[-1], dtype=self.indices.dtype)
+        weights = np.empty(indptr[-1], dtype=self.weights.dtype)
+        slots = np.empty(indptr[-1], dtype=np.uint8)
+        indices[pos] = self.indices[keep]
+        weights[pos] = self.weights[keep]
+        if self.slots is not None:
+            slots[pos] = self.slots[keep]
+        for node, (ind, w, sl) in self.patched.items():
+            a = indptr[node]
+            indices[a : a + len(ind)] = ind
+            weights[a : a + len(ind)] = w
+            slots[a : a + len(ind)] = sl
+        self.indptr, self.indices, self.weights = indptr, indices, weights
+        self.slots = slots if self.slots is not None else None
+        self.patched = {}
+
+    def degree(self) -> NDArray:
+        """所有结点的度"""
+        self.compact()
+        return np.diff(self.indptr)
+
+
+class CSREdges(Mapping):
+    """
+    CSR邻接表的字典视图, 兼容 edges[r][s] 的访问方式
+
+    edges[r] 在首次访问时由CSR生成, 最近使用的maxsize个点保存在LRU缓存中
+
+    属性:
+        csr (CSRGraph): 邻接表
+        maxsize (int): 最多缓存的点数
+    """
+
+    def __init__(self, csr: CSRGraph, maxsize: int = 1 << 16):
+        self.csr = csr
+        self.maxsize = maxsize
+        self.rows = OrderedDict()
+
+    def __getitem__(self, r: Point) -> dict:
+        row = self.rows.get(r)
+        if row is not None:
+            self.rows.move_to_end(r)
+            return row
+        if r not in self:
+            raise KeyError(r)
+        indices, weights = self.csr.neighbors(self.csr.node(r))
+        row = {self.csr.point(s): w for s, w in zip(indices, weights)}
+        self.rows[r] = row
+        if len(self.rows) > self.maxsize:
+            self.rows.popitem(last=False)
+        return row
+
+    def __contains__(self, r) -> bool:
+        if not isinstance(r, Point):
+            return False
+        if 0 <= r.x < self.csr.width and 0 <= r.y < self.csr.length:
+            return bool(self.csr.free[self.csr.node(r)])
+        return False
+
+    def __iter__(self):
+        for node in np.flatnonzero(self.csr.free).tolist():
+            yield self.csr.point(node)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.csr.free))
@@ -1,8 +1,15 @@
 import os
+from heapq import heappush, heappop
 from time import time
+from collections import OrderedDict
+from collections.abc import Mapping
 import numpy as np
 from numpy.typing import NDArray
 from .point import Point
+from .csr import CSRGraph, CSREdges
+from .cache import DEFAULT_CACHE, content_key
+from .bitmap import BITMAP_EXT, open_bitmap, save_bitmap
+from rps.config import ARTIFACT_CACHE_MIN_CELLS
 
 
 # 相邻点距离
@@ -13,15 +20,38 @@ DIAG_DIST = 2**0.5
 ADJ = {(0, 1): 0b1000, (0, -1): 0b0100, (1, 0): 0b0010, (-1, 0): 0b0001}
 DIAG = {0b1010: (1, 1), 0b1001: (-1, 1), 0b0110: (1, -1), 0b0101: (-1, -1)}
 
+# 8个移动方向, 顺序与neighbors生成相邻点的顺序一致
+DIRS = ((0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (-1, 1), (1, -1), (-1, -1))
+DIR_DX = np.array([d[0] for d in DIRS])
+DIR_DY = np.array([d[1] for d in DIRS])
+DIR_DIST = np.array([ADJ_DIST] * 4 + [DIAG_DIST] * 4)
+# 相邻点坐标差(dx, dy) -> 方向序号, 下标为 (dx + 1) * 3 + dy + 1
+DIR_SLOT = [DIRS.index((i // 3 - 1, i % 3 - 1)) if i != 4 else -1 for i in range(9)]
+
 
 class Graph:
     """
     表示一张地图数据
 
     属性:
-        graph: np.ndarray, 0和1构成的矩阵, 1表示障碍物, 0表示通路
+        graph: np.ndarray | BitGrid, 0和1构成的矩阵, 1表示障碍物, 0表示通路.
+            从位压缩地图文件(.bmap)加载时为内存映射的BitGrid
         start: Point, 路径起始点
         end: Point, 路径目标点
+        backend: str, 邻接表的存储方式
+            "dict": 以Point为键的嵌套字典
+            "csr": 整数结点编号的CSR数组(见CSRGraph), edges为其字典视图
+            "lazy": 不预先计算, edges[r]在首次访问时计算并缓存(见LazyEdges)
+        csr: CSRGraph, CSR邻接表(仅"csr"方式)
+        dist_field: NDArray, obstacle_distance的缓存, 地图修改后置为None
+        cost_fields: dict, cost_to_go的缓存, 以目标点为键, 地图修改后清空
+        labels: NDArray, components的缓存, 地图修改后置为None
+        pruned_graph: Graph, pruned的缓存, 地图修改后置为None
+        pruned_ends: tuple, 计算pruned_graph时的起点与终点, 起终点改变后缓存失效
+        file: str, 最近一次加载或保存的地图文件路径, 用于在地图旁保存预处理结果
+        listeners: list, 地图修改时被调用的回调函数, 见subscribe
+        version: int, 地图版本号, 每次修改地图或重新生成邻接表时加1
+        cache: ArtifactCache, 衍生数据的磁盘缓存, 为None时不缓存, 见cached
 
     运算::
 
@@ -29,14 +59,30 @@ class Graph:
         p in g -> bool      # 判断点p是否位于地图中且不为障碍物
         g[p] -> int         # 判断地图中的p点是否为通路(非障碍物)
         g[p] = 0 | 1        # 设置地图中点p的值
+        g[x] = row          # 设置地图中第x行的值
         g[x][y] -> int      # 判断地图中的点(x, y)是否为通路
-        g[x][y] = 0 | 1     # 设置地图中点(x, y)的值
+        g[x][y] = 0 | 1     # 设置地图中点(x, y)的值 (不清空缓存, 不通知listeners)
     """
 
     # 地图文件保存路径
     SAVE_DIR = os.path.join(os.getcwd(), "maps")
 
-    def __init__(self, graph: NDArray = None, start=None, end=None):
+    # 邻接表存储方式
+    BACKENDS = ("dict", "csr", "lazy")
+
+    # "lazy"及"csr"方式的字典视图最多缓存的点数
+    LAZY_CACHE_SIZE = 1 << 16
+
+    def __init__(self, graph: NDArray = None, start=None, end=None, backend="dict"):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+        self.backend = backend
+        self.csr = None
+        self.file = None
+        self.listeners = []
+        self.version = 0
+        self.cache = DEFAULT_CACHE
+        self.reset_fields()
         if graph is not None and start is not None and end is not None:
             self.graph = graph
             self.start = start
@@ -50,22 +96,93 @@ class Graph:
         if isinstance(key, int):
             return self.graph[key]
         if isinstance(key, Point):
-            return self.graph[key.x][key.y]
+            return self.graph[key.x, key.y]
 
     def __setitem__(self, key, value):
+        self.reset_fields()
+        cells = []
         if isinstance(key, int):
+            old = np.array(self.graph[key])
             self.graph[key] = value
+            changed = np.flatnonzero(old != np.asarray(self.graph[key])).tolist()
+            cells = [Point(key, y) for y in changed]
         elif isinstance(key, Point):
-            self.graph[key.x][key.y] = value
+            old = self.graph[key.x, key.y]
+            self.graph[key.x, key.y] = value
+            if old != self.graph[key.x, key.y]:
+                cells = [key]
+        if cells:
+            self.update_edges(cells)
+            self.version += 1
+            self.notify(cells)
+
+    def update_edges(self, cells: list[Point]) -> None:
+        """
+        重新计算cells及其8个相邻点的邻接表, 其余点的边不受影响:
+        点的取值只影响与其相连的边, 以及以其为侧边点的斜向边, 这些边的两端
+        均为其相邻点. "csr"方式的邻接表尚未生成时不做处理
+
+        参数:
+            cells (list[Point]): 取值发生变化的点
+        """
+        affected = set()
+        for c in cells:
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    if 0 <= c.x + dx < self.width and 0 <= c.y + dy < self.length:
+                        affected.add(Point(c.x + dx, c.y + dy))
+        if self.backend == "csr":
+            if self.csr is None:
+                return
+            for p in affected:
+                row = list(self.neighbors(p)) if p in self else []
+                self.csr.update(
+                    self.csr.node(p),
+                    p in self,
+                    [self.csr.node(s) for s, _ in row],
+                    [d for _, d in row],
+                    [DIR_SLOT[(s.x - p.x) * 3 + s.y - p.y + 4] for s, _ in row],
+                )
+                self.edges.rows.pop(p, None)
+        elif self.backend == "lazy":
+            for p in affected:
+                self.edges.rows.pop(p, None)
+        else:
+            for p in affected:
+                if p in self:
+                    self.edges[p] = {s: d for s, d in self.neighbors(p)}
+                else:
+                    self.edges.pop(p, None)
+
+    def subscribe(self, callback) -> None:
+        """
+        注册地图修改的回调函数
+
+        参数:
+            callback: callback(graph, cells), cells为取值发生变化的点的列表,
+                为None时表示整张地图被重新加载
+        """
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+
+    def unsubscribe(self, callback) -> None:
+        """取消注册的回调函数"""
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def notify(self, cells: list[Point] | None) -> None:
+        """通知所有回调函数地图中cells发生了变化"""
+        for callback in list(self.listeners):
+            callback(self, cells)
 
     def __contains__(self, point):
         if isinstance(point, Point):
             if 0 <= point.x < self.width and 0 <= point.y < self.length:
-                if self.graph[point.x][point.y] == 0:
+                if self.graph[point.x, point.y] == 0:
                     return True
         elif isinstance(point, tuple):
             if 0 <= point[0] < self.width and 0 <= point[1] < self.length:
-                if self.graph[point[0]][point[1]] == 0:
+                if self.graph[point[0], point[1]] == 0:
                     return True
         return False
 
@@ -91,40 +208,59 @@ class Graph:
                 if neighbor_point in self:
                     yield neighbor_point, DIAG_DIST
 
-    def load(self, name=None, path=SAVE_DIR, file=None):
+    def load(self, name=None, path=SAVE_DIR, file=None, backend=None, mode="r"):
         """
-        从文件中加载地图
+        从文件中加载地图 (.npz格式或位压缩的.bmap格式)
 
         参数:
+            name (str): 地图名, 优先使用 name.npz, 不存在时使用 name.bmap
             file (str): 地图文件路径
+            backend (str): 邻接表存储方式, 未传入时.npz地图保持不变, .bmap地图
+                使用"lazy", 以免为整张地图生成邻接表
+            mode (str): .bmap文件的内存映射方式, 见open_bitmap. 默认只读,
+                此时修改地图会抛出ValueError
         """
+        if backend is not None and backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
         if name is not None and file is None:
-            name = name + ".npz"
-            file = os.path.join(path, name)
-        data = np.load(file)
-        self.graph = data["graph"]
-        start = data["start"]
-        end = data["end"]
-        self.width = len(self.graph)
-        self.length = len(self.graph[0])
-        self.size = (self.width, self.length)
-        self.start = Point(int(start[0]), int(start[1]))
-        self.end = Point(int(end[0]), int(end[1]))
+            file = os.path.join(path, name + ".npz")
+            if not os.path.exists(file):
+                file = os.path.join(path, name + BITMAP_EXT)
+        if file.endswith(BITMAP_EXT):
+            backend = backend or "lazy"
+            self.graph, self.start, self.end = open_bitmap(file, mode)
+        else:
+            data = np.load(file)
+            self.graph = data["graph"]
+            self.start = Point(int(data["start"][0]), int(data["start"][1]))
+            self.end = Point(int(data["end"][0]), int(data["end"][1]))
+        if backend is not None:
+            self.backend = backend
+        self.file = file
+        self.width, self.length = self.size = tuple(self.graph.shape)
         self.edges = self.get_all_edges()
+        self.notify(None)
 
-    def save(self, name=None, path=SAVE_DIR):
+    def save(self, name=None, path=SAVE_DIR, bitmap=False):
         """
         将当前地图保存至本地 (.npz格式)
 
         参数:
             name (str): 地图名（未传入则为时间戳）
             path (str): 保存路径名，默认为 maps
+            bitmap (bool): 是否保存为位压缩的.bmap格式
         """
         if not os.path.exists(path):
             os.mkdir(path)
         if name is None:
             name = str(int(time()))
         file = os.path.join(path, name)
+        if bitmap:
+            self.file = file if file.endswith(BITMAP_EXT) else file + BITMAP_EXT
+            save_bitmap(self.file, self.graph, self.start, self.end)
+            return
+        # np.savez 会自动补全扩展名
+        self.file = file if file.endswith(".npz") else file + ".npz"
         np.savez(
             file,
             graph=self.graph,
@@ -139,10 +275,437 @@ class Graph:
         返回:
             dict: 包含所有路径及长度的图
         """
+        self.reset_fields()
+        self.version += 1
+        if self.backend == "csr":
+            self.csr = CSRGraph.from_graph(self)
+            self.edges = CSREdges(self.csr, self.LAZY_CACHE_SIZE)
+            return self.edges
+        self.csr = None
+        if self.backend == "lazy":
+            self.edges = LazyEdges(self, self.LAZY_CACHE_SIZE)
+            return self.edges
+        if not isinstance(self.edges, dict):
+            self.edges = {}
         self.edges.clear()
-        for i in range(self.width):
-            for j in range(self.length):
-                r = Point(i, j)
-                if r in self:
-                    self.edges[r] = {s: dist for s, dist in self.neighbors(r)}
+        indptr, indices, slots, _ = self.edge_arrays()
+        indptr = indptr.tolist()
+        indices = indices.tolist()
+        dists = [ADJ_DIST if k < 4 else DIAG_DIST for k in slots.tolist()]
+        points = {}
+        for node in np.flatnonzero(self.free()).tolist():
+            points[node] = Point(*divmod(node, self.length))
+        for node, r in points.items():
+            a, b = indptr[node], indptr[node + 1]
+            self.edges[r] = {points[s]: d for s, d in zip(indices[a:b], dists[a:b])}
         return self.edges
+
+    def reset_fields(self) -> None:
+        """清空由地图计算出的距离场缓存"""
+        self.dist_field = None
+        self.cost_fields = {}
+        self.labels = None
+        self.pruned_graph = None
+        self.pruned_ends = None
+        self.edge_data = None
+        self.grid_key = None
+
+    def content_key(self, ends: bool = False) -> str:
+        """
+        地图内容的摘要. 地图部分缓存至地图被修改, 起点与终点每次重新加入
+
+        参数:
+            ends (bool): 是否包含起点与终点
+        """
+        if self.grid_key is None:
+            self.grid_key = content_key(np.asarray(self.graph) != 0)
+        if not ends:
+            return self.grid_key
+        s, e = self.start, self.end
+        return f"{self.grid_key}_{s.x}_{s.y}_{e.x}_{e.y}"
+
+    def cached(self, names: tuple[str, ...], compute, ends: bool = False) -> tuple:
+        """
+        从磁盘缓存读取由地图确定的衍生数据, 不存在时计算并写入.
+        读取的数组为只读的内存映射. 未设置cache或地图的方格数少于
+        ARTIFACT_CACHE_MIN_CELLS时直接计算
+
+        参数:
+            names (tuple[str]): 各项数据的名称
+            compute: 无参数函数, 返回与names对应的数组元组
+            ends (bool): 数据是否与起点及终点有关
+
+        返回:
+            tuple: 各项数据
+        """
+        if self.cache is None or self.width * self.length < ARTIFACT_CACHE_MIN_CELLS:
+            return compute()
+        return self.cache.fetch(self.content_key(ends), names, compute)
+
+    def free(self) -> NDArray:
+        """返回地图中各点是否为通路的布尔矩阵"""
+        return np.asarray(self.graph) == 0
+
+    def euclidean(self, point: Point) -> NDArray:
+        """
+        地图中各点到point的欧几里得距离, 与 Point * Point 一致(距离为0时取0.01)
+
+        返回:
+            NDArray: 形状为(width, length)的矩阵
+        """
+        xs, ys = np.indices(self.size)
+        dist = np.sqrt((xs - point.x) ** 2 + (ys - point.y) ** 2)
+        dist[dist == 0] = 0.01
+        return dist
+
+    def obstacle_distance(self) -> NDArray:
+        """
+        各点到最近障碍物的欧几里得距离(精确距离变换), 地图边界外视为障碍物.
+        计算结果缓存至地图被修改
+
+        先沿x方向扫描得到各点到同一列最近障碍物的距离g, 再对每一行求
+        min(g[y']^2 + (y - y')^2) 的下包络 (Felzenszwalb & Huttenlocher),
+        所有行同时计算
+
+        返回:
+            NDArray: 形状为(width, length)的矩阵, 障碍物处为0
+        """
+        if self.dist_field is None:
+            (self.dist_field,) = self.cached(
+                ("obstacle_distance",), lambda: (self._obstacle_distance(),)
+            )
+        return self.dist_field
+
+    def _obstacle_distance(self) -> NDArray:
+        obstacle = np.ones((self.width + 2, self.length + 2), dtype=bool)
+        obstacle[1:-1, 1:-1] = ~self.free()
+        w, n = obstacle.shape
+        # 沿x方向到最近障碍物的距离
+        xs = np.arange(w)[:, np.newaxis]
+        above = np.maximum.accumulate(np.where(obstacle, xs, 0), axis=0)
+        below = np.minimum.accumulate(np.where(obstacle, xs, w)[::-1], axis=0)[::-1]
+        f = np.minimum(xs - above, below - xs).astype(float) ** 2
+        # 每行抛物线 f[y'] + (y - y')^2 的下包络, v为抛物线顶点, z为分界点
+        rows = np.arange(w)
+        v = np.zeros((w, n), dtype=int)
+        z = np.full((w, n + 1), np.inf)
+        z[:, 0] = -np.inf
+        k = np.zeros(w, dtype=int)
+        for q in range(1, n):
+            fq = f[:, q] + q * q
+            while True:
+                vk = v[rows, k]
+                s = (fq - (f[rows, vk] + vk * vk)) / (2 * (q - vk))
+                pop = s <= z[rows, k]
+                if not pop.any():
+                    break
+                k[pop] -= 1
+            k += 1
+            v[rows, k] = q
+            z[rows, k] = s
+            z[rows, k + 1] = np.inf
+        d = np.empty((w, n))
+        k[:] = 0
+        for q in range(n):
+            while True:
+                nxt = z[rows, k + 1] < q
+                if not nxt.any():
+                    break
+                k[nxt] += 1
+            vk = v[rows, k]
+            d[:, q] = (q - vk) ** 2 + f[rows, vk]
+        return np.sqrt(d[1:-1, 1:-1])
+
+    def cost_to_go(self, goal: Point = None) -> NDArray:
+        """
+        各点沿可行路径到goal的最短距离, 以goal为起点对全图执行一次Dijkstra.
+        结果按goal缓存至地图被修改
+
+        参数:
+            goal (Point): 目标点, 默认为终点
+
+        返回:
+            NDArray: 形状为(width, length)的矩阵, 障碍物及不可达的点为inf
+        """
+        if goal is None:
+            goal = self.end
+        field = self.cost_fields.get(goal)
+        if field is None:
+            (field,) = self.cached(
+                (f"cost_to_go_{goal.x}_{goal.y}",), lambda: (self._cost_to_go(goal),)
+            )
+            self.cost_fields[goal] = field
+        return field
+
+    def _cost_to_go(self, goal: Point) -> NDArray:
+        indptr, indices, _, weights = self.edge_arrays()
+        indptr = indptr.tolist()
+        indices = indices.tolist()
+        weights = weights.tolist()
+        dist = [float("inf")] * (self.width * self.length)
+        if goal in self:
+            node = goal.x * self.length + goal.y
+            dist[node] = 0
+            q = [(0, node)]
+            while q:
+                d0, r = heappop(q)
+                if d0 > dist[r]:
+                    continue
+                for i in range(indptr[r], indptr[r + 1]):
+                    d = d0 + weights[i]
+                    s = indices[i]
+                    if d < dist[s]:
+                        dist[s] = d
+                        heappush(q, (d, s))
+        return np.array(dist).reshape(self.size)
+
+    def components(self) -> NDArray:
+        """
+        标记地图的连通分量, 连通规则与neighbors一致
+
+        返回:
+            NDArray: 形状为(width, length)的矩阵, 同一连通分量的点编号相同,
+                障碍物为-1
+        """
+        if self.labels is None:
+            (self.labels,) = self.cached(("labels",), lambda: (self._components(),))
+        return self.labels
+
+    def _components(self) -> NDArray:
+        indptr, indices, _, _ = self.edge_arrays()
+        indptr = indptr.tolist()
+        indices = indices.tolist()
+        free = self.free().ravel().tolist()
+        labels = [-1] * len(free)
+        cnt = 0
+        for node in range(len(free)):
+            if not free[node] or labels[node] >= 0:
+                continue
+            labels[node] = cnt
+            q = [node]
+            while q:
+                r = q.pop()
+                for s in indices[indptr[r] : indptr[r + 1]]:
+                    if labels[s] < 0:
+                        labels[s] = cnt
+                        q.append(s)
+            cnt += 1
+        return np.array(labels, dtype=np.int32).reshape(self.size)
+
+    def connected(self, p: Point = None, q: Point = None) -> bool:
+        """判断点p与q(默认为起点与终点)是否连通"""
+        p = self.start if p is None else p
+        q = self.end if q is None else q
+        if p not in self or q not in self:
+            return False
+        labels = self.components()
+        return bool(labels[p.x, p.y] == labels[q.x, q.y])
+
+    def unreachable(self) -> bool:
+        """
+        不标记连通分量即可确定起点与终点不连通: 起点或终点为障碍物, 或已缓存的
+        components表明两者不连通. 返回False时两者仍可能不连通, 由搜索自行判断
+        """
+        p, q = self.start, self.end
+        if p not in self or q not in self:
+            return True
+        labels = self.labels
+        return labels is not None and bool(labels[p.x, p.y] != labels[q.x, q.y])
+
+    def pruned(self) -> "Graph":
+        """
+        去除所有不可能位于起点到终点的简单路径上的点(死角、与起终点不连通的区域),
+        返回新的地图, 被去除的点设置为障碍物
+
+        以起点为根深度优先搜索求出所有双连通分量, 某点位于起终点间的简单路径上
+        当且仅当它所在的某个双连通分量位于块-割点树中起点到终点的路径上, 即
+        DFS树中终点到起点的路径所经过的双连通分量. 被去除的点不会是两个保留点间
+        斜向边的侧边点(三者构成环, 属于同一双连通分量), 故保留点间的边不变
+
+        返回:
+            Graph: 去除死角后的地图; 起终点不连通或没有可去除的点时为自身
+        """
+        ends = (self.start, self.end)
+        if self.pruned_graph is not None and self.pruned_ends == ends:
+            return self.pruned_graph
+        self.pruned_graph, self.pruned_ends = self, ends
+        if not self.connected():
+            return self
+        (keep,) = self.cached(("pruned",), lambda: (self._pruned_mask(),), ends=True)
+        if np.array_equal(keep, self.free()):
+            return self
+        graph = np.where(keep, 0, 1).astype(np.asarray(self.graph).dtype)
+        self.pruned_graph = Graph(graph, self.start, self.end, self.backend)
+        self.pruned_graph.cache = self.cache
+        self.pruned_graph.get_all_edges()
+        return self.pruned_graph
+
+    def _pruned_mask(self) -> NDArray:
+        """pruned中保留的点"""
+        indptr, indices, _, _ = self.edge_arrays()
+        indices = indices.tolist()
+        n = self.width * self.length
+        start = self.start.x * self.length + self.start.y
+        end = self.end.x * self.length + self.end.y
+        # 下一条待访问边的位置
+        it = indptr[:-1].tolist()
+        stop = indptr[1:].tolist()
+        disc = [-1] * n
+        low = [0] * n
+        fa = [-1] * n
+        # 各点出栈时所属的双连通分量
+        block_of = [-1] * n
+        blocks = []
+        disc[start] = 0
+        cnt = 1
+        dfs = [start]
+        stack = [start]
+        while dfs:
+            u = dfs[-1]
+            if it[u] < stop[u]:
+                v = indices[it[u]]
+                it[u] += 1
+                if disc[v] < 0:
+                    fa[v] = u
+                    disc[v] = low[v] = cnt
+                    cnt += 1
+                    dfs.append(v)
+                    stack.append(v)
+                elif v != fa[u] and disc[v] < low[u]:
+                    low[u] = disc[v]
+                continue
+            dfs.pop()
+            if not dfs:
+                break
+            p = dfs[-1]
+            if low[u] < low[p]:
+                low[p] = low[u]
+            if low[u] >= disc[p]:
+                block = [p]
+                while True:
+                    w = stack.pop()
+                    block_of[w] = len(blocks)
+                    block.append(w)
+                    if w == u:
+                        break
+                blocks.append(block)
+        keep = np.zeros(n, dtype=bool)
+        keep[start] = True
+        seen = set()
+        w = end
+        while w != start:
+            if block_of[w] not in seen:
+                seen.add(block_of[w])
+                keep[blocks[block_of[w]]] = True
+            w = fa[w]
+        return keep.reshape(self.size)
+
+    def edge_mask(self) -> NDArray:
+        """
+        以整体平移的布尔矩阵计算所有点在8个方向上的可达性,
+        斜向移动规则与neighbors一致: 两侧相邻点至少有一个为通路
+
+        返回:
+            NDArray: 形状为(width, length, 8)的布尔矩阵, 第k层对应方向DIRS[k]
+        """
+        free = self.free()
+        pad = np.zeros((self.width + 2, self.length + 2), dtype=bool)
+        pad[1:-1, 1:-1] = free
+
+        def shift(dx, dy):
+            return pad[1 + dx : 1 + dx + self.width, 1 + dy : 1 + dy + self.length]
+
+        mask = np.empty((self.width, self.length, 8), dtype=bool)
+        for k, (dx, dy) in enumerate(DIRS):
+            mask[..., k] = free & shift(dx, dy)
+            if dx and dy:
+                mask[..., k] &= shift(dx, 0) | shift(0, dy)
+        return mask
+
+    def neighbor_values(self, values: NDArray, fill: float = 0) -> NDArray:
+        """
+        各点在8个方向上相邻点的取值
+
+        参数:
+            values (NDArray): 形状为(width, length)的矩阵
+            fill (float): 相邻点超出地图时的取值
+
+        返回:
+            NDArray: 形状为(width, length, 8)的矩阵, [x, y, k] 为 values 在
+                (x, y) + DIRS[k] 处的值
+        """
+        pad = np.full((self.width + 2, self.length + 2), fill, dtype=float)
+        pad[1:-1, 1:-1] = values
+        res = np.empty((self.width, self.length, 8))
+        for k, (dx, dy) in enumerate(DIRS):
+            res[..., k] = pad[
+                1 + dx : 1 + dx + self.width, 1 + dy : 1 + dy + self.length
+            ]
+        return res
+
+    def edge_arrays(self) -> tuple[NDArray, NDArray, NDArray, NDArray]:
+        """
+        由edge_mask生成CSR格式的所有边, 结点编号为 x * length + y
+
+        返回:
+            tuple: (indptr, indices, slots, weights), slots为各边的方向序号
+        """
+        if self.edge_data is None:
+            self.edge_data = self.cached(
+                ("indptr", "indices", "slots", "weights"), self._edge_arrays
+            )
+        return self.edge_data
+
+    def _edge_arrays(self) -> tuple[NDArray, NDArray, NDArray, NDArray]:
+        mask = self.edge_mask().reshape(-1, 8)
+        indptr = np.zeros(len(mask) + 1, dtype=np.int32)
+        np.cumsum(np.count_nonzero(mask, axis=1), out=indptr[1:])
+        nodes, slots = np.nonzero(mask)
+        indices = (nodes + DIR_DX[slots] * self.length + DIR_DY[slots]).astype(np.int32)
+        return indptr, indices, slots.astype(np.uint8), DIR_DIST[slots]
+
+
+class LazyEdges(Mapping):
+    """
+    按需计算的邻接表, 兼容 edges[r][s] 的访问方式
+
+    edges[r] 在首次访问时由Graph.neighbors计算, 最近使用的maxsize个点
+    保存在LRU缓存中, 内存占用只与实际访问的点数有关
+
+    属性:
+        graph (Graph): 地图
+        maxsize (int): 最多缓存的点数
+    """
+
+    def __init__(self, graph: Graph, maxsize: int = Graph.LAZY_CACHE_SIZE):
+        self.graph = graph
+        self.maxsize = maxsize
+        self.rows = OrderedDict()
+
+    def __getitem__(self, r: Point) -> dict:
+        row = self.rows.get(r)
+        if row is not None:
+            self.rows.move_to_end(r)
+            return row
+        if r not in self.graph:
+            raise KeyError(r)
+        row = {s: dist for s, dist in self.graph.neighbors(r)}
+        self.rows[r] = row
+        if len(self.rows) > self.maxsize:
+            self.rows.popitem(last=False)
+        return row
+
+    def __contains__(self, r) -> bool:
+        return isinstance(r, Point) and r in self.graph
+
+    def __iter__(self):
+        for i in range(self.graph.width):
+            for j in np.flatnonzero(np.asarray(self.graph[i]) == 0).tolist():
+                yield Point(i, j)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.graph.free()))
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self.rows.clear()
@@ -1,27 +1,99 @@
+from array import array
+import numpy as np
 from .point import Point, LinkPoint
 
+# int32能表示的最大编号
+MAX_STAMP = 2**31 - 1
+
+
+class VisitedMarks:
+    """
+    按编号标记已访问的点
+
+    每个方格对应int32数组中的一项, 保存最近一次访问该点的编号. 每次开始新的访问
+    (如一只蚂蚁开始构建路径)时取得一个新编号, 数组中等于该编号的点即为已访问,
+    因此清空访问记录为O(1), 查询为一次数组下标访问. 同一时刻只有最新编号的
+    访问记录有效
+
+    属性:
+        length (int): 地图长度, 点(x, y)的下标为 x * length + y
+        marks (array): int32数组
+        stamp (int): 最新的编号
+    """
+
+    def __init__(self, width: int, length: int):
+        self.length = length
+        self.marks = array("i", bytes(4 * width * length))
+        self.stamp = 0
+
+    def new_stamp(self) -> int:
+        """取得新编号, 之前的访问记录全部失效"""
+        self.stamp += 1
+        if self.stamp == MAX_STAMP:
+            # 编号用尽时清零数组, 重新开始编号
+            self.marks = array("i", bytes(len(self.marks) * 4))
+            self.stamp = 1
+        return self.stamp
+
+    def visited(self, stamp: int) -> list[Point]:
+        """编号为stamp的所有点"""
+        nodes = np.flatnonzero(np.frombuffer(self.marks, dtype=np.int32) == stamp)
+        return [Point(*divmod(int(i), self.length)) for i in nodes]
+
 
 class Path:
     """
     表示一条路径 (基于列表和集合存储)
 
+    调用 use_marks 后改为在 VisitedMarks 中记录经过的点, 此时 clear 为O(1),
+    p in path 为一次数组下标访问. 其他路径取得新编号后(同一VisitedMarks
+    同一时刻只记录一条路径), 该路径的 points 及 p in path 改由路径点列表得到
+
     属性:
         valid (bool): 路径是否有效
         length (float): 路径长度
         turn_num (int): 路径拐角数
+        points (set[Point]): 经过的点
 
     """
 
     def __init__(self, path: list = None, length: float = 0, turn_num: int = 0):
         if path is None:
             self.path = []
-            self.points = set()
+            self._points = set()
         else:
             self.path = path
-            self.points = set(path)
+            self._points = set(path)
         self.length = length
         self.turn_num = turn_num
         self.valid = True
+        self.visited: VisitedMarks = None
+        self.stamp = 0
+
+    def use_marks(self, visited: VisitedMarks) -> None:
+        """改为在visited中记录经过的点, 已在其他VisitedMarks中记录时转移过来"""
+        points = self.points
+        self.visited = visited
+        self.stamp = visited.new_stamp()
+        marks, length = visited.marks, visited.length
+        for p in points:
+            marks[p.x * length + p.y] = self.stamp
+        self._points = None
+
+    def __getstate__(self):
+        # 复制及序列化时不带访问标记数组, 改为保存点集
+        state = self.__dict__.copy()
+        if self.visited is not None:
+            state.update(_points=self.points, visited=None, stamp=0)
+        return state
+
+    @property
+    def points(self) -> set[Point]:
+        if self.visited is None:
+            return self._points
+        if self.stamp == self.visited.stamp:
+            return set(self.visited.visited(self.stamp))
+        return set(self.path)
 
     def append(self, other):
         """添加一个路径点"""
@@ -29,21 +101,32 @@ class Path:
             self.length += self.path[-1] * other
             self.turn_num += 1 - (self > other)
         self.path.append(other)
-        self.points.add(other)
+        if self.visited is None:
+            self._points.add(other)
+        elif self.stamp == self.visited.stamp:
+            self.visited.marks[other.x * self.visited.length + other.y] = self.stamp
 
     def pop(self, vis: bool = True) -> Point:
         """删除最后一个路径点, 返回前一个点"""
         p = self.path.pop()
         self.turn_num -= 1 - (self > p)
         if not vis:
-            self.points.discard(p)
+            if self.visited is None:
+                self._points.discard(p)
+            elif self.stamp == self.visited.stamp:
+                self.visited.marks[p.x * self.visited.length + p.y] = 0
         return self.path[-1]
 
     def __getitem__(self, i: int):
         return self.path[i]
 
     def __contains__(self, p: Point):
-        return p in self.points
+        visited = self.visited
+        if visited is None:
+            return p in self._points
+        if self.stamp == visited.stamp:
+            return visited.marks[p.x * visited.length + p.y] == self.stamp
+        return p in self.path
 
     def __iter__(self):
         return iter(self.path)
@@ -79,7 +162,10 @@ class Path:
         """清空路径"""
         self.path.clear()
         if not save_points:
-            self.points.clear()
+            if self.visited is None:
+                self._points.clear()
+            else:
+                self.stamp = self.visited.new_stamp()
         self.length = 0
         self.turn_num = 0
 
@@ -1,10 +1,17 @@
+from weakref import WeakValueDictionary
 from .vector import Dir
 
 
+# 坐标差的符号 -> 方向, 下标-1即为负方向
+_SIGN_DIRS = [[Dir(dx, dy) for dy in (0, 1, -1)] for dx in (0, 1, -1)]
+
+
 class Point:
     """
     表示地图中某个点
 
+    Point不可变, 相同坐标且仍被引用的点为同一个实例, 哈希值在创建时计算
+
     属性:
         x: 该点x坐标
         y: 该点y坐标
@@ -19,15 +26,36 @@ class Point:
         p1 / p2 -> float    # 计算两点对角线距离
     """
 
-    def __init__(self, x: int, y: int):
-        self.x = x
-        self.y = y
+    __slots__ = ("x", "y", "_hash", "__weakref__")
+
+    # 已创建且仍被引用的点, 相同坐标只保存一个实例. 弱引用不阻止回收,
+    # 不再使用的地图中的点不会一直保留
+    _pool = WeakValueDictionary()
+
+    def __new__(cls, x: int, y: int):
+        self = cls._pool.get((x, y))
+        if self is None:
+            self = object.__new__(cls)
+            setattr_ = object.__setattr__
+            setattr_(self, "x", x)
+            setattr_(self, "y", y)
+            setattr_(self, "_hash", hash((x, y)))
+            cls._pool[x, y] = self
+        return self
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Point is immutable")
+
+    def __reduce__(self):
+        return Point, (self.x, self.y)
 
     def __str__(self):
         return f"Point({self.x}, {self.y})"
 
     def __eq__(self, other):
-        if isinstance(other, Point):
+        if self is other:
+            return True
+        elif isinstance(other, Point):
             return self.x == other.x and self.y == other.y
         elif isinstance(other, LinkPoint):
             return self.x == other.point.x and self.y == other.point.y
@@ -46,7 +74,7 @@ class Point:
         if isinstance(other, Point):
             dx = self.x - other.x
             dy = self.y - other.y
-            return Dir((dx > 0) - (dx < 0), (dy > 0) - (dy < 0))
+            return _SIGN_DIRS[(dx > 0) - (dx < 0)][(dy > 0) - (dy < 0)]
         else:
             return Dir(0, 0)
 
@@ -63,7 +91,7 @@ class Point:
         return res if res else 0.01
 
     def __hash__(self):
-        return hash((self.x, self.y))
+        return self._hash
 
     def __iter__(self):
         return iter((self.x, self.y))
@@ -1,3 +1,6 @@
+from weakref import WeakValueDictionary
+
+
 class Dir:
     """
     表示一个方向向量
@@ -15,18 +18,39 @@ class Dir:
 
     """
 
-    def __init__(self, x: int, y: int):
-        self.x = x
-        self.y = y
+    __slots__ = ("x", "y", "__weakref__")
+
+    # 已创建且仍被引用的方向, 每种方向只保存一个实例
+    _pool = WeakValueDictionary()
+
+    def __new__(cls, x: int, y: int):
+        self = cls._pool.get((x, y))
+        if self is None:
+            self = object.__new__(cls)
+            object.__setattr__(self, "x", x)
+            object.__setattr__(self, "y", y)
+            cls._pool[x, y] = self
+        return self
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Dir is immutable")
+
+    def __reduce__(self):
+        return Dir, (self.x, self.y)
+
+    def __hash__(self):
+        return hash((self.x, self.y))
 
     def __str__(self) -> str:
         return f"Dir({self.x}, {self.y})"
 
     def __eq__(self, other) -> bool:
+        if self is other:
+            return True
         return self.x == other.x and self.y == other.y
 
     def __sub__(self, other) -> bool:
-        if self == other:
+        if self is other or self == other:
             return 0
         return 4 - (abs(other.x + self.x) + abs(other.y + self.y))
 
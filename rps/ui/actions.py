@@ -25,6 +25,15 @@ class SetAlgAction(QWidgetAction):
         self.triggered.connect(lambda: parent.set_alg(alg))
 
 
+class LoadParamsAction(QWidgetAction):
+    """加载调优得到的算法参数"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setText("加载参数")
+        self.triggered.connect(parent.load_params)
+
+
 class LoadFileAction(QWidgetAction):
     """选择文件"""
 
@@ -97,6 +97,15 @@ class AlgParamsLayout(QVBoxLayout):
             if widget is not None:
                 widget.deleteLater()
 
+    def set_params(self, params: dict):
+        """将参数填入对应的输入框"""
+        for i in range(self.count()):
+            widget = self.itemAt(i).widget()
+            if isinstance(widget, QLineEdit):
+                key = self.itemAt(i - 1).widget().text()
+                if key in params:
+                    widget.setText(repr(params[key]))
+
     @Slot(str)
     def init_params(self, alg: str):
         self.clear()
@@ -9,6 +9,7 @@ from .actions import (
     QickLoadMapAction,
     LoadFileAction,
     SetAlgAction,
+    LoadParamsAction,
 )
 from ..utils import get_files, get_algs
 
@@ -29,6 +30,8 @@ class AlgMenu(QMenu):
 
     def __init__(self, parent=None):
         super().__init__("算法", parent)
+        self.addAction(LoadParamsAction(parent))
+        self.addSeparator()
         for alg in get_algs():
             self.addAction(SetAlgAction(parent, alg))
 
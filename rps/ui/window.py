@@ -18,6 +18,7 @@ from .canvas import MainCanvas, ShowDetailCanvas
 from .design import DesignWidget, MapWidget
 from .menus import FileMenu, RunMenu, AlgMenu
 from .customs import ErrorMessageBox
+from ..utils import load_params
 
 
 class MainWindow(QMainWindow):
@@ -104,6 +105,14 @@ class MainWindow(QMainWindow):
         """设置算法"""
         self.alg_widget.alg_combo.setCurrentText(alg)
 
+    def load_params(self):
+        """加载successive_halving保存的算法及参数"""
+        file, _ = QFileDialog.getOpenFileName(self, "选择文件", "", "All Files (*json)")
+        if file:
+            alg, params = load_params(file)
+            self.set_alg(alg)
+            self.alg_widget.params_area.params_layout.set_params(params)
+
     @Slot()
     def run_algorithm(self, real_time=None):
         """运行算法"""
@@ -1,6 +1,16 @@
 from .common import get_files, get_class_init, get_algs, show_map
-from .batch_run import batch_run, param_test, alg_test, classical_test
+from .batch_run import (
+    batch_run,
+    iter_batch,
+    param_test,
+    param_search,
+    alg_test,
+    classical_test,
+)
 from .make_map import make_map
+from .convert_map import npz_to_bitmap, bitmap_to_npz
+from .result_cache import ResultCache
+from .tuner import successive_halving, load_params
 
 
 __all__ = [
@@ -8,9 +18,16 @@ __all__ = [
     "get_class_init",
     "get_algs",
     "batch_run",
+    "iter_batch",
     "param_test",
+    "param_search",
     "make_map",
+    "npz_to_bitmap",
+    "bitmap_to_npz",
     "show_map",
     "alg_test",
     "classical_test",
+    "ResultCache",
+    "successive_halving",
+    "load_params",
 ]
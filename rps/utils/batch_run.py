@@ -1,76 +1,569 @@
+import math
+import random
+from statistics import NormalDist
 import numpy as np
 import pandas as pd
 import tqdm
-from copy import deepcopy
-from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+from itertools import islice, product
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import shared_memory
+from rps.dataclass import Graph, Point
+from rps.dataclass.bitmap import BitGrid
+from .common import init_params
+from .result_cache import DEFAULT_RESULT_CACHE, seed_id
 
+# 工作进程中的地图及其共享内存, 由_init_worker设置
+_worker_graph = None
+_worker_shm = None
 
-def batch_run(alg, graph, num, worker=4, return_average=True):
+
+class SharedGraph:
+    """
+    将地图矩阵发布到共享内存, 供进程池的工作进程只读访问
+
+    普通矩阵以每格1字节保存, BitGrid保存其压缩数据. 工作进程通过
+    initializer=_init_worker, initargs=(spec,) 在启动时各自建立一次地图
+
+    属性:
+        shm (SharedMemory): 共享内存
+        spec (tuple): 工作进程重建地图所需的信息
+    """
+
+    def __init__(self, graph: Graph):
+        grid = graph.graph
+        packed = isinstance(grid, BitGrid)
+        if packed:
+            data = np.ascontiguousarray(grid.bits)
+        else:
+            data = np.ascontiguousarray(np.asarray(grid) != 0, dtype=np.uint8)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+        np.ndarray(data.shape, np.uint8, self.shm.buf)[:] = data
+        self.spec = (
+            self.shm.name,
+            data.shape,
+            graph.length if packed else None,
+            tuple(graph.start),
+            tuple(graph.end),
+            graph.backend,
+        )
+
+    def close(self) -> None:
+        """释放共享内存"""
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _init_worker(spec) -> None:
+    """进程池的初始化函数, 由共享内存建立工作进程的地图"""
+    global _worker_graph, _worker_shm
+    name, shape, length, start, end, backend = spec
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    data = np.ndarray(shape, np.uint8, _worker_shm.buf)
+    data.flags.writeable = False
+    grid = data if length is None else BitGrid(data, length)
+    _worker_graph = Graph(grid, Point(*start), Point(*end), backend)
+    _worker_graph.get_all_edges()
+
+
+def _run_task(cls, params: dict, seed: np.random.SeedSequence, graph: Graph = None):
+    """
+    在工作进程中运行一次算法, 默认使用_init_worker建立的地图
+
+    算法的随机数生成器由seed创建(ACO.seed), 每次运行的随机数序列只由seed决定,
+    与工作进程及其中已运行的任务无关. 全局的random及np.random同样以seed生成的
+    状态重置, 供仍使用全局随机数的算法使用. 算法对象以 cls(**params) 重新创建,
+    params见init_params
+    """
+    state = seed.generate_state(4)
+    random.seed(int.from_bytes(state.tobytes(), "little"))
+    np.random.seed(state)
+    alg = cls(**params)
+    return alg.search(
+        _worker_graph if graph is None else graph, return_path=False, seed=seed
+    )
+
+
+def seed_sequence(seed=None) -> np.random.SeedSequence:
+    """由整数种子(或已有的SeedSequence)得到SeedSequence, 为None时随机"""
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def run_seeds(seed, stop: int, start: int = 0) -> list[np.random.SeedSequence]:
+    """
+    第start至stop-1次运行的随机数种子
+
+    第i次运行使用seed的子SeedSequence(spawn_key末尾加上i), 与SeedSequence.spawn
+    得到的子序列一样互不相关, 且只由seed及i决定, 与运行总次数及seed已派生的
+    子序列无关, 增加运行次数时已有的种子不变
+    """
+    ss = seed_sequence(seed)
+    return [
+        np.random.SeedSequence(
+            ss.entropy, spawn_key=(*ss.spawn_key, i), pool_size=ss.pool_size
+        )
+        for i in range(start, stop)
+    ]
+
+
+class RunningStats:
+    """
+    以Welford算法在常数内存中统计一组数据
+
+    属性:
+        count (int): 数据个数
+        mean (float): 平均值
+        min (float): 最小值
+        std (float): 标准差(总体标准差, 与np.std一致)
+        var (float): 样本方差(与np.var(ddof=1)一致), 少于2个数据时为0
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = float("inf")
+
+    def update(self, x: float) -> None:
+        self.count += 1
+        self.min = min(self.min, x)
+        if math.isinf(x) or math.isinf(self.mean):
+            # 与np.mean/np.std一致: 含inf时平均值为inf, 标准差为nan
+            self.mean += x
+            self.m2 = float("nan")
+            return
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def std(self) -> float:
+        return (self.m2 / self.count) ** 0.5 if self.count else 0.0
+
+    @property
+    def var(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def ci(self, level: float = 0.95) -> tuple[float, float]:
+        """平均值的置信区间(正态近似, 使用样本标准差)"""
+        if self.count < 2:
+            return self.mean, self.mean
+        z = NormalDist().inv_cdf((1 + level) / 2)
+        half = z * (self.var / self.count) ** 0.5
+        return self.mean - half, self.mean + half
+
+
+class BatchStats:
+    """
+    路径长度、转弯次数、收敛次数三项指标的统计
+
+    属性:
+        length (RunningStats): 路径长度
+        turn (RunningStats): 转弯次数
+        converge (RunningStats): 收敛次数
+    """
+
+    METRICS = ("length", "turn", "converge")
+
+    def __init__(self):
+        for name in self.METRICS:
+            setattr(self, name, RunningStats())
+
+    def update(self, result: tuple) -> None:
+        for name, x in zip(self.METRICS, result):
+            getattr(self, name).update(x)
+
+    @property
+    def count(self) -> int:
+        return self.length.count
+
+    def mean(self) -> tuple[float, float, float]:
+        """平均路径长度, 平均转弯次数, 平均收敛次数"""
+        return tuple(getattr(self, name).mean for name in self.METRICS)
+
+    def to_series(self, name: str) -> pd.Series:
+        """与alg_test相同格式的统计结果"""
+        data = {}
+        for metric in self.METRICS:
+            stat = getattr(self, metric)
+            title = metric.capitalize()
+            data[f"Best {title}"] = stat.min
+            data[f"Mean {title}"] = stat.mean
+            data[f"Std {title}"] = stat.std
+        return pd.Series(name=name, data=data)
+
+
+def _run_pool(graph, jobs, num, worker=4, shared=True, chunk=None, progress=None):
+    """
+    在一个进程池中运行一组任务, 按完成顺序生成 (key, 结果)
+
+    参数:
+        jobs: 生成 (key, 算法类, 参数, 随机数种子(SeedSequence)) 的迭代器, 按需读取
+        num (int): 任务总数, 用于进度条
+        chunk (int): 同时提交的任务数, 默认为worker的4倍
+        progress (str): 进度条的描述, 为None时不显示
+    """
+    chunk = chunk or worker * 4
+    jobs = iter(jobs)
+    with ExitStack() as stack:
+        if shared:
+            sg = stack.enter_context(SharedGraph(graph))
+            executor = stack.enter_context(
+                ProcessPoolExecutor(
+                    worker, initializer=_init_worker, initargs=(sg.spec,)
+                )
+            )
+            extra = ()
+        else:
+            executor = stack.enter_context(ProcessPoolExecutor(worker))
+            extra = (graph,)
+        bar = None
+        if progress is not None:
+            bar = tqdm.tqdm(total=num, desc=progress, unit="run", leave=False)
+            stack.callback(bar.close)
+        pending = {}
+        try:
+            while True:
+                for key, cls, params, seed in islice(jobs, chunk - len(pending)):
+                    pending[executor.submit(_run_task, cls, params, seed, *extra)] = key
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = pending.pop(future)
+                    if bar is not None:
+                        bar.update()
+                    try:
+                        res = future.result()
+                    except Exception as e:
+                        print(e)
+                        continue
+                    yield key, res
+        finally:
+            # 提前停止迭代时取消尚未开始的任务
+            for future in pending:
+                future.cancel()
+
+
+def iter_batch(
+    alg,
+    graph,
+    num,
+    worker=4,
+    shared=True,
+    seed=None,
+    chunk=None,
+    stats=None,
+    progress=True,
+    cache=DEFAULT_RESULT_CACHE,
+):
+    """
+    连续运行算法num次, 按完成顺序逐个生成每次的 (路径长度, 转弯次数, 收敛次数)
+
+    同时提交的任务不超过chunk个, 结果不在内存中保留, 内存占用与num无关.
+    出错的任务打印异常后跳过
+
+    参数:
+        shared (bool): 见batch_run
+        seed (int): 生成各任务随机数种子的种子, 默认随机
+        chunk (int): 同时提交的任务数, 默认为worker的4倍
+        stats (BatchStats): 若提供, 每个结果同时计入其中
+        progress (bool | str): 是否显示进度条(含每秒运行次数及剩余时间),
+            为字符串时作为进度条的描述
+        cache (ResultCache): 结果缓存, 只在指定seed时使用. 已缓存的结果先生成,
+            只运行其余的任务
+    """
+    cls, params = type(alg), init_params(alg)
+    seeds = run_seeds(seed, num)
+    if progress:
+        progress = progress if isinstance(progress, str) else cls.__name__
+    else:
+        progress = None
+    for res in _cached_runs(
+        alg,
+        graph,
+        seeds,
+        params,
+        seed is not None and cache,
+        worker,
+        shared,
+        chunk,
+        progress,
+    ):
+        if stats is not None:
+            stats.update(res)
+        yield res
+
+
+def _cached_runs(
+    alg, graph, seeds, params, cache, worker, shared, chunk=None, progress=None
+):
+    """以各个种子运行算法, 已缓存的结果直接读取, 新的结果写入缓存"""
+    if not cache:
+        jobs = ((s, type(alg), params, s) for s in seeds)
+        for _, res in _run_pool(
+            graph, jobs, len(seeds), worker, shared, chunk, progress
+        ):
+            yield res
+        return
+    key = cache.key(alg, graph)
+    cached = cache.get(key, seeds)
+    for s in seeds:
+        if seed_id(s) in cached:
+            yield cached[seed_id(s)]
+    missing = [s for s in seeds if seed_id(s) not in cached]
+    jobs = ((s, type(alg), params, s) for s in missing)
+    try:
+        for s, res in _run_pool(
+            graph, jobs, len(missing), worker, shared, chunk, progress
+        ):
+            cache.put(key, s, res)
+            yield res
+    finally:
+        cache.commit()
+
+
+def batch_run(
+    alg,
+    graph,
+    num,
+    worker=4,
+    return_average=True,
+    shared=True,
+    seed=None,
+    cache=DEFAULT_RESULT_CACHE,
+):
     """
     连续运行算法num次, 返回平均路径长度, 平均转弯次数, 平均收敛次数
+
+    参数:
+        return_average (bool): 为False时返回每次运行结果的列表
+        shared (bool): 为True时地图只通过共享内存发布一次, 每个任务只传递
+            算法类、参数(见init_params)及随机数种子; 为False时每个任务
+            同时传递整个地图
+        seed (int | SeedSequence): 生成各任务随机数种子的种子, 默认随机. 第i次
+            运行的种子为seed的第i个子SeedSequence(见run_seeds), 算法以其创建
+            独立的numpy随机数生成器(见ACO.seed), 相同的seed得到相同的结果
+        cache (ResultCache): 指定seed时使用的结果缓存, 为None时不缓存
     """
-    results = []
-    tasks = []
-    with ProcessPoolExecutor(worker) as executor:
-        for _ in range(num):
-            _alg = deepcopy(alg)
-            tasks.append(executor.submit(_alg.search, graph=graph, return_path=False))
-        for i, res in enumerate(tasks):
-            try:
-                results.append(res.result())
-            except Exception as e:
-                print(e)
+    runs = iter_batch(
+        alg, graph, num, worker, shared, seed, progress=False, cache=cache
+    )
     if not return_average:
-        return results
-    total_length = sum([r[0] for r in results])
-    total_turn = sum([r[1] for r in results])
-    total_converge = sum([r[2] for r in results])
-    return total_length / num, total_turn / num, total_converge / num
+        return list(runs)
+    stats = BatchStats()
+    for res in runs:
+        stats.update(res)
+    return stats.mean()
 
 
-def param_test(alg, graph, param, value_range, batch, worker=4):
+def param_test(
+    alg,
+    graph,
+    param,
+    value_range,
+    batch,
+    worker=4,
+    seed=None,
+    cache=DEFAULT_RESULT_CACHE,
+):
     """
-    测试参数对算法的影响
+    测试参数对算法的影响, 依次生成 (参数值, 平均结果)
+
+    seed及cache见batch_run
     """
     for value in tqdm.tqdm(value_range, desc=f"{alg.__class__.__name__}:{param}"):
         setattr(alg, param, value)
-        res = batch_run(alg, graph, batch, worker)
-        yield value, res
-
-
-def alg_test(alg, graph, batch_num, worker=4):
-    """
-    测试蚁群算法
-    """
-    results = batch_run(alg, graph, batch_num, worker, return_average=False)
-    length, turn, converge = zip(*results)
-    length = np.array(length)
-    turn = np.array(turn)
-    converge = np.array(converge)
-    best_length = length.min()
-    best_turn = turn.min()
-    best_converge = converge.min()
-    mean_length = length.mean()
-    mean_turn = turn.mean()
-    mean_converge = converge.mean()
-    std_length = length.std()
-    std_turn = turn.std()
-    std_converge = converge.std()
-    index = alg.__class__.__name__
-    return pd.Series(
-        name=index,
-        data={
-            "Best Length": best_length,
-            "Mean Length": mean_length,
-            "Std Length": std_length,
-            "Best Turn": best_turn,
-            "Mean Turn": mean_turn,
-            "Std Turn": std_turn,
-            "Best Converge": best_converge,
-            "Mean Converge": mean_converge,
-            "Std Converge": std_converge,
-        },
+        stats = BatchStats()
+        runs = iter_batch(
+            alg,
+            graph,
+            batch,
+            worker,
+            seed=seed,
+            stats=stats,
+            progress=f"{param}={value}",
+            cache=cache,
+        )
+        for _ in runs:
+            pass
+        yield value, stats.mean()
+
+
+def _sample(values, u: float):
+    """将[0, 1)中的u映射为参数值: 列表中的一项, 或 (low, high) 区间中的值"""
+    if isinstance(values, tuple):
+        low, high = values
+        if isinstance(low, int) and isinstance(high, int):
+            return min(low + int(u * (high - low + 1)), high)
+        return float(low + u * (high - low))
+    return values[min(int(u * len(values)), len(values) - 1)]
+
+
+def grid_configs(space: dict) -> list[dict]:
+    """参数空间的所有组合, space中每项为参数值的列表"""
+    names = list(space)
+    return [dict(zip(names, values)) for values in product(*space.values())]
+
+
+def random_configs(space: dict, n: int, rng: np.random.Generator) -> list[dict]:
+    """
+    随机采样n组参数
+
+    space中每项为参数值的列表(从中均匀选取)或 (low, high) 元组(在区间内均匀
+    采样, low和high均为整数时只取整数且包含high)
+    """
+    u = rng.random((n, len(space)))
+    return [
+        {k: _sample(v, u[i, j]) for j, (k, v) in enumerate(space.items())}
+        for i in range(n)
+    ]
+
+
+def lhs_configs(space: dict, n: int, rng: np.random.Generator) -> list[dict]:
+    """拉丁超立方采样n组参数, 每个参数的取值范围被等分为n段且每段恰好采样一次, space同random_configs"""
+    u = (
+        np.array([rng.permutation(n) for _ in space]).T + rng.random((n, len(space)))
+    ) / n
+    return [
+        {k: _sample(v, u[i, j]) for j, (k, v) in enumerate(space.items())}
+        for i in range(n)
+    ]
+
+
+def make_configs(
+    space: dict, method: str, n: int, ss: np.random.SeedSequence
+) -> list[dict]:
+    """
+    按method生成参数组合, 随机采样使用以ss本身创建的随机数生成器, 与各次运行的
+    种子(ss的子SeedSequence, 见run_seeds)互不相关
+
+    参数:
+        method (str): "grid"为所有组合, "random"为随机采样, "lhs"为拉丁超立方采样
+        n (int): random及lhs的采样组数
+    """
+    if method == "grid":
+        return grid_configs(space)
+    if method == "random":
+        return random_configs(space, n, np.random.default_rng(ss))
+    if method == "lhs":
+        return lhs_configs(space, n, np.random.default_rng(ss))
+    raise ValueError(f"Unknown search method: {method}")
+
+
+def run_configs(
+    algs, graph, seeds, stats, worker=4, shared=True, cache=None, progress=None
+):
+    """
+    以相同的一组种子运行多个算法对象, 所有任务在同一进程池中排队
+
+    参数:
+        algs (list): 算法对象
+        seeds (list[SeedSequence]): 各次运行的随机数种子, 见run_seeds
+        stats (list[BatchStats]): 与algs对应, 结果计入其中
+        cache (ResultCache): 结果缓存, 为None时不缓存
+        progress (str): 进度条的描述, 为None时不显示
+    """
+    jobs = []
+    for i, alg in enumerate(algs):
+        key, cached = None, {}
+        if cache:
+            key = cache.key(alg, graph)
+            cached = cache.get(key, seeds)
+            for s in seeds:
+                if seed_id(s) in cached:
+                    stats[i].update(cached[seed_id(s)])
+        params = init_params(alg)
+        jobs += [
+            ((i, key, s), type(alg), params, s)
+            for s in seeds
+            if seed_id(s) not in cached
+        ]
+    try:
+        for (i, key, s), res in _run_pool(
+            graph, jobs, len(jobs), worker, shared, progress=progress
+        ):
+            stats[i].update(res)
+            if cache:
+                cache.put(key, s, res)
+    finally:
+        if cache:
+            cache.commit()
+
+
+def param_search(
+    alg,
+    graph,
+    space: dict,
+    batch: int,
+    method: str = "grid",
+    n: int = None,
+    worker: int = 4,
+    shared: bool = True,
+    seed: int = None,
+    progress: bool = True,
+    cache=DEFAULT_RESULT_CACHE,
+) -> pd.DataFrame:
+    """
+    同时测试多个参数的多组取值
+
+    所有 (参数组合, 重复次数) 组成一个任务队列在同一进程池中运行, 各参数组合
+    之间没有等待, 所有进程始终处于工作状态. 每组参数以setattr的方式设置在
+    算法对象的副本上, 与param_test一致
+
+    参数:
+        space (dict): 参数名到取值的映射, 见grid_configs及random_configs
+        batch (int): 每组参数的运行次数
+        method (str): "grid"为所有组合, "random"为随机采样, "lhs"为拉丁超立方采样
+        n (int): random及lhs的采样组数
+        seed (int): 采样及各任务随机数种子的种子, 默认随机. 各组参数使用相同的
+            一组种子, 与相同seed的batch_run一致
+        cache (ResultCache): 指定seed时使用的结果缓存, 为None时不缓存
+
+    返回:
+        DataFrame: 每行为一组参数, 包含参数值、成功运行次数(Runs)及
+            alg_test中的各项统计
+    """
+    ss = seed_sequence(seed)
+    configs = make_configs(space, method, n, ss)
+    algs = []
+    for config in configs:
+        a = copy(alg)
+        for k, v in config.items():
+            setattr(a, k, v)
+        algs.append(a)
+    stats = [BatchStats() for _ in configs]
+    seeds = run_seeds(ss, batch)
+    desc = f"{type(alg).__name__}:{method}" if progress else None
+    run_configs(
+        algs, graph, seeds, stats, worker, shared, seed is not None and cache, desc
     )
+    cls = type(alg)
+    rows = []
+    for config, st in zip(configs, stats):
+        rows.append({**config, "Runs": st.count, **st.to_series(cls.__name__)})
+    return pd.DataFrame(rows)
+
+
+def alg_test(alg, graph, batch_num, worker=4, seed=None, cache=DEFAULT_RESULT_CACHE):
+    """
+    测试蚁群算法, seed及cache见batch_run
+    """
+    stats = BatchStats()
+    for _ in iter_batch(
+        alg, graph, batch_num, worker, seed=seed, stats=stats, cache=cache
+    ):
+        pass
+    return stats.to_series(alg.__class__.__name__)
 
 
 def classical_test(alg, graph):
@@ -26,6 +26,14 @@ def get_class_init(cls):
     return init_params
 
 
+def init_params(alg) -> dict:
+    """
+    算法对象的初始化参数(见get_class_init)的当前值, 包括构造后以setattr修改的值.
+    type(alg)(**init_params(alg)) 得到参数相同的新对象, 不含搜索过程中的状态
+    """
+    return {k: getattr(alg, k) for k in get_class_init(type(alg))}
+
+
 def get_files(path=DEFAULT_MAP_PATH, format="npz"):
     """获取地图文件列表"""
     files = os.listdir(path)
@@ -0,0 +1,48 @@
+import os
+import numpy as np
+from rps.dataclass import Point
+from rps.dataclass.bitmap import BITMAP_EXT, open_bitmap, save_bitmap
+
+
+def npz_to_bitmap(src: str, dst: str = None) -> str:
+    """
+    将.npz地图转换为位压缩的.bmap格式
+
+    参数:
+        src (str): .npz地图文件路径
+        dst (str): 输出路径, 默认为与src同名的.bmap文件
+
+    返回:
+        str: 输出路径
+    """
+    if dst is None:
+        dst = os.path.splitext(src)[0] + BITMAP_EXT
+    data = np.load(src)
+    start = Point(int(data["start"][0]), int(data["start"][1]))
+    end = Point(int(data["end"][0]), int(data["end"][1]))
+    save_bitmap(dst, data["graph"], start, end)
+    return dst
+
+
+def bitmap_to_npz(src: str, dst: str = None) -> str:
+    """
+    将位压缩的.bmap地图转换为.npz格式
+
+    参数:
+        src (str): .bmap地图文件路径
+        dst (str): 输出路径, 默认为与src同名的.npz文件
+
+    返回:
+        str: 输出路径
+    """
+    if dst is None:
+        dst = os.path.splitext(src)[0] + ".npz"
+    grid, start, end = open_bitmap(src)
+    with open(dst, "wb") as f:
+        np.savez(
+            f,
+            graph=np.asarray(grid).astype(int),
+            start=[start.x, start.y],
+            end=[end.x, end.y],
+        )
+    return dst
@@ -0,0 +1,147 @@
+import os
+import json
+import sqlite3
+import hashlib
+import numpy as np
+import rps
+from rps.config import RESULT_CACHE_DB, RESULT_CACHE_ENABLED
+from .common import init_params
+
+# 参与计算代码版本的目录及文件(相对于rps), 界面代码不影响运行结果. 包括在工作
+# 进程中设置种子并重建算法对象的代码
+CODE_SOURCES = (
+    "aco",
+    "classical",
+    "dataclass",
+    "utils/batch_run.py",
+    "utils/common.py",
+    "utils/result_cache.py",
+)
+_code_version = None
+
+TABLE_SQL = """CREATE TABLE IF NOT EXISTS batch_result (
+    alg TEXT,
+    params TEXT,
+    map TEXT,
+    code TEXT,
+    seed TEXT,
+    length REAL,
+    turn_num REAL,
+    converge REAL,
+    PRIMARY KEY (alg, params, map, code, seed)
+)"""
+
+
+def code_version() -> str:
+    """算法及数据结构源代码的摘要, 代码修改后缓存的结果自动失效"""
+    global _code_version
+    if _code_version is None:
+        h = hashlib.sha1()
+        root = os.path.dirname(rps.__file__)
+        for source in CODE_SOURCES:
+            path = os.path.join(root, source)
+            files = [path] if os.path.isfile(path) else []
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                files += [os.path.join(dirpath, n) for n in sorted(filenames)]
+            for file in files:
+                if file.endswith(".py"):
+                    h.update(os.path.relpath(file, root).encode())
+                    with open(file, "rb") as f:
+                        h.update(f.read())
+        _code_version = h.hexdigest()
+    return _code_version
+
+
+def alg_key(alg) -> tuple[str, str]:
+    """
+    算法类名及其全部初始化参数的当前值(JSON, 见init_params), 作为缓存键的一部分.
+    任一参数(包括cost_to_go、batch等开关)不同的算法对象使用不同的键
+    """
+    cls = type(alg)
+    params = json.dumps(init_params(alg), sort_keys=True, default=repr)
+    return f"{cls.__module__}.{cls.__qualname__}", params
+
+
+def seed_id(seed: np.random.SeedSequence) -> str:
+    """
+    运行种子的编号, 由根种子的entropy及spawn_key组成(如 "42:3" 为seed=42的第3次
+    运行), 不同的种子编号不同
+    """
+    return f"{seed.entropy}:{'.'.join(map(str, seed.spawn_key))}"
+
+
+class ResultCache:
+    """
+    每次运行结果的持久缓存
+
+    键为 (算法类, 初始化参数, 地图摘要, 代码版本, 该次运行的种子编号(见seed_id)),
+    值为 (路径长度, 转弯次数, 收敛次数). 各次运行的种子由同一个seed确定
+    (见run_seeds), 因此重复次数增加时已运行的部分仍可命中
+
+    结果保存在单独的数据库文件中(默认为RESULT_CACHE_DB, 不纳入版本管理),
+    首次读写时才连接并创建batch_result表
+
+    属性:
+        file (str): 数据库文件路径, ":memory:"为内存数据库
+        hits (int): 命中次数
+        misses (int): 未命中次数
+    """
+
+    def __init__(self, file: str = RESULT_CACHE_DB):
+        self.file = file
+        self._conn = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """数据库连接, 首次访问时连接并创建表"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.file)
+            self._conn.execute(TABLE_SQL)
+            self._conn.commit()
+        return self._conn
+
+    def key(self, alg, graph) -> tuple[str, str, str, str]:
+        return (*alg_key(alg), graph.content_key(ends=True), code_version())
+
+    def get(self, key: tuple, seeds: list[np.random.SeedSequence]) -> dict[str, tuple]:
+        """读取一组种子对应的结果, 返回 种子编号->结果, 不含未缓存的种子"""
+        res = {}
+        ids = [seed_id(s) for s in seeds]
+        cursor = self.conn.cursor()
+        # 分批查询, 避免超过SQLite的参数个数上限
+        for i in range(0, len(ids), 500):
+            part = ids[i : i + 500]
+            cursor.execute(
+                "SELECT seed, length, turn_num, converge FROM batch_result "
+                "WHERE alg = ? AND params = ? AND map = ? AND code = ? "
+                f"AND seed IN ({','.join('?' * len(part))})",
+                (*key, *part),
+            )
+            for seed, *values in cursor.fetchall():
+                res[seed] = tuple(values)
+        self.hits += len(res)
+        self.misses += len(seeds) - len(res)
+        return res
+
+    def put(self, key: tuple, seed: np.random.SeedSequence, result: tuple) -> None:
+        """写入一次运行的结果, 由commit统一提交"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO batch_result VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (*key, seed_id(seed), *result),
+        )
+
+    def commit(self) -> None:
+        if self._conn is not None:
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """删除所有缓存的结果"""
+        self.conn.execute("DELETE FROM batch_result")
+        self.conn.commit()
+
+
+# batch_run等函数默认使用的缓存, 为None时不缓存
+DEFAULT_RESULT_CACHE = ResultCache() if RESULT_CACHE_ENABLED else None
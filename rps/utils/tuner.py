@@ -0,0 +1,181 @@
+import json
+import math
+import pandas as pd
+from .common import get_class_init
+from .batch_run import BatchStats, make_configs, run_configs, run_seeds, seed_sequence
+from .result_cache import DEFAULT_RESULT_CACHE
+
+
+class TuneResult:
+    """
+    参数调优的结果
+
+    属性:
+        alg (str): 算法类名
+        params (dict): 最佳参数, 包含所有初始化参数, 可直接用于 cls(**params)
+        stats (BatchStats): 最佳参数所有运行结果的统计
+        history (DataFrame): 每组参数的取值、运行次数、被淘汰的轮次(未淘汰为None)及平均指标
+        metric (str): 比较参数时使用的指标
+    """
+
+    def __init__(
+        self,
+        alg: str,
+        params: dict,
+        stats: BatchStats,
+        history: pd.DataFrame,
+        metric: str,
+    ):
+        self.alg = alg
+        self.params = params
+        self.stats = stats
+        self.history = history
+        self.metric = metric
+
+    def to_dict(self, level: float = 0.95) -> dict:
+        """可保存为JSON的结果, 包含各指标的平均值、标准差及置信区间"""
+        metrics = {}
+        for name in BatchStats.METRICS:
+            stat = getattr(self.stats, name)
+            metrics[name] = {
+                "mean": stat.mean,
+                "std": stat.std,
+                "ci": list(stat.ci(level)),
+            }
+        return {
+            "alg": self.alg,
+            "params": self.params,
+            "metric": self.metric,
+            "runs": self.stats.count,
+            "level": level,
+            "metrics": metrics,
+        }
+
+    def save(self, file: str, level: float = 0.95) -> None:
+        """保存为JSON文件, 可由load_params读取或在界面的"算法-加载参数"中打开"""
+        with open(file, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(level), f, indent=4, ensure_ascii=False)
+
+    def __repr__(self):
+        lo, hi = getattr(self.stats, self.metric).ci()
+        return (
+            f"TuneResult({self.alg}, {self.params}, {self.metric}: {lo:.4g}~{hi:.4g})"
+        )
+
+
+def load_params(file: str) -> tuple[str, dict]:
+    """
+    读取TuneResult.save保存的参数
+
+    返回:
+        tuple: (算法类名, 初始化参数)
+    """
+    with open(file, encoding="utf-8") as f:
+        data = json.load(f)
+    return data["alg"], data["params"]
+
+
+def successive_halving(
+    cls,
+    graph,
+    space: dict,
+    n: int = 16,
+    min_runs: int = 4,
+    max_runs: int = 64,
+    eta: int = 2,
+    method: str = "lhs",
+    fixed: dict = None,
+    metric: str = "length",
+    worker: int = 4,
+    shared: bool = True,
+    seed: int = None,
+    cache=DEFAULT_RESULT_CACHE,
+    progress: bool = True,
+) -> TuneResult:
+    """
+    以逐次减半(successive halving)调整算法参数
+
+    先为n组参数各运行min_runs次, 每轮按指标的平均值保留前 1/eta, 并将保留的参数
+    的运行次数增加到eta倍, 直到只剩一组参数或运行次数达到max_runs. 较差的参数
+    只运行少量次数, 其余次数集中在较好的参数上. 所有参数使用同一组种子(与相同
+    seed的batch_run一致), 比较时随机因素相同, 每轮只运行新增的种子
+
+    参数以初始化参数的形式传入 cls(**fixed, **config), 结果中的params可直接用于
+    算法的构造函数及界面
+
+    参数:
+        cls: 算法类
+        space (dict): 参数空间, 见param_search
+        n (int): random及lhs的采样组数
+        min_runs (int): 第一轮每组参数的运行次数
+        max_runs (int): 每组参数的最大运行次数
+        eta (int): 每轮保留 1/eta 的参数
+        method (str): 参数组合的生成方式, 见param_search
+        fixed (dict): 不参与调整的初始化参数
+        metric (str): 比较的指标, "length"、"turn"或"converge", 越小越好
+        seed (int): 采样及各次运行随机数种子的种子, 默认随机
+        cache (ResultCache): 指定seed时使用的结果缓存, 为None时不缓存
+
+    返回:
+        TuneResult: 最佳参数及其统计
+    """
+    init = get_class_init(cls)
+    fixed = fixed or {}
+    unknown = (set(space) | set(fixed)) - set(init)
+    if unknown:
+        raise ValueError(f"Unknown parameters of {cls.__name__}: {sorted(unknown)}")
+    ss = seed_sequence(seed)
+    configs = make_configs(space, method, n, ss)
+    seeds = run_seeds(ss, max_runs)
+    algs = [cls(**fixed, **config) for config in configs]
+    stats = [BatchStats() for _ in configs]
+    eliminated = [None] * len(configs)
+    cache = seed is not None and cache
+    alive = list(range(len(configs)))
+    done, runs, rnd = 0, min(min_runs, max_runs), 0
+    while True:
+        desc = (
+            f"{cls.__name__}:round {rnd} ({len(alive)}x{runs - done})"
+            if progress
+            else None
+        )
+        run_configs(
+            [algs[i] for i in alive],
+            graph,
+            seeds[done:runs],
+            [stats[i] for i in alive],
+            worker,
+            shared,
+            cache,
+            desc,
+        )
+        # 平均值相同时标准差较小者优先, 没有成功运行的参数排在最后
+        alive.sort(key=lambda i: _score(stats[i], metric))
+        if len(alive) == 1 or runs >= max_runs:
+            break
+        keep = max(1, math.ceil(len(alive) / eta))
+        for i in alive[keep:]:
+            eliminated[i] = rnd
+        alive = alive[:keep]
+        done, runs, rnd = runs, min(runs * eta, max_runs), rnd + 1
+    best = alive[0]
+    rows = []
+    for config, st, out in zip(configs, stats, eliminated):
+        row = {**config, "Runs": st.count, "Eliminated": out}
+        row.update(
+            {
+                f"Mean {name.capitalize()}": getattr(st, name).mean
+                for name in BatchStats.METRICS
+            }
+        )
+        rows.append(row)
+    params = {**init, **fixed, **configs[best]}
+    return TuneResult(cls.__name__, params, stats[best], pd.DataFrame(rows), metric)
+
+
+def _score(stats: BatchStats, metric: str) -> tuple[float, float]:
+    stat = getattr(stats, metric)
+    # 含inf(未找到路径)的结果平均值为inf或nan
+    if not stat.count or math.isnan(stat.mean):
+        return float("inf"), float("inf")
+    return stat.mean, stat.std
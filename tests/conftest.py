@@ -0,0 +1,14 @@
+import pytest
+from rps.dataclass import Graph
+
+
+@pytest.fixture
+def load():
+    """加载maps中的地图: load(name="test0", backend="dict") -> Graph"""
+
+    def load(name: str = "test0", backend: str = "dict") -> Graph:
+        g = Graph()
+        g.load(name, path="maps", backend=backend)
+        return g
+
+    return load
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from rps.aco import ACO1, ACS, IAACO, IHMACO, MAACO, MHACO
+from rps.aco.mhaco import ACO0
+from rps.utils.common import get_class_init
+
+
+@pytest.mark.parametrize("cls", [MAACO, IHMACO, IAACO])
+def test_cost_to_go_parameter(cls, load):
+    assert get_class_init(cls)["cost_to_go"] is False
+    g = load()
+    alg = cls(m=5, nc=1, cost_to_go=True)
+    alg.search(g, seed=0)
+    dist = alg.goal_distance()
+    field = alg.graph.cost_to_go(alg.end)
+    finite = np.isfinite(field) & (field > 0)
+    assert np.array_equal(dist[finite], field[finite])
+
+
+INF = float("inf")
+
+
+@pytest.mark.parametrize(
+    "cls, m, name, expected",
+    [
+        (ACS, 10, "test0", [(INF, INF, 1), (117.982756, 81, 3), (77.112698, 46, 3)]),
+        (ACS, 10, "test5", [(140.225397, 95, 3), (157.053824, 105, 2), (INF, INF, 1)]),
+        (ACO1, 5, "test0", [(28.041631, 3, 1), (28.041631, 4, 3), (28.041631, 5, 1)]),
+        (
+            ACO1,
+            5,
+            "test5",
+            [(60.083261, 22, 2), (60.669048, 19, 2), (62.669048, 22, 2)],
+        ),
+        (MHACO, 3, "test0", [(28.041631, 4, 1), (28.041631, 3, 1), (28.041631, 3, 1)]),
+        (
+            MHACO,
+            3,
+            "test5",
+            [(60.083261, 20, 3), (60.669048, 19, 3), (60.911688, 16, 2)],
+        ),
+    ],
+)
+def test_seeded_default_results(cls, m, name, expected, load):
+    # 默认参数改为按名称传递前实际生效的值, 结果与改动前逐位一致
+    g = load(name)
+    res = [cls(m=m, nc=3).search(g, return_path=False, seed=s) for s in range(3)]
+    assert [(round(l, 6), t, c) for l, t, c in res] == expected
+
+
+@pytest.mark.parametrize("cls", [ACS, ACO0])
+def test_keyword_parameters_take_effect(cls):
+    alg = cls(alpha=1, beta=2, rho=0.3, t0=4)
+    assert (alg.alpha, alg.beta, alg.rho, alg.t0) == (1, 2, 0.3, 4)
@@ -0,0 +1,305 @@
+import pickle
+import numpy as np
+import pandas as pd
+import pytest
+from rps.dataclass import Graph, Point
+from rps.aco import ACS, AS, MAACO, MHACO
+from rps.utils.batch_run import (
+    BatchStats,
+    RunningStats,
+    batch_run,
+    grid_configs,
+    iter_batch,
+    lhs_configs,
+    make_configs,
+    param_search,
+    random_configs,
+    run_seeds,
+)
+from rps.utils.common import get_class_init, init_params
+from rps.utils.result_cache import ResultCache, alg_key, seed_id
+
+
+@pytest.mark.parametrize("cls", [AS, ACS, MAACO, MHACO])
+def test_init_params_round_trip(cls):
+    alg = cls(m=5, nc=2)
+    alg.q0 = 0.25
+    if cls is MAACO:
+        alg.cost_to_go = True
+    params = init_params(alg)
+    assert set(params) == set(get_class_init(cls))
+    copy = cls(**params)
+    assert init_params(copy) == params
+    if cls is MAACO:
+        assert params["cost_to_go"] is True
+
+
+def test_init_params_excludes_runtime_state(load):
+    g = load()
+    alg = AS(m=5, nc=2, batch=True)
+    alg.search(g, seed=0)
+    params = init_params(alg)
+    assert "engine" not in params and "paths" not in params
+    pickle.dumps(params)
+    res = batch_run(alg, g, 2, worker=1, return_average=False, seed=0, cache=None)
+    assert len(res) == 2
+
+
+def test_alg_key_covers_all_parameters():
+    base = alg_key(MAACO())
+    assert alg_key(MAACO(cost_to_go=True)) != base
+    assert alg_key(MAACO(batch=True)) != base
+    alg = MAACO()
+    alg.cost_to_go = True
+    assert alg_key(alg) == alg_key(MAACO(cost_to_go=True))
+
+
+def test_run_seeds_are_distinct_and_stable():
+    seeds = run_seeds(7, 1000)
+    assert len({seed_id(s) for s in seeds}) == 1000
+    assert len({tuple(s.generate_state(4)) for s in seeds}) == 1000
+    assert [seed_id(s) for s in run_seeds(7, 1000, 990)] == [seed_id(s) for s in seeds[990:]]
+    assert seed_id(seeds[3]) == "7:3"
+
+
+def test_result_cache_reuses_runs(load):
+    cache = ResultCache(":memory:")
+    g = load()
+    alg = MAACO(m=5, nc=2)
+    first = batch_run(alg, g, 3, worker=2, return_average=False, seed=1, cache=cache)
+    more = batch_run(alg, g, 5, worker=2, return_average=False, seed=1, cache=cache)
+    assert cache.hits == 3 and cache.misses == 5
+    assert sorted(first) == sorted(more[:3])
+    assert sorted(more) == sorted(batch_run(alg, g, 5, worker=2, return_average=False, seed=1, cache=None))
+
+
+def two_walls() -> Graph:
+    arr = np.zeros((10, 10), dtype=int)
+    arr[3, :7] = 1
+    arr[6, 3:] = 1
+    g = Graph(arr, Point(0, 0), Point(9, 9))
+    g.get_all_edges()
+    return g
+
+
+def fixed_q0(cls, q0: float):
+    """q0固定为给定值的子类, MAACO等在每次迭代中修改q0"""
+    return type(
+        cls.__name__, (cls,), {"q0": property(lambda self: q0, lambda self, v: None)}
+    )
+
+
+def tours(alg, g) -> tuple[list, list]:
+    alg.search(g, seed=0)
+    return [p.path for p in alg.paths], alg.length_history
+
+
+@pytest.mark.parametrize(
+    "make, name",
+    [
+        (lambda batch: ACS(m=8, nc=4, q0=1, rho=0, batch=batch), None),
+        (lambda batch: fixed_q0(MAACO, 1)(m=8, nc=4, batch=batch), None),
+        (lambda batch: fixed_q0(MAACO, 1)(m=8, nc=4, batch=batch), "test1"),
+    ],
+    ids=["ACS", "MAACO", "MAACO-test1"],
+)
+def test_batch_tour_matches_sequential_greedy(make, name, load):
+    # q0 = 1且没有局部更新时每一步都选择权重最大的方向, 两种方式的每条路径应完全相同
+    g = two_walls() if name is None else load(name)
+    assert tours(make(True), g) == tours(make(False), g)
+
+
+@pytest.mark.parametrize(
+    "make",
+    [
+        lambda batch: AS(m=600, nc=1, beta=1, batch=batch),
+        lambda batch: ACS(m=600, nc=1, q0=0, rho=0, batch=batch),
+        lambda batch: fixed_q0(MAACO, 0)(m=600, nc=1, batch=batch),
+    ],
+    ids=["AS", "ACS", "MAACO"],
+)
+def test_batch_tour_matches_sequential_distribution(make):
+    # 第一次迭代中各蚂蚁独立地按同一分布构建路径. BatchTour使用随机数的顺序与
+    # 逐只构建不同, 在显著性水平0.001下比较: 路径长度(含遇到死角后重新开始的
+    # 路径)用两样本Kolmogorov-Smirnov检验, 有效路径的比例用两比例z检验
+    g = two_walls()
+    lengths, valid = [], []
+    for batch in (False, True):
+        alg = make(batch)
+        alg.search(g, seed=1)
+        lengths.append(np.array([p.length for p in alg.paths]))
+        valid.append(np.mean([p.valid for p in alg.paths]))
+    n = len(lengths[0])
+    values = np.union1d(*lengths)
+    cdf = [np.searchsorted(np.sort(s), values, side="right") / n for s in lengths]
+    assert np.abs(cdf[0] - cdf[1]).max() <= 1.949 * (2 / n) ** 0.5
+    p = np.mean(valid)
+    assert abs(valid[0] - valid[1]) <= 3.291 * (p * (1 - p) * 2 / n) ** 0.5
+
+
+def test_result_cache_created_lazily(tmp_path):
+    file = tmp_path / "results.db"
+    cache = ResultCache(str(file))
+    cache.commit()
+    assert not file.exists()
+    assert cache.get(("a", "{}", "m", "c"), run_seeds(0, 2)) == {}
+    assert file.exists()
+
+
+def test_code_version_covers_batch_runner(monkeypatch):
+    import rps.utils.result_cache as result_cache
+
+    sources = set(result_cache.CODE_SOURCES)
+    assert {"utils/batch_run.py", "utils/common.py", "utils/result_cache.py"} <= sources
+    monkeypatch.setattr(result_cache, "_code_version", None)
+    full = result_cache.code_version()
+    monkeypatch.setattr(result_cache, "_code_version", None)
+    monkeypatch.setattr(result_cache, "CODE_SOURCES", ("aco", "classical", "dataclass"))
+    assert result_cache.code_version() != full
+
+
+def test_visited_sets_match_python_sets():
+    from rps.aco.batch import VisitedSets
+
+    rng = np.random.default_rng(0)
+    m, n = 7, 5000
+    sets = VisitedSets(m, capacity=4)
+    expected = [set() for _ in range(m)]
+    for step in range(300):
+        ants = np.flatnonzero(rng.random(m) < 0.8)
+        nodes = rng.integers(0, n, len(ants))
+        sets.add(ants, nodes)
+        for k, node in zip(ants.tolist(), nodes.tolist()):
+            expected[k].add(node)
+        if step % 97 == 96:
+            sets.clear(np.array([step % m]))
+            expected[step % m].clear()
+        query = rng.integers(0, n, (m, 8))
+        query[:, 0] = nodes[0] if len(nodes) else 0
+        found = sets.contains(np.arange(m), query)
+        assert found.tolist() == [
+            [q in expected[k] for q in query[k]] for k in range(m)
+        ]
+    assert sets.count.tolist() == [len(s) for s in expected]
+    # 容量只与元素数有关
+    assert sets.keys.shape[1] <= 4 * max(len(s) for s in expected)
+
+
+SPACE = {"alpha": (0.5, 2.0), "m": (2, 5), "q0": [0.1, 0.5, 0.9]}
+
+
+def check_bounds(configs: list[dict]) -> None:
+    for c in configs:
+        assert 0.5 <= c["alpha"] < 2.0 and isinstance(c["alpha"], float)
+        assert 2 <= c["m"] <= 5 and isinstance(c["m"], int)
+        assert c["q0"] in SPACE["q0"]
+
+
+def test_grid_configs():
+    space = {"alpha": [1, 2], "beta": [0, 1, 2], "q0": [0.5]}
+    configs = grid_configs(space)
+    assert len(configs) == 6
+    assert {tuple(c.values()) for c in configs} == {
+        (a, b, 0.5) for a in (1, 2) for b in (0, 1, 2)
+    }
+
+
+@pytest.mark.parametrize("sample", [random_configs, lhs_configs])
+@pytest.mark.parametrize("n", [1, 4, 25])
+def test_sampled_configs_respect_bounds(sample, n):
+    configs = sample(SPACE, n, np.random.default_rng(n))
+    assert len(configs) == n
+    assert all(list(c) == list(SPACE) for c in configs)
+    check_bounds(configs)
+
+
+def test_lhs_covers_each_stratum_once():
+    n = 12
+    space = {"x": (0.0, 3.0), "k": (1, 12), "v": list(range(12))}
+    configs = lhs_configs(space, n, np.random.default_rng(0))
+    assert sorted(int(c["x"] / 3.0 * n) for c in configs) == list(range(n))
+    assert sorted(c["k"] for c in configs) == list(range(1, 13))
+    assert sorted(c["v"] for c in configs) == list(range(12))
+
+
+def test_make_configs_is_seeded():
+    ss = np.random.SeedSequence(5)
+    for method in ("random", "lhs"):
+        a = make_configs(SPACE, method, 8, ss)
+        assert a == make_configs(SPACE, method, 8, np.random.SeedSequence(5))
+        assert a != make_configs(SPACE, method, 8, np.random.SeedSequence(6))
+    with pytest.raises(ValueError):
+        make_configs(SPACE, "bayes", 8, ss)
+
+
+def test_param_search_reproducible(load):
+    g = load()
+    alg = MAACO(m=3, nc=2)
+    space = {"alpha": (0.5, 2.0), "q0_initial": [0.2, 0.8]}
+
+    def search(cache):
+        df = param_search(
+            alg, g, space, 2, "lhs", 3, 2, seed=11, progress=False, cache=cache
+        )
+        return df.sort_values(list(space)).reset_index(drop=True)
+
+    first = search(None)
+    assert len(first) == 3 and (first["Runs"] == 2).all()
+    assert first["alpha"].between(0.5, 2.0).all()
+    assert set(first["q0_initial"]) <= {0.2, 0.8}
+    # 结果按完成顺序计入统计, 平均值可能相差舍入误差
+    pd.testing.assert_frame_equal(first, search(None))
+    pd.testing.assert_frame_equal(first, search(ResultCache(":memory:")))
+
+
+@pytest.mark.parametrize("sizes", [[1], [3], [5, 1, 7], [200, 50, 1000]])
+def test_running_stats_match_numpy(sizes):
+    rng = np.random.default_rng(len(sizes))
+    batches = [rng.normal(1e4, 3.0, size) for size in sizes]
+    stats = RunningStats()
+    seen = np.array([])
+    for batch in batches:
+        for x in batch.tolist():
+            stats.update(x)
+        seen = np.concatenate([seen, batch])
+        assert stats.count == len(seen)
+        assert stats.mean == pytest.approx(np.mean(seen), rel=1e-12)
+        assert stats.min == seen.min()
+        # std为总体标准差, var及ci使用样本方差
+        assert stats.std == pytest.approx(np.std(seen), rel=1e-9, abs=1e-12)
+        if len(seen) > 1:
+            assert stats.var == pytest.approx(np.var(seen, ddof=1), rel=1e-9)
+            half = 1.959963984540054 * (np.var(seen, ddof=1) / len(seen)) ** 0.5
+            assert stats.ci() == pytest.approx((seen.mean() - half, seen.mean() + half))
+        else:
+            assert stats.var == 0 and stats.ci() == (seen[0], seen[0])
+
+
+def test_running_stats_empty_and_inf():
+    stats = RunningStats()
+    assert (stats.count, stats.mean, stats.std, stats.var) == (0, 0.0, 0.0, 0.0)
+    assert stats.min == float("inf") and stats.ci() == (0.0, 0.0)
+    for x in (1.0, float("inf"), 2.0):
+        stats.update(x)
+    with np.errstate(invalid="ignore"):
+        expected = np.array([1.0, float("inf"), 2.0])
+        assert stats.mean == np.mean(expected) and np.isnan(np.std(expected))
+    assert np.isnan(stats.std) and stats.min == 1.0
+
+
+def test_iter_batch_streams_into_batch_stats(load):
+    g = load()
+    stats = BatchStats()
+    alg = MAACO(m=3, nc=2)
+    res = list(
+        iter_batch(alg, g, 6, 2, seed=4, stats=stats, progress=False, cache=None)
+    )
+    assert stats.count == len(res) == 6
+    arr = np.array(res, dtype=float)
+    assert stats.mean() == pytest.approx(tuple(arr.mean(axis=0)))
+    series = stats.to_series("MAACO")
+    assert series["Best Length"] == arr[:, 0].min()
+    assert series["Std Turn"] == pytest.approx(arr[:, 1].std())
+    assert sorted(res) == sorted(
+        batch_run(alg, g, 6, worker=2, return_average=False, seed=4, cache=None)
+    )
@@ -0,0 +1,77 @@
+import os
+import shutil
+import numpy as np
+import pytest
+from rps.dataclass import Graph, Point
+from rps.dataclass.bitmap import BitGrid, open_bitmap, read_header, save_bitmap
+from rps.utils.convert_map import bitmap_to_npz, npz_to_bitmap
+from test_edges import MAPS
+
+
+@pytest.mark.parametrize("name", MAPS)
+def test_npz_bitmap_round_trip(name, tmp_path):
+    src = str(tmp_path / f"{name}.npz")
+    shutil.copy(os.path.join("maps", f"{name}.npz"), src)
+    bmap = npz_to_bitmap(src)
+    assert bmap == str(tmp_path / f"{name}.bmap")
+    npz = bitmap_to_npz(bmap, str(tmp_path / "back.npz"))
+    before, after = np.load(src), np.load(npz)
+    assert np.array_equal(before["graph"] != 0, after["graph"])
+    assert list(before["start"]) == list(after["start"])
+    assert list(before["end"]) == list(after["end"])
+
+
+@pytest.mark.parametrize("length", [1, 7, 8, 9, 15, 17, 33])
+def test_odd_widths(length, tmp_path):
+    rng = np.random.default_rng(length)
+    arr = (rng.random((5, length)) < 0.4).astype(int)
+    grid = BitGrid.from_array(arr)
+    assert grid.shape == arr.shape
+    assert grid.bits.shape == (5, (length + 7) // 8)
+    assert np.array_equal(np.asarray(grid), arr)
+    assert all(grid[x, y] == arr[x, y] for x in range(5) for y in range(length))
+    file = str(tmp_path / "odd.bmap")
+    save_bitmap(file, arr, Point(0, 0), Point(4, length - 1), chunk=2)
+    assert os.path.getsize(file) == 64 + 5 * ((length + 7) // 8)
+    assert read_header(file) == (5, length, Point(0, 0), Point(4, length - 1))
+    loaded, _, _ = open_bitmap(file)
+    assert np.array_equal(np.asarray(loaded), arr)
+    # 修改最后一列不影响行末的填充位
+    grid[4, length - 1] = 1 - arr[4, length - 1]
+    grid[0] = 1 - arr[0]
+    arr[4, length - 1] = 1 - arr[4, length - 1]
+    arr[0] = 1 - arr[0]
+    assert np.array_equal(np.asarray(grid), arr)
+
+
+def as_bitmap(src: Graph, tmp_path) -> str:
+    file = str(tmp_path / "src.bmap")
+    save_bitmap(file, src.graph, src.start, src.end)
+    return file
+
+
+def test_read_only_edit_raises(tmp_path, load):
+    src = load("test1")
+    file = as_bitmap(src, tmp_path)
+    g = Graph()
+    g.load(file=file)
+    with pytest.raises(ValueError):
+        g[Point(0, 0)] = 1 - g.graph[0, 0]
+    # 写时复制: 修改只在内存中生效, 文件不变
+    g.load(file=file, mode="c")
+    g[Point(0, 0)] = 1 - src.graph[0, 0]
+    assert g.graph[0, 0] != src.graph[0, 0]
+    assert np.array_equal(np.asarray(open_bitmap(file)[0]), src.graph != 0)
+
+
+def test_bitmap_defaults_to_lazy_backend(tmp_path, load):
+    src = load("test1")
+    file = as_bitmap(src, tmp_path)
+    g = Graph()
+    g.load(file=file)
+    assert g.backend == "lazy"
+    assert {r: dict(g.edges[r]) for r in g.edges} == src.edges
+    g.load(file=file, backend="csr")
+    assert g.backend == "csr"
+    g.load("test1", path="maps")
+    assert g.backend == "csr"
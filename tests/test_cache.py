@@ -0,0 +1,58 @@
+import os
+import numpy as np
+from rps.dataclass.cache import ArtifactCache
+
+
+def fill(cache: ArtifactCache, keys: str) -> dict:
+    """每个键写入一个不同的数组, 并依次设置递增的最近使用时间"""
+    data = {}
+    for i, key in enumerate(keys):
+        data[key] = np.arange(1000, dtype=float) + i
+        cache.put(key, "a", data[key])
+        os.utime(os.path.join(cache.root, key), (1000 + i, 1000 + i))
+    return data
+
+
+def entry_size(tmp_path) -> int:
+    cache = ArtifactCache(str(tmp_path / "probe"))
+    cache.put("k", "a", np.zeros(1000))
+    return cache.entries()[0][1]
+
+
+def test_evict_removes_least_recently_used(tmp_path):
+    size = entry_size(tmp_path)
+    cache = ArtifactCache(str(tmp_path / "cache"), max_bytes=3 * size)
+    data = fill(cache, "abc")
+    assert sorted(os.listdir(cache.root)) == ["a", "b", "c"]
+    # 读取a使其成为最近使用, 再写入d时淘汰最久未使用的b
+    mapped = cache.get("a", "a")
+    assert isinstance(mapped, np.memmap)
+    cache.put("d", "a", np.ones(1000))
+    assert sorted(os.listdir(cache.root)) == ["a", "c", "d"]
+    assert cache.get("b", "a") is None
+    assert np.array_equal(mapped, data["a"])
+
+
+def test_evicted_mmap_stays_valid(tmp_path):
+    size = entry_size(tmp_path)
+    cache = ArtifactCache(str(tmp_path / "cache"), max_bytes=2 * size)
+    data = fill(cache, "ab")
+    mapped = cache.get("a", "a")
+    os.utime(os.path.join(cache.root, "a"), (1, 1))
+    cache.put("c", "a", np.ones(1000))
+    cache.put("d", "a", np.ones(1000))
+    assert sorted(os.listdir(cache.root)) == ["c", "d"]
+    # 目录已删除, 仍在使用的内存映射不受影响
+    assert np.array_equal(mapped, data["a"])
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_evict_keeps_entry_being_written(tmp_path):
+    size = entry_size(tmp_path)
+    cache = ArtifactCache(str(tmp_path / "cache"), max_bytes=size)
+    fill(cache, "ab")
+    cache.put("big", "a", np.zeros(5000))
+    assert os.listdir(cache.root) == ["big"]
+    assert np.array_equal(cache.get("big", "a"), np.zeros(5000))
+    cache.clear()
+    assert cache.entries() == []
@@ -0,0 +1,63 @@
+import os
+import numpy as np
+import pytest
+from rps.dataclass import Graph, Point
+
+MAPS = sorted(
+    os.path.splitext(f)[0] for f in os.listdir("maps") if f.endswith((".npz", ".bmap"))
+)
+
+
+def loop_edges(g: Graph) -> dict:
+    """get_all_edges改为向量化计算之前的逐点循环"""
+    edges = {}
+    for i in range(g.width):
+        for j in range(g.length):
+            r = Point(i, j)
+            if r in g:
+                edges[r] = {s: dist for s, dist in g.neighbors(r)}
+    return edges
+
+
+def as_lists(edges) -> list:
+    """保留顺序的邻接表, 用于同时比较内容及键的顺序"""
+    return [(r, list(edges[r].items())) for r in edges]
+
+
+def random_graph(seed: int, backend: str = "dict") -> Graph:
+    rng = np.random.default_rng(seed)
+    w, l = rng.integers(1, 30, size=2)
+    arr = (rng.random((w, l)) < rng.choice([0.1, 0.3, 0.5])).astype(int)
+    return Graph(arr, Point(0, 0), Point(int(w) - 1, int(l) - 1), backend)
+
+
+@pytest.mark.parametrize("name", MAPS)
+def test_maps_match_loop(name, load):
+    g = load(name)
+    assert as_lists(g.get_all_edges()) == as_lists(loop_edges(g))
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_random_grids_match_loop(seed):
+    g = random_graph(seed)
+    assert as_lists(g.get_all_edges()) == as_lists(loop_edges(g))
+
+
+@pytest.mark.parametrize("backend", ["csr", "lazy"])
+@pytest.mark.parametrize("name", MAPS)
+def test_backends_match_loop(name, backend, load):
+    g = load(name, backend)
+    edges = g.get_all_edges()
+    expected = loop_edges(g)
+    for r, row in expected.items():
+        # "csr"方式的距离以float32保存
+        assert list(edges[r]) == list(row)
+        assert list(edges[r].values()) == pytest.approx(list(row.values()))
+
+
+def test_csr_rows_cache_is_bounded(load):
+    g = load("test1", "csr")
+    g.edges.maxsize = 10
+    for r in g.edges:
+        assert list(g.edges[r]) == [s for s, _ in g.neighbors(r)]
+    assert len(g.edges.rows) == 10
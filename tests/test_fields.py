@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from rps.dataclass import Graph, Point
+from test_edges import MAPS, random_graph
+
+
+def brute_obstacle_distance(g: Graph) -> np.ndarray:
+    """逐点求到所有障碍物(含地图边界外一圈)的最小欧几里得距离"""
+    pad = np.ones((g.width + 2, g.length + 2), dtype=bool)
+    pad[1:-1, 1:-1] = ~g.free()
+    obstacles = np.argwhere(pad) - 1
+    xs, ys = np.indices(g.size)
+    d2 = (xs[..., None] - obstacles[:, 0]) ** 2 + (ys[..., None] - obstacles[:, 1]) ** 2
+    return np.sqrt(d2.min(axis=-1))
+
+
+@pytest.mark.parametrize("name", MAPS)
+def test_obstacle_distance_maps(name, load):
+    g = load(name)
+    np.testing.assert_allclose(g.obstacle_distance(), brute_obstacle_distance(g))
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_obstacle_distance_random(seed):
+    g = random_graph(seed)
+    np.testing.assert_allclose(g.obstacle_distance(), brute_obstacle_distance(g))
+
+
+def test_obstacle_distance_cleared_on_edit():
+    g = random_graph(0)
+    g.get_all_edges()
+    g.obstacle_distance()
+    free = np.argwhere(g.free())
+    g[Point(*map(int, free[len(free) // 2]))] = 1
+    np.testing.assert_allclose(g.obstacle_distance(), brute_obstacle_distance(g))
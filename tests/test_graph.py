@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+from rps.dataclass import Graph, Point
+from rps.classical import (
+    A_Star,
+    BiA_Star,
+    BiDijkstra,
+    Dijkstra,
+    HPA_Star,
+    JPS,
+    JPS_Plus,
+)
+
+
+PLANNERS = [Dijkstra, A_Star, JPS, JPS_Plus, BiDijkstra, BiA_Star, HPA_Star]
+
+
+def walled(backend="dict"):
+    """中间一列为墙, 起点与终点位于墙的两侧"""
+    arr = np.zeros((8, 9), dtype=int)
+    arr[:, 4] = 1
+    g = Graph(arr, Point(1, 1), Point(6, 7), backend)
+    g.get_all_edges()
+    return g
+
+
+@pytest.mark.parametrize("cls", PLANNERS)
+@pytest.mark.parametrize("backend", Graph.BACKENDS)
+def test_search_does_not_label_components(cls, backend):
+    g = walled(backend)
+    assert cls().search(g) is None
+    assert g.labels is None
+    g[Point(3, 4)] = 0
+    path = cls().search(g)
+    assert path is not None and path[0] == g.start and path[-1] == g.end
+    assert g.labels is None
+
+
+def test_unreachable_uses_cached_labels_only():
+    g = walled()
+    assert not g.unreachable()
+    assert g.labels is None
+    assert not g.connected()
+    assert g.unreachable()
+    g[Point(1, 1)] = 1
+    assert g.unreachable()
+
+
+def test_pruned_follows_endpoints():
+    # 第0行为主通道, 第2列向下为死胡同
+    arr = np.ones((5, 6), dtype=int)
+    arr[0, :] = 0
+    arr[1:, 2] = 0
+    g = Graph(arr, Point(0, 0), Point(0, 5))
+    g.get_all_edges()
+    assert Point(4, 2) not in g.pruned()
+    g.end = Point(4, 2)
+    pruned = g.pruned()
+    assert pruned.end == g.end and g.end in pruned
+    assert Point(0, 5) not in pruned
+
+
+def test_content_key_follows_endpoints():
+    g = walled()
+    key, grid = g.content_key(ends=True), g.content_key()
+    g.end = Point(6, 8)
+    assert g.content_key(ends=True) != key
+    assert g.content_key() == grid
+    g.end = Point(6, 7)
+    assert g.content_key(ends=True) == key
+    g[Point(3, 4)] = 0
+    assert g.content_key() != grid
+
+
+def assert_same_edges(g: Graph) -> None:
+    """原地更新后的邻接表与重新生成的一致(含邻居的顺序)"""
+    fresh = Graph(np.array(g.graph), g.start, g.end, g.backend)
+    expected = fresh.get_all_edges()
+    for x in range(g.width):
+        for y in range(g.length):
+            p = Point(x, y)
+            assert (p in g.edges) == (p in expected)
+            if p in expected:
+                assert list(g.edges[p].items()) == list(expected[p].items())
+
+
+@pytest.mark.parametrize("backend", Graph.BACKENDS)
+@pytest.mark.parametrize("seed", range(10))
+def test_incremental_edits_match_rebuild(backend, seed):
+    rng = np.random.default_rng(seed)
+    arr = (rng.random((12, 15)) < 0.3).astype(int)
+    g = Graph(arr, Point(0, 0), Point(11, 14), backend)
+    g.get_all_edges()
+    changes = []
+    g.subscribe(lambda graph, cells: changes.append(cells))
+    for _ in range(20):
+        version = g.version
+        if rng.random() < 0.2:
+            x = int(rng.integers(g.width))
+            row = (rng.random(g.length) < 0.3).astype(int)
+            changed = np.flatnonzero(row != np.asarray(g.graph[x]))
+            g[x] = row
+        else:
+            p = Point(*map(int, rng.integers(0, g.size)))
+            changed = [p]
+            g[p] = 1 - g[p]
+        assert g.version == version + (len(changed) > 0)
+        assert_same_edges(g)
+    assert len(changes) == g.version - 1 and all(changes)
@@ -0,0 +1,24 @@
+import pytest
+from rps.dataclass import Path, Point
+from rps.dataclass.path import VisitedMarks
+from rps.aco import ACS, MAACO
+
+
+def test_use_marks_twice():
+    path = Path([Point(0, 0), Point(0, 1)])
+    path.use_marks(VisitedMarks(2, 3))
+    path.use_marks(VisitedMarks(3, 3))
+    assert path.points == {Point(0, 0), Point(0, 1)}
+    assert Point(0, 1) in path and Point(1, 1) not in path
+    path.append(Point(1, 1))
+    assert Point(1, 1) in path
+
+
+@pytest.mark.parametrize("cls", [ACS, MAACO])
+def test_reuse_instance(cls, load):
+    g = load()
+    alg = cls(m=5, nc=2)
+    first = alg.search(g, seed=3).path.copy()
+    second = alg.search(g, seed=3).path
+    assert second == first == cls(m=5, nc=2).search(g, seed=3).path
+    assert second[0] == g.start and second[-1] == g.end
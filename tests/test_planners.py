@@ -0,0 +1,173 @@
+import numpy as np
+import pytest
+from rps.dataclass import Graph, Point
+from rps.classical import (
+    A_Star,
+    BiA_Star,
+    BiDijkstra,
+    D_Star_Lite,
+    Dijkstra,
+    HPA_Star,
+    JPS,
+    JPS_Plus,
+)
+from test_edges import MAPS
+
+
+def random_query(seed: int, backend: str = "dict") -> Graph:
+    """随机地图, 起点与终点为随机选取的两个通路点"""
+    rng = np.random.default_rng(seed)
+    w, l = rng.integers(2, 30, size=2)
+    arr = (rng.random((w, l)) < rng.choice([0.1, 0.25, 0.35])).astype(int)
+    free = np.argwhere(arr == 0)
+    if len(free) < 2:
+        arr[0, 0] = arr[-1, -1] = 0
+        free = np.argwhere(arr == 0)
+    s, e = rng.choice(len(free), 2, replace=False)
+    g = Graph(arr, Point(*map(int, free[s])), Point(*map(int, free[e])), backend)
+    g.get_all_edges()
+    return g
+
+
+def check_path(path, g: Graph) -> None:
+    """路径从起点到终点, 且每一步都是地图中的一条边"""
+    assert path[0] == g.start and path[-1] == g.end
+    length = 0
+    for a, b in path.get():
+        assert b in g.edges[a]
+        length += g.edges[a][b]
+    assert path.length == pytest.approx(length)
+
+
+def assert_optimal(cls, g: Graph) -> None:
+    expected = Dijkstra().search(g)
+    path = cls().search(g)
+    if expected is None:
+        assert path is None
+        return
+    check_path(path, g)
+    assert path.length == pytest.approx(expected.length)
+
+
+@pytest.mark.parametrize("cls", [JPS, JPS_Plus])
+@pytest.mark.parametrize("name", MAPS)
+def test_jps_maps(cls, name, load):
+    assert_optimal(cls, load(name))
+
+
+@pytest.mark.parametrize("cls", [JPS, JPS_Plus])
+@pytest.mark.parametrize("seed", range(100))
+def test_jps_random(cls, seed):
+    assert_optimal(cls, random_query(seed))
+
+
+@pytest.mark.parametrize("cls", [BiDijkstra, BiA_Star])
+@pytest.mark.parametrize("backend", Graph.BACKENDS)
+@pytest.mark.parametrize("name", MAPS)
+def test_bidirectional_maps(cls, backend, name, load):
+    assert_optimal(cls, load(name, backend))
+
+
+@pytest.mark.parametrize("cls", [BiDijkstra, BiA_Star])
+@pytest.mark.parametrize("seed", range(100))
+def test_bidirectional_random(cls, seed):
+    assert_optimal(cls, random_query(seed))
+
+
+@pytest.mark.parametrize("cls", [A_Star, Dijkstra])
+def test_reuse_across_backends(cls, load):
+    # 同一对象交替用于"csr"与字典邻接表的地图, 每次结果都与新对象一致
+    planner = cls()
+    for name, backend in [("test1", "csr"), ("test1", "dict"), ("test2", "dict")]:
+        g = load(name, backend)
+        path = planner.search(g)
+        check_path(path, g)
+        assert path.length == pytest.approx(cls().search(g).length)
+
+
+def test_bidirectional_expands_less(load):
+    g = load("test5")
+    dijkstra, bi = Dijkstra(), BiDijkstra()
+    dijkstra.search(g)
+    bi.search(g)
+    assert bi.expanded < dijkstra.expanded
+
+
+def assert_complete(cls, g: Graph, bound: float = float("inf")) -> None:
+    """与Dijkstra同样找到路径, 长度不短于最短路径且不超过其bound倍"""
+    expected = Dijkstra().search(g)
+    path = cls().search(g)
+    if expected is None:
+        assert path is None
+        return
+    check_path(path, g)
+    assert expected.length - 1e-9 <= path.length <= bound * expected.length
+
+
+@pytest.mark.parametrize("size", [2, 3, 5, 10])
+@pytest.mark.parametrize("seed", range(60))
+def test_hpa_random(size, seed):
+    assert_complete(lambda: HPA_Star(size, cache=False), random_query(seed), 1.5)
+
+
+def test_hpa_adjacent_cells_across_border():
+    # 相邻区块中的两个相邻格点, 直接搜索给出一步的路径而不是绕行过渡点
+    g = Graph(np.zeros((20, 20), dtype=int), Point(5, 9), Point(5, 10))
+    g.get_all_edges()
+    path = HPA_Star(10, cache=False).search(g)
+    check_path(path, g)
+    assert path.length == 1
+
+
+@pytest.mark.parametrize("name", MAPS)
+def test_hpa_maps_with_file_cache(name, tmp_path, load):
+    src = load(name)
+    g = Graph(np.asarray(src.graph).copy(), src.start, src.end)
+    g.save(name, path=str(tmp_path))
+    g.load(name, path=str(tmp_path))
+    hpa = HPA_Star()
+    first = hpa.search(g)
+    assert str(np.load(hpa.cache_file(g))["key"]) == g.content_key()
+    assert_complete(HPA_Star, g, bound=1.05)
+    assert HPA_Star().search(g).path == first.path
+
+
+def test_hpa_rebuilds_after_edit(load):
+    g = load("test1")
+    hpa = HPA_Star(cache=False)
+    hpa.search(g)
+    path = Dijkstra().search(g)
+    g[path[len(path) // 2]] = 1
+    assert_complete(lambda: hpa, g)
+
+
+@pytest.mark.parametrize("name", MAPS)
+def test_d_star_lite_maps(name, load):
+    assert_optimal(D_Star_Lite, load(name))
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_d_star_lite_random(seed):
+    assert_optimal(D_Star_Lite, random_query(seed))
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_d_star_lite_replans_after_edits(seed):
+    rng = np.random.default_rng(seed)
+    g = random_query(seed)
+    d_star = D_Star_Lite()
+    d_star.search(g)
+    for _ in range(10):
+        p = Point(*map(int, rng.integers(0, g.size)))
+        if p != g.start and p != g.end:
+            g[p] = 1 - g[p]
+        assert_optimal(lambda: d_star, g)
+
+
+def test_d_star_lite_moving_start(load):
+    g = load("test1")
+    d_star = D_Star_Lite()
+    path = d_star.search(g)
+    for p in list(path)[1:-1:5]:
+        g.start = p
+        assert_optimal(lambda: d_star, g)
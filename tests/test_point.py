@@ -0,0 +1,18 @@
+import gc
+import pickle
+from rps.dataclass import Dir, Point
+
+
+def test_interned_while_referenced():
+    p = Point(123456, 7)
+    assert Point(123456, 7) is p
+    assert pickle.loads(pickle.dumps(p)) is p
+    assert Point(1, 2) - Point(0, 1) is Dir(1, 1)
+
+
+def test_pool_does_not_keep_points_alive():
+    points = [Point(10**6 + i, -1) for i in range(1000)]
+    size = len(Point._pool)
+    del points
+    gc.collect()
+    assert len(Point._pool) <= size - 1000
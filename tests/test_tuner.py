@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+import rps.aco
+from rps.dataclass import Graph, Point
+from rps.aco import MAACO
+from rps.utils import get_algs, load_params, successive_halving
+from rps.utils.common import get_class_init, init_params
+from rps.utils.result_cache import ResultCache
+
+
+class Stub:
+    """路径长度为 x 加上由种子决定的小于0.01的扰动, 参数的排序只由x决定"""
+
+    def __init__(self, x: float = 0.0, y: int = 0):
+        self.x = x
+        self.y = y
+
+    def search(self, graph, return_path=False, seed=None):
+        return self.x + 0.01 * np.random.default_rng(seed).random(), self.y, 1
+
+
+def small_graph() -> Graph:
+    g = Graph(np.zeros((4, 4), dtype=int), Point(0, 0), Point(3, 3))
+    g.get_all_edges()
+    return g
+
+
+def tune(cache):
+    space = {"x": [5.0, 3.0, 7.0, 0.0, 6.0, 1.0, 4.0, 2.0]}
+    return successive_halving(
+        Stub,
+        small_graph(),
+        space,
+        min_runs=2,
+        max_runs=8,
+        eta=2,
+        method="grid",
+        fixed={"y": 3},
+        worker=2,
+        seed=0,
+        cache=cache,
+        progress=False,
+    )
+
+
+def test_successive_halving_rungs():
+    res = tune(None)
+    history = res.history.set_index("x")
+    # 8组参数各运行2次, 前4组增加到4次, 前2组增加到8次
+    assert history["Runs"].to_dict() == {
+        0.0: 8,
+        1.0: 8,
+        2.0: 4,
+        3.0: 4,
+        4.0: 2,
+        5.0: 2,
+        6.0: 2,
+        7.0: 2,
+    }
+    # 未淘汰的参数记为-1
+    assert history["Eliminated"].fillna(-1).to_dict() == {
+        0.0: -1,
+        1.0: -1,
+        2.0: 1,
+        3.0: 1,
+        4.0: 0,
+        5.0: 0,
+        6.0: 0,
+        7.0: 0,
+    }
+    assert res.alg == "Stub" and res.params == {"x": 0.0, "y": 3}
+    assert res.stats.count == 8 and 0 <= res.stats.length.mean < 0.01
+    assert res.stats.turn.mean == 3
+
+
+def test_successive_halving_reuses_cached_runs():
+    cache = ResultCache(":memory:")
+    first = tune(cache)
+    # 每轮只运行新增的种子: 8 * 2 + 4 * 2 + 2 * 4 次, 而不是 8 * 2 + 4 * 4 + 2 * 8 次
+    assert (cache.hits, cache.misses) == (0, 32)
+    again = tune(cache)
+    assert (cache.hits, cache.misses) == (32, 32)
+    # 结果按完成顺序计入统计, 平均值可能相差舍入误差
+    pd.testing.assert_frame_equal(again.history, first.history)
+    assert again.params == first.params
+
+
+def test_successive_halving_rejects_unknown_parameters():
+    with pytest.raises(ValueError):
+        successive_halving(Stub, small_graph(), {"z": [1]}, progress=False)
+
+
+def test_load_params_round_trip(tmp_path, load):
+    res = successive_halving(
+        MAACO,
+        load(),
+        {"alpha": [0.5, 1.0]},
+        min_runs=1,
+        max_runs=2,
+        method="grid",
+        fixed={"m": 3, "nc": 2, "cost_to_go": True},
+        worker=2,
+        seed=0,
+        cache=None,
+        progress=False,
+    )
+    file = tmp_path / "params.json"
+    res.save(str(file))
+    alg, params = load_params(str(file))
+    assert alg == "MAACO" and params == res.params
+    assert set(params) == set(get_class_init(MAACO))
+    # 界面的"加载参数": 按类名选择算法, 以repr填入各输入框, 运行时eval各输入框
+    assert alg in get_algs()
+    texts = {k: repr(v) for k, v in params.items()}
+    built = getattr(rps.aco, alg)(**{k: eval(t) for k, t in texts.items()})
+    assert init_params(built) == res.params
+    assert built.cost_to_go is True and built.m == 3